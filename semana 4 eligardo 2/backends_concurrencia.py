@@ -0,0 +1,237 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from url_builder import URLBuilder
+
+# ==========================================
+# BACKENDS DE CONCURRENCIA (secuencial / hilos / asyncio)
+# ==========================================
+# comparativa_modelos.py (semana 3) tenía tres copias de la misma petición
+# y lanzaba un threading.Thread crudo por ID. Aquí la petición y la forma de
+# interpretar la respuesta son UNA sola; lo único que cambia entre backends
+# es cómo se reparten las peticiones:
+#
+#   secuencial -> una requests.Session, una petición tras otra
+#   hilos      -> ThreadPoolExecutor acotado, una requests.Session POR HILO
+#                 (requests.Session no garantiza ser segura entre hilos)
+#   asyncio    -> aiohttp con un loop y una sesión propios del backend
+#
+#   with crear_backend("hilos", "http://127.0.0.1:9999", max_concurrentes=8) as b:
+#       resultados = b.fetch_many([1, 2, 3])
+#
+# Un código síncrono obtiene paralelismo real sin reescribirse a async, y
+# las comparativas miden exactamente el mismo camino de petición.
+
+@dataclass
+class ResultadoFetch:
+    id: Any
+    status: Optional[int] = None
+    datos: Any = None
+    error: Optional[str] = None
+    duracion_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+def _interpretar(id_prod, status: int, leer_json, inicio: float) -> ResultadoFetch:
+    """Misma regla para los tres backends: 2xx -> datos, 404 -> None, resto -> error."""
+    resultado = ResultadoFetch(id_prod, status)
+    if status == 404:
+        pass
+    elif status >= 400:
+        resultado.error = f"HTTP {status}"
+    elif status != 204:
+        resultado.datos = leer_json()
+    resultado.duracion_s = time.perf_counter() - inicio
+    return resultado
+
+def _fallo(id_prod, e: Exception, inicio: float) -> ResultadoFetch:
+    return ResultadoFetch(id_prod, error=f"{type(e).__name__}: {e}", duracion_s=time.perf_counter() - inicio)
+
+class _Backend:
+    nombre = "base"
+
+    def __init__(self, base_url: str, token: str = None, timeout: float = 5.0, max_concurrentes: int = 10):
+        self.url_tool = URLBuilder(base_url)
+        self.timeout = timeout
+        self.max_concurrentes = max_concurrentes
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def url(self, id_prod) -> str:
+        return self.url_tool.construir("productos", path_params=[id_prod])
+
+    def fetch_many(self, ids: Iterable) -> List[ResultadoFetch]:
+        """Un ResultadoFetch por id, en el MISMO orden (los errores no cortan el lote)."""
+        raise NotImplementedError
+
+    def cerrar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+
+# --- 1. SÍNCRONO ---
+
+class _BackendRequests(_Backend):
+    """Base de los backends con requests: la petición es la misma en ambos."""
+
+    def _nueva_sesion(self, pool: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def _fetch(self, session: requests.Session, id_prod) -> ResultadoFetch:
+        inicio = time.perf_counter()
+        try:
+            resp = session.get(self.url(id_prod), timeout=self.timeout)
+            return _interpretar(id_prod, resp.status_code, resp.json, inicio)
+        except (requests.RequestException, ValueError) as e:
+            return _fallo(id_prod, e, inicio)
+
+class BackendSecuencial(_BackendRequests):
+    nombre = "secuencial"
+
+    def __init__(self, base_url: str, **opciones):
+        super().__init__(base_url, **opciones)
+        self.session = self._nueva_sesion(pool=1)
+
+    def fetch_many(self, ids: Iterable) -> List[ResultadoFetch]:
+        return [self._fetch(self.session, id_prod) for id_prod in ids]
+
+    def cerrar(self):
+        self.session.close()
+
+# --- 2. HILOS ---
+
+class BackendHilos(_BackendRequests):
+    """
+    Pool de hilos acotado y reutilizable entre llamadas. Cada hilo crea su
+    propia Session la primera vez (threading.local) y la conserva, así las
+    conexiones keep-alive tampoco se comparten entre hilos.
+    """
+    nombre = "hilos"
+
+    def __init__(self, base_url: str, **opciones):
+        super().__init__(base_url, **opciones)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrentes, thread_name_prefix="fetch")
+        self._local = threading.local()
+        self._sesiones: List[requests.Session] = []
+        self._lock = threading.Lock()
+
+    def _sesion_del_hilo(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._nueva_sesion(pool=1)
+            with self._lock:
+                self._sesiones.append(session)
+        return session
+
+    def _fetch_en_hilo(self, id_prod) -> ResultadoFetch:
+        return self._fetch(self._sesion_del_hilo(), id_prod)
+
+    def fetch_many(self, ids: Iterable) -> List[ResultadoFetch]:
+        # map conserva el orden de entrada aunque terminen desordenadas
+        return list(self._executor.map(self._fetch_en_hilo, ids))
+
+    def cerrar(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for session in self._sesiones:
+                session.close()
+            self._sesiones.clear()
+
+# --- 3. ASYNCIO ---
+
+class BackendAsyncio(_Backend):
+    """
+    fetch_many() es síncrono: corre las corrutinas en un loop PROPIO que
+    vive tanto como el backend (igual que VarianteAsync del benchmark), así
+    la sesión y sus conexiones se reutilizan entre llamadas. Desde código
+    async usa 'await afetch_many(ids)'.
+    """
+    nombre = "asyncio"
+
+    def __init__(self, base_url: str, **opciones):
+        super().__init__(base_url, **opciones)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _sesion(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers, connector=aiohttp.TCPConnector(limit=self.max_concurrentes))
+        return self.session
+
+    async def _fetch(self, session: aiohttp.ClientSession, semaforo: asyncio.Semaphore, id_prod) -> ResultadoFetch:
+        # La fila va FUERA del timeout: con 40 ids y 5 carriles, los últimos
+        # esperarían varios turnos y un ClientTimeout(total) de sesión los
+        # contaría como lentos aunque el servidor responda a tiempo.
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                async with session.get(self.url(id_prod), timeout=aiohttp.ClientTimeout(total=self.timeout)) as resp:
+                    cuerpo = await resp.read()
+                    return _interpretar(id_prod, resp.status, lambda: json.loads(cuerpo), inicio)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                return _fallo(id_prod, e, inicio)
+
+    async def afetch_many(self, ids: Iterable) -> List[ResultadoFetch]:
+        session = await self._sesion()
+        semaforo = asyncio.Semaphore(self.max_concurrentes)
+        return list(await asyncio.gather(*(self._fetch(session, semaforo, id_prod) for id_prod in ids)))
+
+    def fetch_many(self, ids: Iterable) -> List[ResultadoFetch]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("fetch_many() bloquearía el loop actual; usa 'await backend.afetch_many(ids)'.")
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.afetch_many(ids))
+
+    def cerrar(self):
+        if self._loop is not None:
+            if self.session is not None:
+                self._loop.run_until_complete(self.session.close())
+            self._loop.close()
+            self._loop = None
+        self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Usado desde código async: la sesión vive en el loop de quien llama
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+BACKENDS = {b.nombre: b for b in (BackendSecuencial, BackendHilos, BackendAsyncio)}
+
+def crear_backend(nombre: str, base_url: str, **opciones) -> _Backend:
+    try:
+        clase = BACKENDS[nombre]
+    except KeyError:
+        raise ValueError(f"Backend desconocido: {nombre!r}. Opciones: {sorted(BACKENDS)}")
+    return clase(base_url, **opciones)
+
+def fetch_many(ids: Iterable, base_url: str, backend: str = "hilos", **opciones) -> List[ResultadoFetch]:
+    """Atajo de un solo uso: crea el backend, trae los ids y lo cierra."""
+    with crear_backend(backend, base_url, **opciones) as b:
+        return b.fetch_many(list(ids))
@@ -1,22 +1,60 @@
-import time
+import argparse
 import asyncio
-import requests
-import aiohttp
-import tracemalloc
+import json
+import math
+import platform
+import random
 import statistics
+import subprocess
+import sys
 import threading
+import time
+import tracemalloc
+import aiohttp
+import requests
+from datetime import datetime, timezone
 from urllib.parse import urlparse, parse_qs
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from servidor_ecomarket import ServidorEnProceso
+
+# ==========================================
+# BENCHMARK SYNC VS ASYNC (REPRODUCIBLE)
+# ==========================================
+# Lo que cambió respecto a la versión anterior:
+#   - Calentamiento: las primeras vueltas (conexiones TCP, imports, JIT de
+#     caches) no cuentan.
+#   - Una sola sesión y un solo event loop por variante: medimos las
+#     peticiones, no el costo de crear asyncio.run() + ClientSession.
+#   - Reportamos mediana, p95, desviación estándar e intervalo de confianza
+#     (bootstrap) en vez de solo el promedio.
+#   - La memoria se mide en una pasada APARTE: tracemalloc hace más lento
+#     todo lo que toca, así que no puede estar encendido mientras medimos tiempo.
+#   - Salida JSON para comparar entre commits (--guardar / --comparar).
+#   - La recomendación se calcula con los datos, no es texto fijo.
+#   - Por defecto el servidor es servidor_ecomarket (aiohttp, en otro
+#     proceso). El MockServerHandler de http.server se satura con unos
+#     cientos de req/s y terminábamos midiendo al mock; sigue disponible
+#     con --servidor http.server para comparar.
 
 # ==========================================
-# 1. SERVIDOR MOCK LOCAL (Multihilo)
+# 1. SERVIDOR MOCK LOCAL (Multihilo, solo para comparar)
 # ==========================================
 class MockServerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive: la sesión reutiliza conexiones
+    # Cabeceras y cuerpo salen en dos write(): con Nagle + ACK retardado cada
+    # respuesta keep-alive se atrasaba ~40ms y eso era lo que medíamos.
+    disable_nagle_algorithm = True
+
     def do_GET(self): self._handle()
     def do_POST(self): self._handle()
     def do_PATCH(self): self._handle()
 
     def _handle(self):
+        # Consumimos el cuerpo para no romper la conexión keep-alive
+        largo = int(self.headers.get("Content-Length", 0))
+        if largo:
+            self.rfile.read(largo)
+
         # Extraer latencia simulada de la URL
         query = parse_qs(urlparse(self.path).query)
         delay_ms = int(query.get('delay', ['0'])[0])
@@ -24,16 +62,19 @@ class MockServerHandler(BaseHTTPRequestHandler):
         if delay_ms > 0:
             time.sleep(delay_ms / 1000.0) # Simular procesamiento/BBDD
             
+        cuerpo = b'{"status": "ok"}'
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
         self.end_headers()
-        self.wfile.write(b'{"status": "ok"}')
+        self.wfile.write(cuerpo)
         
     def log_message(self, format, *args):
         pass # Silenciar logs del servidor
 
 def start_mock_server(port=9999):
     server = ThreadingHTTPServer(('localhost', port), MockServerHandler)
+    server.daemon_threads = True
     thread = threading.Thread(target=server.serve_forever, daemon=True)
     thread.start()
     return server
@@ -41,125 +82,306 @@ def start_mock_server(port=9999):
 # ==========================================
 # 2. DEFINICIÓN DE ESCENARIOS
 # ==========================================
-URL_BASE = "http://localhost:9999/api"
-
+# Rutas del contrato EcoMarket (las entiende servidor_ecomarket y el mock acepta cualquiera)
 ESCENARIOS = {
-    "Dashboard (4 GETs)": [("GET", "/stats")] * 4,
+    "Dashboard (4 GETs)": [("GET", "/perfil"), ("GET", "/anuncios"), ("GET", "/categorias"), ("GET", "/productos/1")],
     "Masivo (20 POSTs)": [("POST", "/productos")] * 20,
-    "Mixto (18 Peticiones)": [("GET", "/prod")] * 10 + [("POST", "/prod")] * 5 + [("PATCH", "/prod/1")] * 3
+    "Mixto (18 Peticiones)": [("GET", "/productos/1")] * 10 + [("POST", "/productos")] * 5 + [("PATCH", "/productos/1")] * 3
 }
 
+# Cuerpo que se manda en POST/PUT/PATCH
+PRODUCTO_BENCH = {"nombre": "Miel benchmark", "precio": 120.0, "categoria": "miel", "stock": 5}
+
 LATENCIAS = [0, 100, 200] # ms
-ITERACIONES = 10
+REPETICIONES = 20
+CALENTAMIENTO = 3
+PASADAS_MEMORIA = 3
+UMBRAL_REGRESION = 0.10   # 10% más lento que la base = regresión
 
 # ==========================================
-# 3. CLIENTES DE PRUEBA
+# 3. CLIENTES DE PRUEBA (sesión reutilizada)
 # ==========================================
-def run_sync(peticiones, delay):
-    """Ejecuta peticiones secuencialmente con requests"""
-    with requests.Session() as session:
-        for method, endpoint in peticiones:
-            url = f"{URL_BASE}{endpoint}?delay={delay}"
-            session.request(method, url)
+class VarianteSync:
+    tipo = "sync"
 
-async def run_async(peticiones, delay):
-    """Ejecuta peticiones concurrentemente con aiohttp"""
-    async with aiohttp.ClientSession() as session:
-        tareas = []
+    def __init__(self, url_base):
+        self.url_base = url_base
+        self.session = requests.Session()
+
+    def ejecutar(self, peticiones, delay):
+        """Peticiones secuenciales con requests"""
         for method, endpoint in peticiones:
-            url = f"{URL_BASE}{endpoint}?delay={delay}"
-            tareas.append(session.request(method, url))
-        await asyncio.gather(*tareas)
+            self.session.request(method, f"{self.url_base}{endpoint}", params={"delay": delay},
+                                 json=_cuerpo(method)).content
+
+    def cerrar(self):
+        self.session.close()
+
+class VarianteAsync:
+    tipo = "async"
+
+    def __init__(self, url_base):
+        self.url_base = url_base
+        self.loop = asyncio.new_event_loop()
+        self.session = self.loop.run_until_complete(self._crear_sesion())
+
+    async def _crear_sesion(self):
+        return aiohttp.ClientSession()
+
+    async def _una(self, method, url, delay):
+        async with self.session.request(method, url, params={"delay": delay}, json=_cuerpo(method)) as resp:
+            await resp.read()
+
+    async def _todas(self, peticiones, delay):
+        await asyncio.gather(*(self._una(m, f"{self.url_base}{e}", delay) for m, e in peticiones))
+
+    def ejecutar(self, peticiones, delay):
+        """Peticiones concurrentes con aiohttp, sobre el MISMO loop y la MISMA sesión"""
+        self.loop.run_until_complete(self._todas(peticiones, delay))
+
+    def cerrar(self):
+        self.loop.run_until_complete(self.session.close())
+        self.loop.close()
+
+VARIANTES = (VarianteSync, VarianteAsync)
+
+def _cuerpo(method):
+    return PRODUCTO_BENCH if method in ("POST", "PUT", "PATCH") else None
 
 # ==========================================
-# 4. MOTOR DE BENCHMARKING
+# 4. ESTADÍSTICA
 # ==========================================
-def medir_rendimiento(nombre, peticiones, delay, es_async):
+def percentil(muestras, q):
+    """Percentil con interpolación lineal (igual que numpy por defecto)."""
+    ordenadas = sorted(muestras)
+    if len(ordenadas) == 1:
+        return ordenadas[0]
+    pos = (len(ordenadas) - 1) * q / 100
+    abajo = math.floor(pos)
+    arriba = min(abajo + 1, len(ordenadas) - 1)
+    return ordenadas[abajo] + (ordenadas[arriba] - ordenadas[abajo]) * (pos - abajo)
+
+def intervalo_mediana(muestras, confianza=0.95, remuestreos=2000, semilla=1234):
+    """IC de la mediana por bootstrap de percentiles (no supone normalidad)."""
+    if len(muestras) < 2:
+        return (muestras[0], muestras[0])
+    rng = random.Random(semilla)
+    n = len(muestras)
+    medianas = sorted(statistics.median(rng.choices(muestras, k=n)) for _ in range(remuestreos))
+    alfa = (1 - confianza) / 2
+    return (percentil(medianas, alfa * 100), percentil(medianas, (1 - alfa) * 100))
+
+def resumir(tiempos, n_peticiones):
+    mediana = statistics.median(tiempos)
+    bajo, alto = intervalo_mediana(tiempos)
+    return {
+        "muestras": len(tiempos),
+        "mediana_s": mediana,
+        "media_s": statistics.mean(tiempos),
+        "p95_s": percentil(tiempos, 95),
+        "stdev_s": statistics.stdev(tiempos) if len(tiempos) > 1 else 0.0,
+        "min_s": min(tiempos),
+        "max_s": max(tiempos),
+        "ic95_mediana_s": [bajo, alto],
+        "rps": n_peticiones / mediana if mediana else None,
+    }
+
+# ==========================================
+# 5. MOTOR DE BENCHMARKING
+# ==========================================
+def medir_tiempos(variante, peticiones, delay, repeticiones, calentamiento):
+    for _ in range(calentamiento):
+        variante.ejecutar(peticiones, delay)
     tiempos = []
-    memorias = []
-    
-    for _ in range(ITERACIONES):
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        variante.ejecutar(peticiones, delay)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+def medir_memoria(variante, peticiones, delay, pasadas):
+    """Pasada separada: pico de memoria asignada (KB) durante una ejecución."""
+    picos = []
+    for _ in range(pasadas):
         tracemalloc.start()
-        start_time = time.perf_counter()
-        
-        if es_async:
-            asyncio.run(run_async(peticiones, delay))
-        else:
-            run_sync(peticiones, delay)
-            
-        end_time = time.perf_counter()
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        
-        tiempos.append(end_time - start_time)
-        memorias.append(peak / 1024) # KB
+        try:
+            variante.ejecutar(peticiones, delay)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        picos.append(pico / 1024)
+    return statistics.median(picos) if picos else None
 
-    t_promedio = statistics.mean(tiempos)
-    mem_promedio = statistics.mean(memorias)
-    throughput = len(peticiones) / t_promedio
-    
-    return t_promedio, throughput, mem_promedio
+def ejecutar_benchmark(url_base, escenarios=None, latencias=None, repeticiones=REPETICIONES,
+                       calentamiento=CALENTAMIENTO, pasadas_memoria=PASADAS_MEMORIA, verbose=True):
+    escenarios = escenarios or ESCENARIOS
+    latencias = LATENCIAS if latencias is None else latencias
+    resultados = []
+    variantes = [cls(url_base) for cls in VARIANTES]
+    try:
+        for latencia in latencias:
+            if verbose:
+                print(f"\n🌍 LATENCIA SIMULADA DE RED/BBDD: {latencia} ms")
+            for nombre, peticiones in escenarios.items():
+                for variante in variantes:
+                    tiempos = medir_tiempos(variante, peticiones, latencia, repeticiones, calentamiento)
+                    fila = {"escenario": nombre, "latencia_ms": latencia, "tipo": variante.tipo,
+                            **resumir(tiempos, len(peticiones))}
+                    fila["memoria_pico_kb"] = (medir_memoria(variante, peticiones, latencia, pasadas_memoria)
+                                               if pasadas_memoria else None)
+                    resultados.append(fila)
+                    if verbose:
+                        imprimir_fila(fila)
+    finally:
+        for variante in variantes:
+            variante.cerrar()
+    return resultados
 
 # ==========================================
-# 5. EJECUCIÓN Y REPORTE
+# 6. SALIDA JSON Y COMPARACIÓN
 # ==========================================
-def main():
-    print("hola wasaaaa")
-    print("Iniciando Servidor Mock local en puerto 9999...")
-    server = start_mock_server()
-    time.sleep(1) # Dar tiempo al servidor para levantar
-    
+def _commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def construir_reporte(resultados, repeticiones, calentamiento):
+    return {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(),
+            "commit": _commit_actual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticiones": repeticiones,
+            "calentamiento": calentamiento,
+        },
+        "resultados": resultados,
+    }
+
+def _clave(fila):
+    return (fila["escenario"], fila["latencia_ms"], fila["tipo"])
+
+def comparar(base, actual, umbral=UMBRAL_REGRESION):
+    """
+    Compara dos reportes fila por fila. Es regresión si la mediana empeoró
+    más que 'umbral' Y los intervalos de confianza no se solapan (si se
+    solapan, la diferencia puede ser puro ruido).
+    """
+    filas_base = {_clave(f): f for f in base["resultados"]}
+    comparaciones = []
+    for fila in actual["resultados"]:
+        anterior = filas_base.get(_clave(fila))
+        if anterior is None:
+            continue
+        cambio = fila["mediana_s"] / anterior["mediana_s"] - 1 if anterior["mediana_s"] else 0.0
+        separados = fila["ic95_mediana_s"][0] > anterior["ic95_mediana_s"][1]
+        comparaciones.append({
+            "escenario": fila["escenario"], "latencia_ms": fila["latencia_ms"], "tipo": fila["tipo"],
+            "base_s": anterior["mediana_s"], "actual_s": fila["mediana_s"], "cambio": cambio,
+            "regresion": cambio > umbral and separados,
+        })
+    return comparaciones
+
+def recomendar(resultados):
+    """Deriva la recomendación de los números medidos."""
+    por_clave = {_clave(f): f for f in resultados}
+    speedups = []
+    for (escenario, latencia, tipo), fila in por_clave.items():
+        if tipo != "sync" or (escenario, latencia, "async") not in por_clave:
+            continue
+        asincrona = por_clave[(escenario, latencia, "async")]
+        # "Claramente más rápido" = el IC de async queda entero por debajo del de sync
+        gana = asincrona["ic95_mediana_s"][1] < fila["ic95_mediana_s"][0]
+        speedups.append((latencia, escenario, fila["mediana_s"] / asincrona["mediana_s"], gana))
+
+    lineas = []
+    for latencia, escenario, speedup, gana in sorted(speedups):
+        veredicto = "async gana" if gana else "sin diferencia clara" if speedup >= 1 else "sync gana o empata"
+        lineas.append(f"  {latencia:>4} ms | {escenario:<22} | {speedup:5.1f}x | {veredicto}")
+    cruces = sorted({lat for lat, _, _, gana in speedups if gana})
+    if cruces:
+        lineas.append(f"- Async gana con significancia desde {cruces[0]} ms de latencia simulada.")
+    else:
+        lineas.append("- Ningún escenario mostró ventaja significativa de async con estos parámetros.")
+    return lineas
+
+# ==========================================
+# 7. REPORTE EN CONSOLA
+# ==========================================
+def imprimir_fila(fila):
+    bajo, alto = fila["ic95_mediana_s"]
+    memoria = f"{fila['memoria_pico_kb']:.1f}" if fila["memoria_pico_kb"] is not None else "-"
+    print(f"{fila['escenario']:<22} | {fila['tipo']:<5} | mediana {fila['mediana_s']*1000:8.2f}ms "
+          f"[{bajo*1000:.2f}, {alto*1000:.2f}] | p95 {fila['p95_s']*1000:8.2f}ms | "
+          f"σ {fila['stdev_s']*1000:6.2f}ms | {fila['rps']:8.1f} req/s | {memoria} KB")
+
+def imprimir_comparacion(comparaciones, umbral):
+    print("\n" + "=" * 80)
+    print(f"🔍 COMPARACIÓN CONTRA LA BASE (umbral {umbral:.0%})")
+    print("=" * 80)
+    for c in comparaciones:
+        marca = "❌ REGRESIÓN" if c["regresion"] else "✅"
+        print(f"{marca:<13} {c['escenario']:<22} {c['latencia_ms']:>4}ms {c['tipo']:<5} "
+              f"{c['base_s']*1000:8.2f}ms -> {c['actual_s']*1000:8.2f}ms ({c['cambio']:+.1%})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async de EcoMarket")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--calentamiento", type=int, default=CALENTAMIENTO)
+    parser.add_argument("--latencias", type=int, nargs="+", default=LATENCIAS, help="Latencias simuladas (ms)")
+    parser.add_argument("--pasadas-memoria", type=int, default=PASADAS_MEMORIA, help="0 para no medir memoria")
+    parser.add_argument("--puerto", type=int, default=9999)
+    parser.add_argument("--servidor", choices=["aiohttp", "http.server"], default="aiohttp",
+                        help="aiohttp = servidor_ecomarket en otro proceso; http.server = mock multihilo")
+    parser.add_argument("--guardar", help="Escribe los resultados en este JSON")
+    parser.add_argument("--comparar", help="JSON base (de otro commit) contra el que comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args(argv)
+
+    print(f"Iniciando servidor local ({args.servidor}) en puerto {args.puerto}...")
+    if args.servidor == "aiohttp":
+        servidor = ServidorEnProceso(args.puerto)
+        url_base = servidor.iniciar()
+        detener = servidor.detener
+    else:
+        server = start_mock_server(args.puerto)
+        url_base = f"http://localhost:{server.server_address[1]}"
+
+        def detener():
+            server.shutdown()
+            server.server_close()
+
     print("\n" + "="*80)
-    print(f"🚀 INICIANDO BENCHMARK ECOMARKET ({ITERACIONES} iteraciones por prueba)")
+    print(f"🚀 BENCHMARK ECOMARKET ({args.calentamiento} de calentamiento + {args.repeticiones} repeticiones)")
     print("="*80)
-    
-    resultados_totales = []
-
-    for latencia in LATENCIAS:
-        print(f"\n🌍 LATENCIA SIMULADA DE RED/BBDD: {latencia} ms")
-        print("-" * 80)
-        print(f"{'Escenario':<22} | {'Tipo':<6} | {'Tiempo(s)':<10} | {'Req/seg':<8} | {'Memoria(KB)':<12} | {'Speedup'}")
-        print("-" * 80)
-        
-        for nombre, peticiones in ESCENARIOS.items():
-            # Medir Sync
-            t_sync, rps_sync, mem_sync = medir_rendimiento(nombre, peticiones, latencia, False)
-            # Medir Async
-            t_async, rps_async, mem_async = medir_rendimiento(nombre, peticiones, latencia, True)
-            
-            speedup = t_sync / t_async
-            resultados_totales.append((latencia, nombre, speedup))
-            
-            # Imprimir filas
-            print(f"{nombre:<22} | {'Sync':<6} | {t_sync:<10.3f} | {rps_sync:<8.1f} | {mem_sync:<12.1f} | 1.0x")
-            print(f"{'':<22} | {'Async':<6} | {t_async:<10.3f} | {rps_async:<8.1f} | {mem_async:<12.1f} | {speedup:.1f}x 🔥")
-        print("-" * 80)
+    try:
+        resultados = ejecutar_benchmark(url_base, latencias=args.latencias, repeticiones=args.repeticiones,
+                                        calentamiento=args.calentamiento, pasadas_memoria=args.pasadas_memoria)
+    finally:
+        detener()
 
-    # REPORTE EJECUTIVO
+    reporte = construir_reporte(resultados, args.repeticiones, args.calentamiento)
     print("\n" + "="*80)
-    print("📊 REPORTE DE INGENIERÍA Y RECOMENDACIÓN")
-    print("="*80)
-    if len(resultados_totales) == 0:
-        print("No se obtuvieron resultados. Verificar que el servidor mock esté funcionando.")
-        
-    
-    # Análisis matemático simple
-    print("- Punto de Cruce (Crossover Point):")
-    print("  Con latencia 0ms (local perfecto), la diferencia es menor debido al 'overhead' de crear el loop asíncrono.")
-    print("  Sin embargo, a partir de **2 peticiones simultáneas con latencia > 50ms**, el código asíncrono")
-    print("  empieza a aplastar al síncrono.\n")
-    
-    print("- Consumo de Recursos (TCP y Memoria):")
-    print("  Sync usa menos memoria (1 conexión TCP reutilizada), mientras Async abre múltiples sockets TCP")
-    print("  concurrentes. El ligero aumento de memoria en Async justifica completamente la ganancia de velocidad.\n")
-    
-    print("- 🏆 RECOMENDACIÓN FINAL PARA ECOMARKET:")
-    print("  ¡Sí vale la pena la complejidad! En el mundo real, las APIs tienen de 100ms a 300ms de latencia.")
-    print("  En el escenario 'Masivo (20 POSTs)' a 200ms, Async será ~20 veces más rápido.")
-    print("  Para el Dashboard, el usuario verá la pantalla en 0.2s en lugar de casi 1.0s. La asincronía es el camino.")
+    print("📊 SPEEDUP POR ESCENARIO (mediana sync / mediana async)")
     print("="*80)
+    for linea in recomendar(resultados):
+        print(linea)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.guardar}")
 
-    server.shutdown()
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        comparaciones = comparar(base, reporte, args.umbral)
+        imprimir_comparacion(comparaciones, args.umbral)
+        if any(c["regresion"] for c in comparaciones):
+            return 1
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
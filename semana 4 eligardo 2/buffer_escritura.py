@@ -0,0 +1,145 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import reloj
+
+# ==========================================
+# BUFFER WRITE-BEHIND PARA PATCH DE PRODUCTOS
+# ==========================================
+# En una tormenta de inventario llegan varios PATCH por producto en el mismo
+# segundo ({"stock": 9}, {"stock": 8}, {"disponible": False}...). En vez de
+# mandarlos uno por uno, se acumulan por id y se FUSIONAN en un solo patch
+# (el último valor de cada campo gana). Se envía cuando:
+#   - hay max_pendientes productos distintos esperando (tamaño),
+#   - el cambio más viejo cumple max_edad_s (edad),
+#   - o alguien llama a flush() / cierra el buffer.
+#
+#   async with cliente.buffer_escritura(max_edad_s=0.2) as buffer:
+#       buffer.actualizar("7", {"stock": 9})
+#       futuro = buffer.actualizar("7", {"stock": 8})   # viaja junto con el anterior
+#   producto = futuro.result()                          # Producto final (o None si no existe)
+#
+# Orden por producto: nunca hay dos PATCH del mismo id en vuelo. Lo que
+# llega mientras uno viaja espera a que termine y sale en el siguiente envío.
+# La edad se mide con reloj.ahora(), así se puede probar en tiempo virtual.
+
+@dataclass
+class _Pendiente:
+    desde: float
+    campos: dict = field(default_factory=dict)
+    futuros: List[asyncio.Future] = field(default_factory=list)
+
+class BufferEscritura:
+    def __init__(self, cliente, max_pendientes: int = 100, max_edad_s: float = 0.5, max_concurrentes: int = 10):
+        if max_pendientes < 1 or max_edad_s < 0:
+            raise ValueError("max_pendientes debe ser >= 1 y max_edad_s >= 0")
+        self.cliente = cliente
+        self.max_pendientes = max_pendientes
+        self.max_edad_s = max_edad_s
+        self._sem = asyncio.Semaphore(max_concurrentes)
+        self._pendientes: Dict[str, _Pendiente] = {}     # Orden de llegada = el más viejo primero
+        self._en_vuelo: Dict[str, asyncio.Task] = {}
+        self._temporizador: Optional[asyncio.Task] = None
+        self._cerrado = False
+        self.estadisticas = Counter()   # encolados, fusionados, enviados, fallidos
+
+    def __len__(self) -> int:
+        return len(self._pendientes)
+
+    def actualizar(self, id_prod, campos: dict) -> asyncio.Future:
+        """
+        Encola un PATCH sin bloquear. El Future se resuelve con el Producto
+        que devolvió el servidor para el patch fusionado (o con su excepción).
+        """
+        if self._cerrado:
+            raise RuntimeError("El buffer ya está cerrado.")
+        id_prod = str(id_prod)
+        futuro = asyncio.get_running_loop().create_future()
+        pendiente = self._pendientes.get(id_prod)
+        if pendiente is None:
+            pendiente = self._pendientes[id_prod] = _Pendiente(reloj.ahora())
+        else:
+            self.estadisticas["fusionados"] += 1
+        pendiente.campos.update(campos)     # Último en escribir gana, campo por campo
+        pendiente.futuros.append(futuro)
+        self.estadisticas["encolados"] += 1
+
+        if len(self._pendientes) >= self.max_pendientes:
+            self._despachar()
+        else:
+            self._armar_temporizador()
+        return futuro
+
+    async def flush(self):
+        """Envía todo lo pendiente y espera, incluidos los que esperaban a un PATCH en vuelo."""
+        while self._pendientes or self._en_vuelo:
+            self._despachar()
+            await asyncio.gather(*self._en_vuelo.values(), return_exceptions=True)
+
+    # --- ENVÍO ---
+
+    def _despachar(self):
+        for id_prod in list(self._pendientes):
+            if id_prod not in self._en_vuelo:
+                pendiente = self._pendientes.pop(id_prod)
+                self._en_vuelo[id_prod] = asyncio.create_task(self._enviar(id_prod, pendiente))
+
+    async def _enviar(self, id_prod: str, pendiente: _Pendiente):
+        cancelado = False
+        try:
+            async with self._sem:
+                self.estadisticas["enviados"] += 1
+                producto = await self.cliente.actualizar_producto_parcial(id_prod, pendiente.campos)
+        except asyncio.CancelledError:
+            # Nos cancelaron (ej. al apagar el loop): quien espera el PATCH no debe quedarse colgado
+            cancelado = True
+            for futuro in pendiente.futuros:
+                futuro.cancel()
+            raise
+        except Exception as e:
+            self.estadisticas["fallidos"] += 1
+            for futuro in pendiente.futuros:
+                if not futuro.done():
+                    futuro.set_exception(e)
+        else:
+            for futuro in pendiente.futuros:
+                if not futuro.done():
+                    futuro.set_result(producto)
+        finally:
+            del self._en_vuelo[id_prod]
+            # Llegaron más cambios de este id mientras viajaba: que el temporizador los lleve
+            if id_prod in self._pendientes and not cancelado:
+                self._armar_temporizador()
+
+    # --- DISPARO POR EDAD ---
+
+    def _armar_temporizador(self):
+        if self._temporizador is None or self._temporizador.done():
+            self._temporizador = asyncio.create_task(self._vigilar_edad())
+
+    async def _vigilar_edad(self):
+        while True:
+            despachables = [p.desde for i, p in self._pendientes.items() if i not in self._en_vuelo]
+            if not despachables:
+                return   # Lo que quede espera un envío en vuelo, que vuelve a armarnos al terminar
+            espera = min(despachables) + self.max_edad_s - reloj.ahora()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            else:
+                self._despachar()
+
+    # --- CICLO DE VIDA ---
+
+    async def cerrar(self):
+        await self.flush()
+        self._cerrado = True
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            await asyncio.gather(self._temporizador, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cerrar()
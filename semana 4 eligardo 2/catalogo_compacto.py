@@ -0,0 +1,217 @@
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+from modelos import Producto, Productor
+
+# ==========================================
+# CATÁLOGO COMPACTO (COLUMNAR)
+# ==========================================
+# Un Producto de Pydantic guarda su __dict__, los campos seteados y un
+# Productor anidado: cientos de bytes por producto. Para tener el catálogo
+# completo en memoria lo guardamos por COLUMNAS:
+#   - precio, disponible, creado_en -> array de tipos primitivos (8 o 1 byte)
+#   - categoria, productor          -> códigos enteros + diccionario
+#   - id, nombre, descripcion       -> listas de str (los str se comparten)
+# y entregamos "vistas" de solo lectura con los mismos atributos.
+
+_SIN_FECHA = math.nan
+
+class ProductoCompacto:
+    """Vista de solo lectura de una fila del catálogo. No copia datos."""
+    __slots__ = ("_catalogo", "_i")
+
+    def __init__(self, catalogo: "CatalogoColumnar", indice: int):
+        self._catalogo = catalogo
+        self._i = indice
+
+    @property
+    def id(self) -> str:
+        return self._catalogo._ids[self._i]
+
+    @property
+    def nombre(self) -> str:
+        return self._catalogo._nombres[self._i]
+
+    @property
+    def precio(self) -> float:
+        return self._catalogo._precios[self._i]
+
+    @property
+    def categoria(self) -> str:
+        return self._catalogo._categorias[self._catalogo._cod_categoria[self._i]]
+
+    @property
+    def disponible(self) -> bool:
+        return bool(self._catalogo._disponible[self._i])
+
+    @property
+    def descripcion(self) -> Optional[str]:
+        return self._catalogo._descripciones.get(self._i)
+
+    @property
+    def productor(self) -> Optional[Productor]:
+        codigo = self._catalogo._cod_productor[self._i]
+        if codigo < 0:
+            return None
+        return self._catalogo._productores[codigo]
+
+    @property
+    def creado_en(self) -> Optional[datetime]:
+        ts = self._catalogo._creado_en[self._i]
+        if math.isnan(ts):
+            return None
+        fecha = datetime.fromtimestamp(ts, tz=timezone.utc)
+        if self._i not in self._catalogo._zonas:
+            return fecha
+        zona = self._catalogo._zonas[self._i]
+        # Devolvemos la fecha tal como llegó: naive (zona None) o en su zona original
+        return fecha.replace(tzinfo=None) if zona is None else fecha.astimezone(zona)
+
+    def a_producto(self) -> Producto:
+        """Reconstruye el modelo Pydantic completo (ej. para reenviarlo a la API)."""
+        return Producto(
+            id=self.id, nombre=self.nombre, precio=self.precio, categoria=self.categoria,
+            disponible=self.disponible, descripcion=self.descripcion,
+            productor=self.productor, creado_en=self.creado_en,
+        )
+
+    def __eq__(self, otro):
+        if isinstance(otro, ProductoCompacto):
+            return self._catalogo is otro._catalogo and self._i == otro._i
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._catalogo), self._i))
+
+    def __repr__(self):
+        return f"ProductoCompacto(id={self.id!r}, nombre={self.nombre!r}, precio={self.precio}, categoria={self.categoria!r})"
+
+class CatalogoColumnar:
+    """
+    Almacén del catálogo por columnas.
+
+    Se llena en bloque desde productos ya validados (Producto) y se recorre
+    con vistas ProductoCompacto que exponen los mismos atributos.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._nombres: List[str] = []
+        self._precios = array("d")
+        self._disponible = array("b")
+        self._creado_en = array("d")
+        self._cod_categoria = array("B")
+        self._cod_productor = array("l")
+        # La mayoría de productos no trae descripción: la guardamos dispersa
+        self._descripciones = {}
+        # Igual con la zona de creado_en: solo las filas que NO vienen en UTC
+        # (None = fecha naive, que se guarda como si fuera UTC)
+        self._zonas = {}
+        # Diccionarios de codificación
+        self._categorias: List[str] = []
+        self._indice_categoria = {}
+        self._productores: List[Productor] = []
+        self._indice_productor = {}
+        self._posicion = {}     # id -> fila
+
+    @classmethod
+    def desde_productos(cls, productos: Iterable[Producto]) -> "CatalogoColumnar":
+        catalogo = cls()
+        catalogo.extender(productos)
+        return catalogo
+
+    def extender(self, productos: Iterable[Producto]):
+        """Agrega productos en bloque. Un id repetido reemplaza la fila anterior."""
+        for p in productos:
+            fila = self._posicion.get(p.id)
+            if fila is None:
+                self._agregar(p)
+            else:
+                self._reemplazar(fila, p)
+
+    def _codigo_categoria(self, categoria: str) -> int:
+        codigo = self._indice_categoria.get(categoria)
+        if codigo is None:
+            codigo = len(self._categorias)
+            self._categorias.append(categoria)
+            self._indice_categoria[categoria] = codigo
+        return codigo
+
+    def _codigo_productor(self, productor: Optional[Productor]) -> int:
+        if productor is None:
+            return -1
+        clave = (productor.id, productor.nombre)
+        codigo = self._indice_productor.get(clave)
+        if codigo is None:
+            codigo = len(self._productores)
+            # Una sola instancia por productor, compartida por todas sus filas
+            self._productores.append(productor)
+            self._indice_productor[clave] = codigo
+        return codigo
+
+    def _timestamp(self, fila: int, fecha: Optional[datetime]) -> float:
+        """Segundos UTC para la columna; anota en _zonas lo necesario para reconstruir la fecha."""
+        self._zonas.pop(fila, None)
+        if fecha is None:
+            return _SIN_FECHA
+        if fecha.tzinfo is None:
+            # .timestamp() de una fecha naive usaría la hora LOCAL del equipo
+            self._zonas[fila] = None
+            return fecha.replace(tzinfo=timezone.utc).timestamp()
+        if fecha.utcoffset() != timedelta(0):
+            self._zonas[fila] = fecha.tzinfo
+        return fecha.timestamp()
+
+    def _agregar(self, p: Producto):
+        fila = len(self._ids)
+        self._posicion[p.id] = fila
+        self._ids.append(p.id)
+        self._nombres.append(p.nombre)
+        self._precios.append(p.precio)
+        self._disponible.append(1 if p.disponible else 0)
+        self._creado_en.append(self._timestamp(fila, p.creado_en))
+        self._cod_categoria.append(self._codigo_categoria(p.categoria))
+        self._cod_productor.append(self._codigo_productor(p.productor))
+        if p.descripcion is not None:
+            self._descripciones[fila] = p.descripcion
+
+    def _reemplazar(self, fila: int, p: Producto):
+        self._nombres[fila] = p.nombre
+        self._precios[fila] = p.precio
+        self._disponible[fila] = 1 if p.disponible else 0
+        self._creado_en[fila] = self._timestamp(fila, p.creado_en)
+        self._cod_categoria[fila] = self._codigo_categoria(p.categoria)
+        self._cod_productor[fila] = self._codigo_productor(p.productor)
+        if p.descripcion is not None:
+            self._descripciones[fila] = p.descripcion
+        else:
+            self._descripciones.pop(fila, None)
+
+    # --- ACCESO ---
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, indice: int) -> ProductoCompacto:
+        if indice < 0:
+            indice += len(self._ids)
+        if not 0 <= indice < len(self._ids):
+            raise IndexError("Índice fuera del catálogo")
+        return ProductoCompacto(self, indice)
+
+    def __iter__(self) -> Iterator[ProductoCompacto]:
+        for i in range(len(self._ids)):
+            yield ProductoCompacto(self, i)
+
+    def __contains__(self, id_prod: str) -> bool:
+        return id_prod in self._posicion
+
+    def obtener(self, id_prod: str) -> Optional[ProductoCompacto]:
+        fila = self._posicion.get(id_prod)
+        return None if fila is None else ProductoCompacto(self, fila)
+
+    @property
+    def categorias(self) -> List[str]:
+        """Diccionario de categorías (el código de cada una es su posición)."""
+        return list(self._categorias)
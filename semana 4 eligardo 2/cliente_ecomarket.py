@@ -1,9 +1,16 @@
 import asyncio
 import aiohttp
-from typing import List, Optional, Any
+from typing import List, Optional, Any, AsyncIterator, Tuple
 from pydantic import ValidationError
 from modelos import Producto
 from url_builder import URLBuilder
+from parser_incremental import ParserArrayJSON, ErrorParser
+from eco_logger import auditar_peticion_http, crear_trace_config
+from metricas import REGISTRO
+from escritura_lotes import EscritorLotes, ResultadoLote
+from buffer_escritura import BufferEscritura
+import trazas
+from retry import with_retry
 import json # Necesario para capturar JSONDecodeError
 
 # --- EXCEPCIONES PERSONALIZADAS ---
@@ -17,10 +24,21 @@ class ErrorValidacion(EcoMarketError):
 
 class ErrorNegocio(EcoMarketError): 
     """Errores lógicos o respuestas 4xx/5xx del servidor."""
-    pass
+    def __init__(self, mensaje: str, status: int = None):
+        super().__init__(mensaje)
+        self.status = status   # Código HTTP si el error vino del servidor
 
 class EcoMarketClient:
-    def __init__(self, base_url: str, token: str, timeout: float = 5.0): # Timeout como float
+    # Nombres de los parámetros de paginación que entiende el servidor
+    PARAM_PAGINA = "page"
+    PARAM_LIMITE = "limit"
+    PARAM_CURSOR = "cursor"
+
+    # Solo estos métodos se reintentan: repetir un POST/PATCH podría duplicar la escritura
+    METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+    def __init__(self, base_url: str, token: str, timeout: float = 5.0, # Timeout como float
+                 reintentos: int = 0, espera_reintento: float = 1.0):
         self.url_tool = URLBuilder(base_url)
         self.token = token
         self.timeout = aiohttp.ClientTimeout(total=timeout) # Objeto Timeout correcto de aiohttp
@@ -29,33 +47,51 @@ class EcoMarketClient:
             "Content-Type": "application/json"
         }
         self.session = None
+        self.soporta_lote: Optional[bool] = None  # POST /productos/lote; None = aún no sabemos
+        # with_retry sobre _enviar: 5xx, 429, timeouts y errores de red (0 = sin reintentos)
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
 
     async def __aenter__(self):
         # Pasamos el timeout a la sesión globalmente
-        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout)
+        # trace_configs: desglose de tiempos (DNS, conexión, TTFB, transferencia) para eco_logger
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout,
+                                             trace_configs=[crear_trace_config(), trazas.crear_trace_config()])
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session and not self.session.closed:
             await self.session.close()
 
-    async def _request(self, method: str, endpoint: str, path_params: list = None, data: dict = None) -> Any:
-        url = self.url_tool.construir(endpoint, path_params=path_params)
+    @auditar_peticion_http
+    async def _request(self, method: str, endpoint: str, path_params: list = None, data: dict = None,
+                       query_params: dict = None) -> Any:
+        url = self.url_tool.construir(endpoint, path_params=path_params, query_params=query_params)
         
         if self.session is None:
             raise EcoMarketError("La sesión no está iniciada. Usa 'async with'.")
 
+        with trazas.span(f"HTTP {method}", **{"http.method": method, "http.url": url}) as span:
+            enviar = self._enviar
+            if self.reintentos and method in self.METODOS_IDEMPOTENTES:
+                enviar = with_retry(max_retries=self.reintentos, base_delay=self.espera_reintento)(enviar)
+            return await enviar(method, url, data, span)
+
+    async def _enviar(self, method: str, url: str, data: Optional[dict], span) -> Any:
+        # traceparent: el servidor puede colgar sus propios spans de esta traza
+        headers = trazas.inyectar_contexto() or None
         try:
             # NO pasamos timeout aquí para que use el de la sesión (que podemos modificar en tests)
             # Ojo: si modificas self.session.timeout en el test, afectará aquí.
-            async with self.session.request(method=method, url=url, json=data) as response:
-                
+            async with self.session.request(method=method, url=url, json=data, headers=headers) as response:
+                span.atributo("http.status_code", response.status)
+
                 if response.status == 404:
                     return None
                 
                 if response.status >= 400:
                     text = await response.text()
-                    raise ErrorNegocio(f"Error HTTP {response.status}: {text}")
+                    raise ErrorNegocio(f"Error HTTP {response.status}: {text}", status=response.status)
 
                 if response.status == 204:
                     return {}
@@ -66,8 +102,9 @@ class EcoMarketClient:
                     # Capturamos TODO error de parseo JSON
                     raise EcoMarketError("El servidor no devolvió un JSON válido.")
 
-        except asyncio.TimeoutError:
-            raise EcoMarketError("El servidor tardó demasiado en responder (Timeout).")
+        except asyncio.TimeoutError as e:
+            # La causa queda encadenada: with_retry la usa para saber que fue un timeout
+            raise EcoMarketError("El servidor tardó demasiado en responder (Timeout).") from e
         except aiohttp.ClientError as e:
             raise e 
 
@@ -84,6 +121,161 @@ class EcoMarketClient:
         except ValidationError as e:
             raise ErrorValidacion(f"Datos inválidos al obtener producto: {e}")
 
+    async def obtener_productos(self, ids: List[str], max_concurrentes: int = 10) -> List[Optional[Producto]]:
+        """Varios GET /productos/{id} en paralelo (a lo sumo max_concurrentes a la vez), en el orden de 'ids'."""
+        semaforo = asyncio.Semaphore(max_concurrentes)
+
+        async def uno(id_prod):
+            async with semaforo:
+                return await self.obtener_producto(id_prod)
+
+        return list(await asyncio.gather(*(uno(id_prod) for id_prod in ids)))
+
+    async def iterar_productos(self, chunk_size: int = 64 * 1024) -> AsyncIterator[Producto]:
+        """
+        Recorre GET /productos en streaming, sin cargar el cuerpo completo.
+
+        El arreglo se parsea trozo a trozo desde el socket y cada producto se
+        valida y entrega apenas llega, así la memoria depende del tamaño de un
+        producto y no del catálogo entero (ideal para exportaciones grandes).
+        """
+        if self.session is None:
+            raise EcoMarketError("La sesión no está iniciada. Usa 'async with'.")
+
+        url = self.url_tool.construir("productos")
+        parser = ParserArrayJSON()
+
+        try:
+            async with self.session.get(url) as response:
+                if response.status >= 400:
+                    text = await response.text()
+                    raise ErrorNegocio(f"Error HTTP {response.status}: {text}", status=response.status)
+
+                try:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        for item in parser.alimentar(chunk):
+                            yield self._validar_producto(item)
+                    for item in parser.finalizar():
+                        yield self._validar_producto(item)
+                except ErrorParser as e:
+                    raise EcoMarketError(f"El servidor no devolvió un JSON válido: {e}")
+
+        except asyncio.TimeoutError:
+            raise EcoMarketError("El servidor tardó demasiado en responder (Timeout).")
+
+    # --- PAGINACIÓN ---
+
+    async def obtener_pagina(self, pagina: int = 1, limite: int = 100, cursor: str = None,
+                             estilo: str = "pagina", categoria: str = None,
+                             productor_id: str = None) -> Tuple[List[Producto], Any]:
+        """
+        Pide UNA página de /productos.
+
+        Retorna (productos, siguiente) donde 'siguiente' es el número de la
+        próxima página o el próximo cursor, o None si ya no hay más.
+        El servidor puede responder con un arreglo plano o con un sobre
+        {"items": [...], "siguiente_cursor": ...}.
+        """
+        params = {"categoria": categoria, "productor_id": productor_id, self.PARAM_LIMITE: limite}
+        if estilo == "pagina":
+            params[self.PARAM_PAGINA] = pagina
+        elif estilo == "cursor":
+            params[self.PARAM_CURSOR] = cursor
+        else:
+            raise ValueError(f"Estilo de paginación desconocido: {estilo}")
+
+        data = await self._request("GET", "productos", query_params=params)
+
+        siguiente_cursor = None
+        if isinstance(data, dict):
+            items = data.get("items", data.get("productos", []))
+            siguiente_cursor = data.get("siguiente_cursor", data.get("next_cursor"))
+        else:
+            items = data or []
+
+        productos = [self._validar_producto(item) for item in items]
+
+        if estilo == "cursor":
+            return productos, siguiente_cursor
+        # Página incompleta = última página
+        siguiente = pagina + 1 if len(productos) >= limite else None
+        return productos, siguiente
+
+    async def paginar_productos(self, categoria: str = None, productor_id: str = None,
+                                limite: int = 100, estilo: str = "pagina", prefetch: int = 1,
+                                pagina_inicial: int = 1, max_paginas: int = None,
+                                cursor: str = None) -> AsyncIterator[List[Producto]]:
+        """
+        Recorre el catálogo página por página.
+
+        Con prefetch > 0 una tarea de fondo va pidiendo las páginas siguientes
+        mientras el llamador procesa la actual (hasta 'prefetch' páginas por
+        adelantado), así la latencia de cada página queda oculta.
+        """
+        if estilo not in ("pagina", "cursor"):
+            raise ValueError(f"Estilo de paginación desconocido: {estilo}")
+
+        async def recorrer():
+            pagina, cur, leidas = pagina_inicial, cursor, 0
+            while max_paginas is None or leidas < max_paginas:
+                productos, siguiente = await self.obtener_pagina(
+                    pagina=pagina, limite=limite, cursor=cur, estilo=estilo,
+                    categoria=categoria, productor_id=productor_id)
+                leidas += 1
+                if productos:
+                    yield productos
+                if siguiente is None:
+                    return
+                if estilo == "pagina":
+                    pagina = siguiente
+                else:
+                    cur = siguiente
+
+        # Sin read-ahead: recorrido secuencial simple
+        if prefetch <= 0:
+            async for productos in recorrer():
+                yield productos
+            return
+
+        cola = asyncio.Queue(maxsize=prefetch)
+        fin = object()
+
+        async def productor():
+            try:
+                async for productos in recorrer():
+                    await cola.put(productos)
+                await cola.put(fin)
+            except Exception as e:
+                await cola.put(e)
+
+        tarea = asyncio.create_task(productor())
+        try:
+            while True:
+                item = await cola.get()
+                if item is fin:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Si el llamador corta antes, no dejamos peticiones huérfanas
+            tarea.cancel()
+            await asyncio.gather(tarea, return_exceptions=True)
+
+    async def iterar_catalogo(self, **kwargs) -> AsyncIterator[Producto]:
+        """Igual que paginar_productos pero entrega producto por producto."""
+        async for pagina in self.paginar_productos(**kwargs):
+            for producto in pagina:
+                yield producto
+
+    def _validar_producto(self, item: Any) -> Producto:
+        if not isinstance(item, dict):
+            raise ErrorValidacion(f"Se esperaba un objeto producto y llegó: {item!r}")
+        try:
+            return Producto(**item)
+        except ValidationError as e:
+            raise ErrorValidacion(f"Producto inválido en el listado: {e}")
+
     async def crear_producto(self, datos: dict) -> Producto:
         try:
             prod_temp = Producto(**{**datos, "id": "temp"}) 
@@ -93,10 +285,54 @@ class EcoMarketClient:
         data = await self._request("POST", "productos", data=datos)
         return Producto(**data)
 
+    async def crear_multiples_productos(self, productos: List[dict], tamano_lote: int = 500,
+                                        max_bytes: int = 512 * 1024, max_concurrentes: int = 4) -> ResultadoLote:
+        """
+        Crea muchos productos usando POST /productos/lote cuando el servidor lo
+        ofrece (si no, POST individuales concurrentes). Nunca lanza por un item:
+        revisa resultado.fallidos y reenvía resultado.por_reenviar(productos).
+        """
+        return await EscritorLotes(self, tamano_lote, max_bytes, max_concurrentes).crear(productos)
+
+    async def listar_productos(self, categoria: str = None, productor_id: str = None) -> List[Producto]:
+        data = await self._request("GET", "productos",
+                                   query_params={"categoria": categoria, "productor_id": productor_id})
+        if isinstance(data, dict) and "items" in data:
+            data = data["items"]
+        return [self._validar_producto(item) for item in data or []]
+
+    async def actualizar_producto_total(self, id_prod: str, datos: dict) -> Optional[Producto]:
+        """PUT: reemplaza el producto completo (None si no existe)."""
+        try:
+            Producto(**{**datos, "id": id_prod})
+        except ValidationError as e:
+            raise ErrorNegocio(f"Datos de entrada inválidos: {e}")
+
+        data = await self._request("PUT", "productos", path_params=[id_prod], data=datos)
+        return None if data is None else Producto(**data)
+
+    async def actualizar_producto_parcial(self, id_prod: str, campos: dict) -> Optional[Producto]:
+        """PATCH: solo los campos enviados (None si no existe)."""
+        data = await self._request("PATCH", "productos", path_params=[id_prod], data=campos)
+        return None if data is None else Producto(**data)
+
+    def buffer_escritura(self, max_pendientes: int = 100, max_edad_s: float = 0.5,
+                         max_concurrentes: int = 10) -> BufferEscritura:
+        """Write-behind: fusiona PATCH seguidos al mismo producto (ver buffer_escritura.py)."""
+        return BufferEscritura(self, max_pendientes, max_edad_s, max_concurrentes)
+
+    async def eliminar_producto(self, id_prod: str) -> bool:
+        """DELETE: True si se borró, False si ya no existía."""
+        data = await self._request("DELETE", "productos", path_params=[id_prod])
+        return data is not None
+
     async def cargar_dashboard(self):
         tareas = [
             self._request("GET", "perfil"),
             self._request("GET", "productos"),
             self._request("GET", "anuncios")
         ]
-        return await asyncio.gather(*tareas, return_exceptions=True)
\ No newline at end of file
+        # Cada _request ya queda en el registro por ruta; esto mide el total de la pantalla.
+        # gather() crea las tareas DENTRO del span, así heredan su contexto y quedan como hijas.
+        with REGISTRO.medir("GET", "dashboard"), trazas.span("cargar_dashboard", peticiones=len(tareas)):
+            return await asyncio.gather(*tareas, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,331 @@
+import contextlib
+import os
+import threading
+import time
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from pydantic import BaseModel, Field, field_validator, ValidationError
+from typing import Optional, List
+
+# --- 1. MODELOS DE DATOS (REFACTORIZACIÓN DE VALIDACIÓN) ---
+# Definimos "qué es un producto" y Pydantic se encarga de los if/else.
+
+CATEGORIAS_VALIDAS = {'frutas', 'verduras', 'lacteos', 'miel', 'conservas'}
+
+class ProductoSchema(BaseModel):
+    id: int
+    nombre: str = Field(..., min_length=1) # Obligatorio, no vacío
+    precio: float = Field(..., gt=0)       # Obligatorio, mayor a 0
+    categoria: str
+    disponible: bool = True
+    descripcion: Optional[str] = None
+    
+    # Validador personalizado para la categoría (Lógica de Negocio)
+    @field_validator('categoria')
+    @classmethod
+    def validar_categoria(cls, v):
+        if v not in CATEGORIAS_VALIDAS:
+            raise ValueError(f"Categoría '{v}' no permitida. Use: {CATEGORIAS_VALIDAS}")
+        return v
+
+# --- 2. EXCEPCIONES PERSONALIZADAS ---
+class EcoMarketError(Exception): """Error base"""
+class ErrorConexion(EcoMarketError): """Fallo de red o timeout"""
+class ErrorNegocio(EcoMarketError): """Datos inválidos o conflictos"""
+class RecursoNoEncontrado(EcoMarketError): """404"""
+
+# --- 3. POOL DE CONEXIONES CON MÉTRICAS ---
+# El pool de urllib3 no dice cuándo un hilo tuvo que esperar una conexión
+# (pool_block=True) ni cuándo tiró una porque ya estaba lleno (pool_block=False,
+# el "Connection pool is full, discarding connection" del log). Con 32 hilos
+# y el pool por defecto de 10 eso es justo lo que pasa: se abren y descartan
+# conexiones sin parar. Estos contadores lo hacen visible.
+
+class _PoolConMetricas:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.esperas = 0
+        self.segundos_esperando = 0.0
+        self.descartadas = 0
+
+    def _get_conn(self, timeout=None):
+        inicio = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        espera = time.perf_counter() - inicio
+        # Solo con pool_block el hilo puede quedarse esperando; sin contención toma microsegundos
+        if self.block and espera > 0.001:
+            self.esperas += 1
+            self.segundos_esperando += espera
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None and self.pool is not None and self.pool.full():
+            self.descartadas += 1
+        super()._put_conn(conn)
+
+class _PoolHTTP(_PoolConMetricas, HTTPConnectionPool):
+    pass
+
+class _PoolHTTPS(_PoolConMetricas, HTTPSConnectionPool):
+    pass
+
+class _AdapterConMetricas(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PoolHTTP, "https": _PoolHTTPS}
+
+# --- 4. CLASE CLIENTE (REFACTORIZACIÓN DE ESTRUCTURA) ---
+MODOS_SESION = ("por_hilo", "con_lock")
+
+class EcoMarketClient:
+    """
+    Cliente síncrono apto para varios hilos (p. ej. los workers de Flask).
+
+    requests.Session no garantiza ser segura entre hilos, pero el pool de
+    urllib3 que vive en el HTTPAdapter sí lo es. Por eso:
+      - modo_sesion="por_hilo" (defecto): cada hilo tiene SU Session (headers,
+        cookies) y todas montan el MISMO adapter -> un solo pool compartido.
+      - modo_sesion="con_lock": una única Session y un lock alrededor de cada
+        petición. Seguro pero serializa; solo si necesitas cookies compartidas.
+
+    pool_connections: cuántos hosts distintos guarda el pool.
+    pool_maxsize: conexiones guardadas POR host (súbelo al número de hilos).
+    pool_block: True -> con el pool agotado el hilo ESPERA una conexión libre
+    en vez de abrir una extra que luego se descarta.
+    """
+
+    def __init__(self, base_url: str, token: str, timeout: int = 5, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_block: bool = False, modo_sesion: str = "por_hilo"):
+        if modo_sesion not in MODOS_SESION:
+            raise ValueError(f"modo_sesion debe ser uno de {MODOS_SESION}")
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.timeout_default = timeout
+        self.modo_sesion = modo_sesion
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.adapter = self._configurar_adapter(pool_connections, pool_maxsize, pool_block)
+
+        self._local = threading.local()
+        # WeakSet: cuando un hilo termina, threading.local suelta su Session y
+        # desaparece de aquí sola (los hilos efímeros no acumulan sesiones)
+        self._sesiones: "weakref.WeakSet[requests.Session]" = weakref.WeakSet()
+        self._lock_registro = threading.Lock()
+        self._lock_sesion = threading.Lock() if modo_sesion == "con_lock" else None
+        self._compartida = self._configurar_sesion_resiliente() if modo_sesion == "con_lock" else None
+        self._en_vuelo = 0
+
+    @property
+    def session(self) -> requests.Session:
+        """La Session que corresponde al hilo actual."""
+        if self._compartida is not None:
+            return self._compartida
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._configurar_sesion_resiliente()
+        return session
+
+    # --- REFACTORIZACIÓN DE RESILIENCIA (Retries) ---
+    def _configurar_adapter(self, pool_connections: int, pool_maxsize: int, pool_block: bool) -> HTTPAdapter:
+        # Definimos la estrategia de reintento
+        retry_strategy = Retry(
+            total=3,                # Intentar 3 veces
+            backoff_factor=1,       # Esperar 1s, 2s, 4s...
+            status_forcelist=[500, 502, 503, 504], # Solo en errores de servidor
+            allowed_methods=["GET", "POST", "PUT", "DELETE"]
+        )
+        return _AdapterConMetricas(max_retries=retry_strategy, pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def _configurar_sesion_resiliente(self) -> requests.Session:
+        session = requests.Session()
+        # Todas las sesiones montan el mismo adapter: comparten el pool de conexiones
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        session.headers.update({"Authorization": f"Bearer {self.token}"})
+        with self._lock_registro:
+            self._sesiones.add(session)
+        return session
+
+    def _contar_en_vuelo(self, delta: int):
+        with self._lock_registro:
+            self._en_vuelo += delta
+
+    # --- ESTADO DEL POOL ---
+    def estado_pool(self) -> dict:
+        """Foto del pool compartido, por host (como SmartSession.get_pool_status en async)."""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for clave in list(pools.keys()):
+            pool = pools.get(clave)
+            if pool is None:
+                continue
+            libres = sum(1 for c in list(pool.pool.queue) if c is not None) if pool.pool is not None else 0
+            hosts[f"{pool.host}:{pool.port}"] = {
+                "creadas": pool.num_connections,
+                "peticiones": pool.num_requests,
+                "libres": libres,
+                "esperas": getattr(pool, "esperas", 0),
+                "segundos_esperando": round(getattr(pool, "segundos_esperando", 0.0), 4),
+                "descartadas": getattr(pool, "descartadas", 0),
+            }
+        return {
+            "modo_sesion": self.modo_sesion,
+            "sesiones": len(self._sesiones),
+            "en_vuelo": self._en_vuelo,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "hosts": hosts,
+        }
+
+    def revisar_pool(self):
+        """Avisa si el pool está mal dimensionado para la concurrencia real."""
+        for host, datos in self.estado_pool()["hosts"].items():
+            if datos["descartadas"]:
+                print(f"⚠️ [{host}] {datos['descartadas']} conexiones descartadas: "
+                      f"sube pool_maxsize (hoy {self.pool_maxsize}) o usa pool_block=True.")
+            elif datos["esperas"]:
+                print(f"⚠️ [{host}] {datos['esperas']} esperas por conexión "
+                      f"({datos['segundos_esperando']:.2f}s en total): el pool es el cuello de botella.")
+            else:
+                print(f"✅ [{host}] Pool saludable: {datos['creadas']} conexiones para {datos['peticiones']} peticiones.")
+
+    def cerrar(self):
+        with self._lock_registro:
+            sesiones, self._sesiones = list(self._sesiones), weakref.WeakSet()
+        for session in sesiones:
+            session.close()
+        # Las Session de hilos ya terminados no siguen en el WeakSet: el pool
+        # compartido se cierra directo, no a través de las que queden
+        self.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
+
+    def _request(self, method: str, endpoint: str, data: dict = None, timeout: int = None):
+        """Método interno centralizado para manejar todas las peticiones."""
+        url = f"{self.base_url}/{endpoint}"
+        # Usamos el timeout configurado o el default de la clase
+        tiempo_espera = timeout if timeout else self.timeout_default
+
+        self._contar_en_vuelo(1)
+        try:
+            # En modo "con_lock" solo un hilo a la vez usa la Session compartida
+            with self._lock_sesion or contextlib.nullcontext():
+                response = self.session.request(
+                    method=method, 
+                    url=url, 
+                    json=data, 
+                    timeout=tiempo_espera
+                )
+            response.raise_for_status() # Lanza error si es 4xx o 5xx
+            return response
+            
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 404:
+                raise RecursoNoEncontrado(f"Recurso no encontrado en {url}")
+            elif e.response.status_code == 409:
+                raise ErrorNegocio(f"Conflicto: {e.response.text}")
+            elif 400 <= e.response.status_code < 500:
+                raise ErrorNegocio(f"Error del cliente ({e.response.status_code}): {e.response.text}")
+            else:
+                raise ErrorConexion(f"Error del servidor: {e}")
+        except requests.exceptions.RetryError:
+            raise ErrorConexion("Se agotaron los reintentos. El servidor no responde.")
+        except requests.exceptions.Timeout:
+            raise ErrorConexion("La petición excedió el tiempo límite.")
+        except Exception as e:
+            raise EcoMarketError(f"Error inesperado: {e}")
+        finally:
+            self._contar_en_vuelo(-1)
+
+    # --- MÉTODOS PÚBLICOS ---
+
+    def listar_productos(self) -> List[ProductoSchema]:
+        """Obtiene la lista y la valida contra el esquema automáticamente."""
+        print("📋 Listando productos...")
+        resp = self._request("GET", "productos")
+        raw_data = resp.json()
+        
+        # AQUÍ OCURRE LA MAGIA DE PYDANTIC
+        # Transforma la lista de dicts en una lista de objetos ProductoSchema
+        try:
+            return [ProductoSchema(**item) for item in raw_data]
+        except ValidationError as e:
+            raise ErrorNegocio(f"El servidor devolvió datos corruptos: {e}")
+
+    def crear_producto(self, datos: dict) -> ProductoSchema:
+        """Valida los datos de entrada ANTES de enviarlos y valida la respuesta."""
+        print(f"✨ Creando producto: {datos.get('nombre')}")
+        
+        # 1. Validamos lo que vamos a enviar (Fail Fast)
+        try:
+            # Creamos el objeto temporalmente solo para validar
+            producto_a_enviar = ProductoSchema(**datos)
+        except ValidationError as e:
+            raise ErrorNegocio(f"Datos de entrada inválidos: {e}")
+
+        # 2. Enviamos (convertimos el modelo a dict)
+        resp = self._request("POST", "productos", data=producto_a_enviar.model_dump())
+        
+        # 3. Validamos lo que vuelve
+        return ProductoSchema(**resp.json())
+
+    def obtener_producto(self, id_p: int) -> Optional[ProductoSchema]:
+        print(f"🔍 Buscando ID {id_p}...")
+        try:
+            resp = self._request("GET", f"productos/{id_p}")
+            return ProductoSchema(**resp.json())
+        except RecursoNoEncontrado:
+            return None
+
+# --- USO DEL CÓDIGO REFACTORIZADO ---
+if __name__ == "__main__":
+    # Configuración (Simulada)
+    URL = os.getenv("ECOMARKET_API_URL", "http://localhost:9999")
+    TOKEN = "token_secreto"
+
+    # Instanciamos la clase (Ahora podemos tener varias si queremos)
+    cliente = EcoMarketClient(base_url=URL, token=TOKEN, timeout=3)
+
+    print("--- 🚀 INICIANDO CLIENTE PROFESIONAL ---")
+
+    try:
+        # 1. Probar Listado
+        productos = cliente.listar_productos()
+        print(f"✅ Se obtuvieron {len(productos)} productos válidos.")
+        for p in productos:
+            print(f"   - {p.nombre} (${p.precio}) [{p.categoria}]")
+
+        # 2. Probar Creación (Con datos válidos)
+        nuevo = {
+            "id": 50,
+            "nombre": "Miel Orgánica",
+            "precio": 120.50,
+            "categoria": "miel",
+            "disponible": True
+        }
+        creado = cliente.crear_producto(nuevo)
+        print(f"✅ Producto creado: {creado.nombre}")
+
+        # 3. Probar Error de Validación (Lógica de Negocio)
+        print("\n--- 🧪 PROBANDO VALIDACIÓN ---")
+        mal_producto = {
+            "id": 51,
+            "nombre": "Uranio",
+            "precio": -50,          # Error: Precio negativo
+            "categoria": "nuclear"  # Error: Categoría inválida
+        }
+        try:
+            cliente.crear_producto(mal_producto)
+        except ErrorNegocio as e:
+            print(f"🛡️ BLOQUEADO CORRECTAMENTE:\n{e}")
+
+    except EcoMarketError as e:
+        print(f"❌ Error fatal en la aplicación: {e}")
\ No newline at end of file
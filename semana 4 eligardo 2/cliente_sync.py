@@ -0,0 +1,132 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Iterator, List, Optional
+from cliente_ecomarket import EcoMarketClient, EcoMarketError
+from modelos import Producto
+
+# ==========================================
+# FACHADA SÍNCRONA SOBRE EL CLIENTE ASÍNCRONO
+# ==========================================
+# Tenemos clientes síncronos (cliente_profesional, el de semana 2) y el
+# asíncrono, con la lógica duplicada y resiliencia dispareja. Esta fachada
+# NO reimplementa nada: arranca UN event loop en un hilo de fondo, abre ahí
+# el EcoMarketClient async y cada método bloqueante le manda la corrutina
+# con run_coroutine_threadsafe y espera el resultado.
+#
+#   with EcoMarketClientSync("http://127.0.0.1:9999", token) as cliente:
+#       productos = cliente.obtener_productos(["1", "2", "3"])   # en paralelo
+#
+# Ventajas para código síncrono (Flask, scripts, hilos):
+#   - Un solo pool de conexiones aiohttp para todos los hilos que la usen.
+#   - Fan-out concurrente real (obtener_productos, cargar_dashboard).
+#   - Mismo logging, métricas, trazas y validación que el cliente async.
+#   - Ningún hilo paga su propio asyncio.run() (crear y cerrar un loop por llamada).
+# No la llames desde DENTRO de un loop: ahí usa el cliente async directamente.
+
+class EcoMarketClientSync:
+    def __init__(self, base_url: str, token: str, timeout: float = 5.0, timeout_llamada: float = None):
+        """
+        timeout: el del cliente async (por petición HTTP).
+        timeout_llamada: tope para CADA método bloqueante (None = sin tope extra);
+        útil en fan-outs largos o paginaciones completas.
+        """
+        self.timeout_llamada = timeout_llamada
+        self._loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self._correr_loop, name="ecomarket-loop", daemon=True)
+        self._hilo.start()
+        self._cerrado = False
+        try:
+            self._cliente = EcoMarketClient(base_url, token, timeout)
+            self._ejecutar(self._cliente.__aenter__())
+        except BaseException:
+            # Sin esto el hilo del loop quedaría vivo para siempre (nadie llamará a cerrar())
+            self._cerrado = True
+            self._detener_loop()
+            raise
+
+    def _correr_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _ejecutar(self, coro) -> Any:
+        if self._cerrado:
+            coro.close()
+            raise EcoMarketError("El cliente ya está cerrado.")
+        if threading.current_thread() is self._hilo:
+            coro.close()
+            raise RuntimeError("Llamada bloqueante desde el loop de la fachada: usa el cliente async.")
+        futuro = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return futuro.result(self.timeout_llamada)
+        except concurrent.futures.TimeoutError:
+            futuro.cancel()   # Cancela la corrutina en el loop, no solo la espera
+            raise EcoMarketError(f"La llamada superó {self.timeout_llamada}s (timeout_llamada).")
+
+    # --- MÉTODOS PÚBLICOS (mismos nombres que el cliente async) ---
+
+    def obtener_producto(self, id_prod: str) -> Optional[Producto]:
+        return self._ejecutar(self._cliente.obtener_producto(id_prod))
+
+    def obtener_productos(self, ids: List[str], max_concurrentes: int = 10) -> List[Optional[Producto]]:
+        return self._ejecutar(self._cliente.obtener_productos(ids, max_concurrentes))
+
+    def listar_productos(self, categoria: str = None, productor_id: str = None) -> List[Producto]:
+        return self._ejecutar(self._cliente.listar_productos(categoria, productor_id))
+
+    def obtener_pagina(self, **kwargs):
+        return self._ejecutar(self._cliente.obtener_pagina(**kwargs))
+
+    def crear_producto(self, datos: dict) -> Producto:
+        return self._ejecutar(self._cliente.crear_producto(datos))
+
+    def actualizar_producto_total(self, id_prod: str, datos: dict) -> Optional[Producto]:
+        return self._ejecutar(self._cliente.actualizar_producto_total(id_prod, datos))
+
+    def actualizar_producto_parcial(self, id_prod: str, campos: dict) -> Optional[Producto]:
+        return self._ejecutar(self._cliente.actualizar_producto_parcial(id_prod, campos))
+
+    def eliminar_producto(self, id_prod: str) -> bool:
+        return self._ejecutar(self._cliente.eliminar_producto(id_prod))
+
+    def cargar_dashboard(self):
+        return self._ejecutar(self._cliente.cargar_dashboard())
+
+    def iterar_catalogo(self, **kwargs) -> Iterator[Producto]:
+        """
+        Generador síncrono sobre iterar_catalogo. El prefetch de páginas sigue
+        corriendo en el loop de fondo mientras el llamador procesa.
+        """
+        agen = self._cliente.iterar_catalogo(**kwargs)
+        try:
+            while True:
+                try:
+                    yield self._ejecutar(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Si el llamador corta el for, cerramos el generador async (cancela el prefetch)
+            if not self._cerrado:
+                self._ejecutar(agen.aclose())
+
+    # --- CICLO DE VIDA ---
+
+    def cerrar(self):
+        if self._cerrado:
+            return
+        try:
+            self._ejecutar(self._cliente.__aexit__(None, None, None))
+        finally:
+            self._cerrado = True
+            self._detener_loop()
+
+    def _detener_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._hilo.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar()
@@ -0,0 +1,57 @@
+import argparse
+import time
+from backends_concurrencia import BACKENDS, crear_backend
+
+# ==========================================
+# COMPARATIVA: SÍNCRONO vs HILOS vs ASÍNCRONO
+# ==========================================
+# Versión de semana 3 reescrita sobre backends_concurrencia: los tres
+# modelos hacen EXACTAMENTE la misma petición y solo cambia cómo se
+# reparten, así la tabla compara modelos de concurrencia y no tres
+# implementaciones distintas. Pensada para correr contra chaos_server_v2.py
+# o servidor_ecomarket.py --fallos fallos_chaos.json (ID 500 lento, 999 falla).
+
+BASE_URL = "http://127.0.0.1:9999"  # IP directa para evitar el error de "getaddrinfo"
+IDS = [1, 500, 2, 999, 3]
+
+ICONOS = {"secuencial": "🐢", "hilos": "🐇", "asyncio": "🚀"}
+
+def mostrar(resultado):
+    if resultado.ok and resultado.datos:
+        print(f"   ✅ ID {resultado.id}: {resultado.datos['nombre']} (${resultado.datos['precio']})")
+    elif resultado.status == 404:
+        print(f"   ⚠️ ID {resultado.id}: No existe")
+    elif resultado.status:
+        print(f"   ❌ ID {resultado.id}: Error servidor ({resultado.status})")
+    else:
+        print(f"   💀 ID {resultado.id}: {resultado.error}")
+
+def correr(nombre: str, base_url: str, ids: list, max_concurrentes: int, timeout: float) -> float:
+    print("\n" + "=" * 40)
+    print(f"{ICONOS[nombre]} MODELO {nombre.upper()}")
+    print("=" * 40)
+    with crear_backend(nombre, base_url, max_concurrentes=max_concurrentes, timeout=timeout) as backend:
+        start = time.perf_counter()
+        resultados = backend.fetch_many(ids)
+        duracion = time.perf_counter() - start
+    for resultado in resultados:
+        mostrar(resultado)
+    return duracion
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara secuencial, hilos y asyncio con la misma petición")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--ids", type=int, nargs="+", default=IDS)
+    parser.add_argument("--concurrencia", type=int, default=10, help="Hilos / conexiones simultáneas")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print("--- INICIANDO COMPARATIVA VISUAL ---")
+    tiempos = {nombre: correr(nombre, args.url, args.ids, args.concurrencia, args.timeout) for nombre in BACKENDS}
+
+    print("\n" + "=" * 40)
+    print("📊 TABLA FINAL DE RESULTADOS")
+    print("=" * 40)
+    for i, (nombre, t) in enumerate(tiempos.items(), 1):
+        print(f"{i}. {ICONOS[nombre]} {nombre.capitalize() + ':':12} {t:.2f} s")
+    print("=" * 40)
@@ -0,0 +1,161 @@
+import numpy as np
+from typing import Dict, List, Optional, Union
+from catalogo_compacto import CatalogoColumnar, ProductoCompacto
+
+# ==========================================
+# MOTOR DE CONSULTAS SOBRE EL CATÁLOGO
+# ==========================================
+# Toma una "foto" columnar del catálogo en arreglos de NumPy y resuelve
+# filtros, ordenamientos y agregaciones de forma vectorizada (sin bucles
+# de Python por producto). Las categorías viajan codificadas como enteros,
+# así que agrupar es un simple np.bincount.
+
+class _Columnas:
+    """Foto inmutable de las columnas del catálogo."""
+
+    def __init__(self, catalogo: CatalogoColumnar):
+        self.catalogo = catalogo
+        # Copiamos: un array.array no puede crecer mientras NumPy lo referencia
+        self.precio = np.frombuffer(catalogo._precios, dtype=np.float64).copy()
+        self.disponible = np.frombuffer(catalogo._disponible, dtype=np.int8).astype(bool)
+        self.categoria = np.frombuffer(catalogo._cod_categoria, dtype=np.uint8).copy()
+        self.productor = np.array(catalogo._cod_productor, dtype=np.int64)
+        self.categorias = list(catalogo._categorias)
+        self.ids_productor = [p.id for p in catalogo._productores]
+
+class ConsultaCatalogo:
+    """
+    Consulta encadenable sobre una foto del catálogo.
+
+    Ejemplo:
+        consulta = ConsultaCatalogo.desde_catalogo(catalogo)
+        baratos = consulta.filtrar(categoria="miel", disponible=True, precio_max=200)
+        baratos.ordenar_por("precio").limitar(10).productos()
+    """
+
+    def __init__(self, columnas: _Columnas, seleccion: np.ndarray = None):
+        self._col = columnas
+        if seleccion is None:
+            seleccion = np.arange(len(columnas.precio), dtype=np.intp)
+        self._sel = seleccion
+
+    @classmethod
+    def desde_catalogo(cls, catalogo: CatalogoColumnar) -> "ConsultaCatalogo":
+        return cls(_Columnas(catalogo))
+
+    @classmethod
+    def desde_productos(cls, productos) -> "ConsultaCatalogo":
+        return cls.desde_catalogo(CatalogoColumnar.desde_productos(productos))
+
+    # --- FILTROS ---
+
+    @staticmethod
+    def _codigos(valores: Union[str, List[str]], diccionario: List[str]) -> np.ndarray:
+        """Traduce valores (ej. nombres de categoría) a sus códigos enteros."""
+        buscados = {valores} if isinstance(valores, str) else set(valores)
+        return np.array([i for i, v in enumerate(diccionario) if v in buscados], dtype=np.int64)
+
+    def filtrar(self, categoria: Union[str, List[str]] = None, disponible: Optional[bool] = None,
+                precio_min: float = None, precio_max: float = None,
+                productor_id: Union[str, List[str]] = None) -> "ConsultaCatalogo":
+        """Devuelve una nueva consulta con las filas que cumplen TODAS las condiciones."""
+        sel = self._sel
+        mascara = np.ones(len(sel), dtype=bool)
+
+        if categoria is not None:
+            # Producto guarda las categorías en minúsculas
+            categoria = categoria.lower() if isinstance(categoria, str) else [c.lower() for c in categoria]
+            codigos = self._codigos(categoria, self._col.categorias)
+            mascara &= np.isin(self._col.categoria[sel], codigos)
+        if disponible is not None:
+            mascara &= self._col.disponible[sel] == disponible
+        if precio_min is not None:
+            mascara &= self._col.precio[sel] >= precio_min
+        if precio_max is not None:
+            mascara &= self._col.precio[sel] <= precio_max
+        if productor_id is not None:
+            codigos = self._codigos(productor_id, self._col.ids_productor)
+            mascara &= np.isin(self._col.productor[sel], codigos)
+
+        return ConsultaCatalogo(self._col, sel[mascara])
+
+    # --- ORDEN Y RECORTE ---
+
+    def ordenar_por(self, campo: str = "precio", descendente: bool = False) -> "ConsultaCatalogo":
+        columnas = {
+            "precio": self._col.precio,
+            "categoria": self._col.categoria,
+            "disponible": self._col.disponible,
+        }
+        if campo not in columnas:
+            raise ValueError(f"No se puede ordenar por '{campo}'. Opciones: {list(columnas)}")
+        valores = columnas[campo][self._sel]
+        if campo == "categoria":
+            # Los códigos siguen el orden de aparición: los traducimos a su rango alfabético
+            rango = np.empty(len(self._col.categorias), dtype=np.int64)
+            rango[np.argsort(self._col.categorias, kind="stable")] = np.arange(len(rango))
+            valores = rango[valores]
+        orden = np.argsort(valores, kind="stable")
+        if descendente:
+            orden = orden[::-1]
+        return ConsultaCatalogo(self._col, self._sel[orden])
+
+    def limitar(self, n: int) -> "ConsultaCatalogo":
+        return ConsultaCatalogo(self._col, self._sel[:n])
+
+    # --- RESULTADOS ---
+
+    def contar(self) -> int:
+        return int(len(self._sel))
+
+    def __len__(self) -> int:
+        return self.contar()
+
+    def ids(self) -> List[str]:
+        ids = self._col.catalogo._ids
+        return [ids[i] for i in self._sel.tolist()]
+
+    def productos(self) -> List[ProductoCompacto]:
+        catalogo = self._col.catalogo
+        return [ProductoCompacto(catalogo, i) for i in self._sel.tolist()]
+
+    def precio_promedio(self) -> Optional[float]:
+        if len(self._sel) == 0:
+            return None
+        return float(self._col.precio[self._sel].mean())
+
+    # --- AGREGACIONES ---
+
+    def agrupar_por_categoria(self) -> Dict[str, dict]:
+        """
+        Conteo, precio promedio/mín/máx y agotados por categoría.
+
+        Todo sale de np.bincount sobre los códigos de categoría: una sola
+        pasada vectorizada sin importar cuántos productos haya.
+        """
+        n_cat = len(self._col.categorias)
+        codigos = self._col.categoria[self._sel]
+        precios = self._col.precio[self._sel]
+
+        conteo = np.bincount(codigos, minlength=n_cat)
+        suma = np.bincount(codigos, weights=precios, minlength=n_cat)
+        sin_stock = (~self._col.disponible[self._sel]).astype(np.float64)
+        agotados = np.bincount(codigos, weights=sin_stock, minlength=n_cat)
+
+        minimo = np.full(n_cat, np.inf)
+        maximo = np.full(n_cat, -np.inf)
+        np.minimum.at(minimo, codigos, precios)
+        np.maximum.at(maximo, codigos, precios)
+
+        resultado = {}
+        for codigo, nombre in enumerate(self._col.categorias):
+            if conteo[codigo] == 0:
+                continue
+            resultado[nombre] = {
+                "conteo": int(conteo[codigo]),
+                "precio_promedio": float(suma[codigo] / conteo[codigo]),
+                "precio_min": float(minimo[codigo]),
+                "precio_max": float(maximo[codigo]),
+                "agotados": int(agotados[codigo]),
+            }
+        return resultado
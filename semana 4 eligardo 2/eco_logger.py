@@ -0,0 +1,470 @@
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import time
+from functools import lru_cache
+import metricas
+
+# --- CONFIGURACIÓN DEL SISTEMA DE LOGS ---
+# Pipeline NO bloqueante: el hilo que hace la petición solo mete el
+# LogRecord en una cola (unos microsegundos). Un QueueListener en otro
+# hilo lo formatea como JSON y lo escribe. El texto del mensaje se arma
+# de forma perezosa (logger.info("%s", ...)), solo cuando se emite.
+logger = logging.getLogger("EcoMarketMonitor")
+
+NIVEL = logging.INFO        # INFO muestra resumen. Cambia a DEBUG para ver headers.
+MUESTREO_EXITO = 1.0        # Fracción de éxitos que se registran (0.1 = 1 de cada 10)
+UMBRAL_LENTO_MS = 2000      # A partir de aquí una petición exitosa es "SLOW REQ"
+
+# Claves sensibles para censurar en los logs. Se comparan normalizadas
+# (minúsculas, sin '-' ni '_') y por contenido: "X-Api-Key", "access_token"
+# y "client_secret" también caen.
+SENSITIVE_KEYS = {'authorization', 'token', 'apikey', 'password', 'passwd', 'secret', 'cookie'}
+
+# Campos estructurados que viajan en cada registro de petición
+CAMPOS_PETICION = ("evento", "method", "url", "status", "duration_ms", "size", "tiempos", "error")
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro (JSON Lines), fácil de indexar."""
+
+    def format(self, record):
+        entrada = {
+            "ts": self.formatTime(record, '%Y-%m-%dT%H:%M:%S%z'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for campo in CAMPOS_PETICION:
+            valor = getattr(record, campo, None)
+            if isinstance(valor, Redactado):
+                valor = valor.valor()
+            if valor is not None:
+                entrada[campo] = valor
+        if record.exc_info:
+            entrada["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+class _QueueHandlerPerezoso(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formatea el mensaje en el hilo que loguea.
+    Nosotros encolamos el registro tal cual: el formateo lo hace el listener.
+    """
+
+    def prepare(self, record):
+        return record
+
+_listener = None
+
+def configurar_pipeline(destino: logging.Handler = None, nivel: int = None,
+                        muestreo_exito: float = None) -> logging.handlers.QueueListener:
+    """
+    (Re)configura el pipeline de logs. Por defecto escribe JSON Lines a stderr.
+
+    Args:
+        destino: Handler final (archivo, stream...). Se le asigna FormateadorJSON si no tiene formateador.
+        nivel: Nivel mínimo del logger.
+        muestreo_exito: Fracción de peticiones exitosas que se registran.
+    """
+    global _listener, MUESTREO_EXITO
+    detener_pipeline()
+
+    if muestreo_exito is not None:
+        MUESTREO_EXITO = muestreo_exito
+    destino = destino or logging.StreamHandler()
+    if destino.formatter is None:
+        destino.setFormatter(FormateadorJSON())
+
+    cola = queue.SimpleQueue()
+    logger.handlers = [_QueueHandlerPerezoso(cola)]
+    logger.setLevel(nivel if nivel is not None else NIVEL)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(cola, destino, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def detener_pipeline():
+    """Vacía la cola y detiene el hilo escritor (se llama solo al salir)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(detener_pipeline)
+configurar_pipeline()
+
+# --- MOTOR DE REDACCIÓN ---
+# Antes: copiar el dict de headers y hacer lower() de cada clave en CADA
+# llamada, y solo para dicts planos. Ahora:
+#   - La decisión "¿esta clave es sensible?" se calcula una vez por clave
+#     (lru_cache); las claves de headers se repiten siempre.
+#   - Recorre JSON anidado (dicts y listas) y solo copia lo que cambia.
+#   - En textos (URLs, mensajes de error) censura parámetros de query
+#     sensibles (?token=...), credenciales user:pass@ y "Bearer xxx".
+#   - Es perezosa: el decorador envuelve los valores en Redactado y la
+#     censura se hace al formatear, en el hilo del listener. Si el registro
+#     se descarta (nivel, muestreo) no se paga nada.
+
+_RE_SENSIBLE = None
+
+def configurar_redaccion(claves=None):
+    """Cambia el conjunto de claves sensibles (recompila y limpia la caché)."""
+    global _RE_SENSIBLE, SENSITIVE_KEYS
+    if claves is not None:
+        SENSITIVE_KEYS = set(claves)
+    normalizadas = sorted({re.sub(r"[-_]", "", k.lower()) for k in SENSITIVE_KEYS})
+    _RE_SENSIBLE = re.compile("|".join(map(re.escape, normalizadas)))
+    clave_sensible.cache_clear()
+    _redactar_texto_corto.cache_clear()
+
+@lru_cache(maxsize=2048)
+def clave_sensible(clave) -> bool:
+    normalizada = str(clave).lower().replace("-", "").replace("_", "")
+    return _RE_SENSIBLE.search(normalizada) is not None
+
+def _censurar(valor) -> str:
+    return f"{str(valor)[:4]}...[REDACTED]"
+
+# Un solo escaneo decide si vale la pena mirar el texto con más cuidado
+_RE_SOSPECHOSO = re.compile(r"[?&;@]|bearer|basic", re.IGNORECASE)
+_RE_QUERY = re.compile(r"([?&;])([^=&#\s?]+)=([^&#\s;]*)")
+_RE_CREDENCIALES_URL = re.compile(r"(://[^/\s:@]+):[^/\s@]+@")
+_RE_ESQUEMA_AUTH = re.compile(r"\b(bearer|basic)\s+([A-Za-z0-9\-._~+/]+=*)", re.IGNORECASE)
+
+def _parametro_query(m) -> str:
+    if clave_sensible(m.group(2)):
+        return f"{m.group(1)}{m.group(2)}={_censurar(m.group(3))}"
+    return m.group(0)
+
+def redactar_texto(texto: str) -> str:
+    """Devuelve el mismo objeto si no había nada que censurar."""
+    if len(texto) <= 512:
+        return _redactar_texto_corto(texto)   # valores de headers y URLs se repiten mucho
+    return _redactar_texto(texto)
+
+def _redactar_texto(texto: str) -> str:
+    if not _RE_SOSPECHOSO.search(texto):
+        return texto
+    nuevo = _RE_QUERY.sub(_parametro_query, texto)
+    nuevo = _RE_CREDENCIALES_URL.sub(r"\1:[REDACTED]@", nuevo)
+    nuevo = _RE_ESQUEMA_AUTH.sub(lambda m: f"{m.group(1)} {_censurar(m.group(2))}", nuevo)
+    return texto if nuevo == texto else nuevo
+
+_redactar_texto_corto = lru_cache(maxsize=4096)(_redactar_texto)
+
+def redactar(data):
+    """
+    Oculta datos sensibles en dicts/listas anidados y en textos.
+    Devuelve el MISMO objeto si no había nada que censurar (sin copias).
+    """
+    if isinstance(data, dict):
+        limpio = None
+        for k, v in data.items():
+            if clave_sensible(k):
+                nuevo = _censurar(v)
+            elif type(v) is str:
+                nuevo = redactar_texto(v)
+            elif isinstance(v, (dict, list, tuple)):
+                nuevo = redactar(v)
+            else:
+                continue
+            if nuevo is not v:
+                if limpio is None:
+                    limpio = dict(data)
+                limpio[k] = nuevo
+        return data if limpio is None else limpio
+    if isinstance(data, (list, tuple)):
+        nuevos = [redactar(v) for v in data]
+        if all(n is v for n, v in zip(nuevos, data)):
+            return data
+        return type(data)(nuevos)
+    if isinstance(data, str):
+        return redactar_texto(data)
+    return data
+
+class Redactado:
+    """
+    Envoltorio perezoso: guarda la referencia y censura recién al formatear
+    (str() para el mensaje, valor() para los campos JSON).
+    Ojo: no copia; no mutes el objeto después de loguearlo.
+    """
+    __slots__ = ("_original",)
+
+    def __init__(self, original):
+        self._original = original
+
+    def valor(self):
+        return redactar(self._original)
+
+    def __str__(self):
+        return str(self.valor())
+
+    __repr__ = __str__
+
+configurar_redaccion()
+
+# --- MEDICIÓN POR PETICIÓN ---
+# El decorador abre una "medición" (dict) en una ContextVar; los hooks de
+# TraceConfig de aiohttp corren dentro de la misma tarea, así que la ven y
+# van anotando DNS, conexión, primer byte y bytes recibidos. Cada tarea
+# tiene su propio contexto: peticiones concurrentes no se pisan.
+_medicion_actual = contextvars.ContextVar("medicion_http", default=None)
+
+def _ms(desde, hasta):
+    return round((hasta - desde) * 1000, 2) if desde is not None and hasta is not None else None
+
+def crear_trace_config():
+    """
+    TraceConfig para aiohttp.ClientSession(trace_configs=[...]).
+
+    Tiempos que se anotan (ms):
+      dns           resolución del host (0 llamadas si estaba en caché)
+      conexion      apertura del socket; en HTTPS incluye el handshake TLS
+                    (aiohttp no expone un hook aparte para TLS)
+      ttfb          desde el envío hasta recibir las cabeceras de respuesta
+      transferencia desde las cabeceras hasta el último trozo del cuerpo
+    """
+    import aiohttp  # Solo hace falta en el cliente asíncrono
+
+    def _medicion():
+        return _medicion_actual.get()
+
+    async def inicio_peticion(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m.update(t_inicio=time.perf_counter(), method=params.method, url=str(params.url))
+
+    async def inicio_dns(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["t_dns"] = time.perf_counter()
+
+    async def fin_dns(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["dns"] = _ms(m.get("t_dns"), time.perf_counter())
+
+    async def inicio_conexion(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["t_conexion"] = time.perf_counter()
+
+    async def fin_conexion(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["conexion"] = _ms(m.get("t_conexion"), time.perf_counter())
+
+    async def conexion_reusada(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["reusada"] = True
+
+    async def fin_peticion(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["t_cabeceras"] = time.perf_counter()
+            m["ttfb"] = _ms(m.get("t_inicio"), m["t_cabeceras"])
+            m["status"] = params.response.status
+            m["content_length"] = params.response.content_length
+
+    async def trozo_recibido(session, ctx, params):
+        m = _medicion()
+        if m is not None:
+            m["bytes"] = m.get("bytes", 0) + len(params.chunk)
+            m["t_ultimo_trozo"] = time.perf_counter()
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(inicio_peticion)
+    trace.on_dns_resolvehost_start.append(inicio_dns)
+    trace.on_dns_resolvehost_end.append(fin_dns)
+    trace.on_connection_create_start.append(inicio_conexion)
+    trace.on_connection_create_end.append(fin_conexion)
+    trace.on_connection_reuseconn.append(conexion_reusada)
+    trace.on_request_end.append(fin_peticion)
+    trace.on_response_chunk_received.append(trozo_recibido)
+    return trace
+
+def _extractor_argumentos(func):
+    """
+    Devuelve una función que saca (method, url) de los argumentos de 'func'.
+    Se resuelve con inspect.signature una sola vez al decorar, así funciona
+    igual con funciones sueltas (method, url, ...) que con métodos como
+    _request(self, method, endpoint, ...).
+    """
+    try:
+        firma = inspect.signature(func)
+    except (TypeError, ValueError):
+        firma = None
+
+    def extraer(args, kwargs):
+        if firma is None:
+            return (args[0] if args else kwargs.get('method', '???'),
+                    args[1] if len(args) > 1 else kwargs.get('url', '???'))
+        try:
+            valores = firma.bind_partial(*args, **kwargs).arguments
+        except TypeError:
+            return '???', '???'
+        return (valores.get('method', '???'),
+                valores.get('url', valores.get('endpoint', '???')))
+
+    return extraer
+
+def auditar_peticion_http(func):
+    """
+    DECORADOR: Mide tiempo, status y tamaño de cada petición automáticamente.
+
+    Sirve para funciones normales (requests) y corrutinas (aiohttp). En las
+    corrutinas el status, el tamaño y el desglose de tiempos llegan por los
+    hooks de crear_trace_config(), porque la función puede devolver ya el JSON
+    parseado en vez de la respuesta.
+    """
+    extraer = _extractor_argumentos(func)
+
+    def _log_salida(args, kwargs):
+        method, url = extraer(args, kwargs)
+        # Log de entrada (solo nivel DEBUG): la censura se hace al formatear, no aquí
+        if logger.isEnabledFor(logging.DEBUG):
+            _emitir(logging.DEBUG, "🛫 OUTGOING: %s %s | Headers: %s",
+                    (method, Redactado(url), Redactado(kwargs.get('headers', {}))),
+                    {"evento": "OUTGOING", "method": method, "url": Redactado(url)})
+        return method, url
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper_async(*args, **kwargs):
+            method, url = _log_salida(args, kwargs)
+            medicion = {}
+            token = _medicion_actual.set(medicion)
+            start_time = time.perf_counter()
+            response = None
+            error_capturado = None
+            try:
+                response = await func(*args, **kwargs)
+                return response
+            except Exception as e:
+                error_capturado = e
+                raise
+            finally:
+                _medicion_actual.reset(token)
+                _registrar(medicion.get("method", method), medicion.get("url", url),
+                           response, error_capturado, start_time, medicion)
+        return wrapper_async
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # 1. Preparación
+        method, url = _log_salida(args, kwargs)
+
+        start_time = time.perf_counter()
+        response = None
+        error_capturado = None
+
+        try:
+            # 2. Ejecución real
+            response = func(*args, **kwargs)
+            return response
+
+        except Exception as e:
+            error_capturado = e
+            raise # Pasamos el error al cliente para que decida qué hacer
+
+        finally:
+            # 3. Reporte Post-Mortem
+            _registrar(method, url, response, error_capturado, start_time)
+
+    return wrapper
+
+def _registrar(method, url, response, error, start_time, medicion=None):
+    fin = time.perf_counter()
+    duration_ms = (fin - start_time) * 1000
+    if medicion and "status" in medicion:
+        status = medicion["status"]
+    else:
+        status = _status_respuesta(response)
+
+    # Métricas: TODAS las peticiones (el muestreo solo aplica al log)
+    metricas.REGISTRO.observar(method, url, status, duration_ms, error=True if error else None)
+
+    # Semáforo de logs
+    if error or status >= 500:
+        nivel, evento = logging.ERROR, "FAILED"
+    elif 400 <= status < 500:
+        nivel, evento = logging.ERROR, "CLIENT_ERR"
+    elif duration_ms > UMBRAL_LENTO_MS:
+        nivel, evento = logging.WARNING, "SLOW_REQ"
+    else:
+        nivel, evento = logging.INFO, "SUCCESS"
+        # Muestreo: los éxitos son la mayoría del volumen y los menos interesantes
+        if MUESTREO_EXITO < 1.0 and random.random() >= MUESTREO_EXITO:
+            return
+
+    if not logger.isEnabledFor(nivel):
+        return
+
+    if medicion:
+        size = medicion.get("bytes", medicion.get("content_length"))
+        tiempos = _tiempos(medicion, fin)
+    else:
+        size = _tamano_respuesta(response)
+        tiempos = None
+    url = Redactado(url)   # Las URLs pueden traer ?token=... en la query
+    _emitir(
+        nivel, "%s %s %s | Status: %s | Time: %.2fms | Size: %sB",
+        (evento, method, url, status, duration_ms, "?" if size is None else size),
+        {
+            "evento": evento, "method": method, "url": url, "status": status,
+            "duration_ms": round(duration_ms, 2), "size": size, "tiempos": tiempos,
+            "error": Redactado(repr(error)) if error else None,
+        },
+    )
+
+def _tiempos(medicion, fin):
+    tiempos = {
+        "dns": medicion.get("dns"),
+        "conexion": medicion.get("conexion"),
+        "ttfb": medicion.get("ttfb"),
+        "transferencia": _ms(medicion.get("t_cabeceras"), medicion.get("t_ultimo_trozo", fin)),
+        "reusada": medicion.get("reusada", False),
+    }
+    return {k: v for k, v in tiempos.items() if v is not None}
+
+def _emitir(nivel, msg, args, campos):
+    """
+    Igual que logger.log(...) pero sin findCaller(): recorrer la pila para
+    saber archivo/línea es lo más caro de crear un LogRecord y aquí no aporta
+    (siempre sería este módulo).
+    """
+    record = logger.makeRecord(logger.name, nivel, "eco_logger", 0, msg, args, None, extra=campos)
+    logger.handle(record)
+
+def _status_respuesta(response) -> int:
+    if response is None:
+        return 0
+    status = getattr(response, "status_code", None)     # requests
+    if status is None:
+        status = getattr(response, "status", 0)         # aiohttp
+    return status if isinstance(status, int) else 0
+
+def _tamano_respuesta(response):
+    """
+    Tamaño SIN forzar la descarga del cuerpo: Content-Length si viene; si no,
+    solo medimos el cuerpo cuando el llamador ya lo leyó. None = desconocido.
+    """
+    if response is None:
+        return 0
+    largo = getattr(response, "content_length", None)   # aiohttp
+    if largo is not None:
+        return largo
+    cabeceras = getattr(response, "headers", None) or {}
+    if cabeceras.get("Content-Length", "").isdigit():
+        return int(cabeceras["Content-Length"])
+    if getattr(response, "_content_consumed", False) and response.content is not None:
+        return len(response.content)                     # requests, ya leído
+    return None
@@ -0,0 +1,203 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+from pydantic import ValidationError
+from modelos import Producto
+
+# ==========================================
+# CREACIÓN MASIVA POR LOTES
+# ==========================================
+# crear_multiples_productos mandaba un POST por producto bajo un semáforo:
+# importar 50k productos = 50k viajes de ida y vuelta. Aquí:
+#   1. Se valida TODO antes de enviar nada (un inválido no gasta red).
+#   2. Los válidos se agrupan por cantidad (tamano_lote) y por bytes (max_bytes).
+#   3. Cada grupo va a POST /productos/lote. Si el servidor no lo tiene
+#      (404/405/501) se recuerda en cliente.soporta_lote y se cae a POST
+#      individuales concurrentes.
+#   4. El resultado es POR ITEM: si falla una parte, se reenvía solo esa
+#      (ResultadoLote.por_reenviar), no el lote entero.
+
+STATUS_SIN_LOTE = (404, 405, 501)
+RUTA_LOTE = "productos/lote"
+
+@dataclass
+class ResultadoItem:
+    indice: int
+    status: Optional[int] = None
+    producto: Optional[Producto] = None
+    error: Optional[str] = None
+    invalido: bool = False     # Rechazado por validación local: nunca se envió
+    incierto: bool = False     # El servidor lo recibió pero su respuesta no dice qué pasó
+
+    @property
+    def ok(self) -> bool:
+        # Un 2xx con un producto que no pudimos leer tampoco cuenta como creado
+        return self.status is not None and 200 <= self.status < 300 and self.error is None
+
+    @property
+    def reintentable(self) -> bool:
+        """Error de red o del servidor (5xx/429): reenviarlo puede funcionar."""
+        if self.ok or self.invalido or self.incierto:
+            return False   # Un incierto probablemente ya se creó: reenviarlo lo duplicaría
+        return self.status is None or self.status >= 500 or self.status == 429
+
+@dataclass
+class ResultadoLote:
+    items: List[ResultadoItem]
+    peticiones: int = 0
+    modos: set = field(default_factory=set)   # {"lote"}, {"individual"} o ambos
+    errores_lote: List[str] = field(default_factory=list)   # Respuestas de lote que no se pudieron leer
+
+    @property
+    def creados(self) -> List[Producto]:
+        return [i.producto for i in self.items if i.ok]
+
+    @property
+    def fallidos(self) -> List[ResultadoItem]:
+        return [i for i in self.items if not i.ok]
+
+    def por_reenviar(self, productos: List[dict]) -> List[dict]:
+        """Los datos originales de los items que vale la pena volver a mandar."""
+        return [productos[i.indice] for i in self.items if i.reintentable]
+
+    def resumen(self) -> str:
+        return (f"{len(self.creados)}/{len(self.items)} creados, {len(self.fallidos)} fallidos, "
+                f"{self.peticiones} peticiones ({'+'.join(sorted(self.modos)) or 'ninguna'})")
+
+def agrupar(tamanos: List[int], max_items: int, max_bytes: int) -> List[List[int]]:
+    """
+    Parte los índices 0..n-1 en grupos de a lo sumo max_items y max_bytes
+    (un item más grande que max_bytes va solo en su grupo).
+    """
+    grupos, actual, bytes_actual = [], [], 0
+    for indice, tamano in enumerate(tamanos):
+        if actual and (len(actual) >= max_items or bytes_actual + tamano > max_bytes):
+            grupos.append(actual)
+            actual, bytes_actual = [], 0
+        actual.append(indice)
+        bytes_actual += tamano + 1    # +1 por la coma del arreglo
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+class EscritorLotes:
+    def __init__(self, cliente, tamano_lote: int = 500, max_bytes: int = 512 * 1024,
+                 max_concurrentes: int = 4, max_concurrentes_individual: int = 10):
+        if tamano_lote < 1 or max_bytes < 1:
+            raise ValueError("tamano_lote y max_bytes deben ser positivos")
+        self.cliente = cliente
+        self.tamano_lote = tamano_lote
+        self.max_bytes = max_bytes
+        self._sem_lote = asyncio.Semaphore(max_concurrentes)
+        self._sem_individual = asyncio.Semaphore(max_concurrentes_individual)
+
+    async def crear(self, productos: List[dict]) -> ResultadoLote:
+        self._productos = productos
+        self._resultado = ResultadoLote([ResultadoItem(i) for i in range(len(productos))])
+
+        validos = self._validar()
+        tamanos = [len(json.dumps(productos[i], ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                   for i in validos]
+        grupos = [[validos[j] for j in grupo] for grupo in agrupar(tamanos, self.tamano_lote, self.max_bytes)]
+
+        # Si aún no sabemos si existe el endpoint, el primer grupo lo averigua solo
+        if grupos and self.cliente.soporta_lote is None:
+            await self._procesar_grupo(grupos.pop(0))
+        await asyncio.gather(*(self._procesar_grupo(g) for g in grupos))
+        return self._resultado
+
+    def _validar(self) -> List[int]:
+        validos = []
+        for i, datos in enumerate(self._productos):
+            try:
+                Producto(**{**datos, "id": "temp"})
+                validos.append(i)
+            except (ValidationError, TypeError) as e:
+                item = self._resultado.items[i]
+                item.invalido, item.error = True, f"Datos de entrada inválidos: {e}"
+        return validos
+
+    async def _procesar_grupo(self, grupo: List[int]):
+        if self.cliente.soporta_lote is not False:
+            async with self._sem_lote:
+                if await self._enviar_lote(grupo):
+                    return
+        await asyncio.gather(*(self._crear_uno(i) for i in grupo))
+
+    async def _enviar_lote(self, grupo: List[int]) -> bool:
+        """True si el lote se procesó (bien o mal); False si el servidor no tiene endpoint de lote."""
+        self._resultado.peticiones += 1
+        try:
+            data = await self.cliente._request("POST", RUTA_LOTE, data={"items": [self._productos[i] for i in grupo]})
+        except Exception as e:
+            if getattr(e, "status", None) in STATUS_SIN_LOTE:
+                self.cliente.soporta_lote = False
+                return False
+            self._fallar(grupo, e)
+            return True
+        if data is None:   # El cliente traduce 404 a None
+            self.cliente.soporta_lote = False
+            return False
+
+        self.cliente.soporta_lote = True
+        self._resultado.modos.add("lote")
+        resultados = data.get("resultados", []) if isinstance(data, dict) else []
+        if len(resultados) != len(grupo):
+            # El servidor SÍ recibió el lote: no sabemos cuáles creó, así que no se reenvían
+            mensaje = f"El lote devolvió {len(resultados)} resultados para {len(grupo)} items"
+            self._resultado.errores_lote.append(mensaje)
+            for indice in grupo:
+                self._marcar_incierto(self._resultado.items[indice], mensaje)
+            return True
+        for indice, r in zip(grupo, resultados):
+            item = self._resultado.items[indice]
+            if not isinstance(r, dict):
+                self._marcar_incierto(item, f"Resultado de lote inválido: {r!r}")
+                continue
+            status = r.get("status")
+            if isinstance(status, str) and status.isdigit():
+                status = int(status)
+            if not isinstance(status, int) or isinstance(status, bool):
+                self._marcar_incierto(item, f"Status inválido en el resultado del lote: {status!r}")
+                continue
+            item.status = status
+            if item.ok:
+                self._registrar_producto(item, r.get("producto"))
+            else:
+                item.error = r.get("error", f"HTTP {item.status}")
+        return True
+
+    async def _crear_uno(self, indice: int):
+        item = self._resultado.items[indice]
+        async with self._sem_individual:
+            self._resultado.peticiones += 1
+            self._resultado.modos.add("individual")
+            try:
+                data = await self.cliente._request("POST", "productos", data=self._productos[indice])
+            except Exception as e:
+                item.status, item.error = getattr(e, "status", None), str(e)
+                return
+            if data is None:   # El cliente traduce 404 a None: no es reintentable
+                item.status, item.error = 404, "HTTP 404: el servidor no encontró la ruta de creación"
+                return
+            item.status = 201
+            self._registrar_producto(item, data)
+
+    @staticmethod
+    def _marcar_incierto(item: ResultadoItem, motivo: str):
+        item.incierto, item.error = True, motivo
+
+    @staticmethod
+    def _registrar_producto(item: ResultadoItem, datos):
+        # El servidor ya lo creó: si su respuesta no es un Producto válido lo
+        # anotamos en el item (sin status 5xx, así no se reenvía y duplica)
+        try:
+            item.producto = Producto(**datos)
+        except (ValidationError, KeyError, TypeError) as e:
+            item.error = f"Respuesta inválida del servidor: {e}"
+
+    def _fallar(self, grupo: List[int], error: Exception):
+        for indice in grupo:
+            item = self._resultado.items[indice]
+            item.status, item.error = getattr(error, "status", None), str(error)
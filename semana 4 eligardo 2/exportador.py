@@ -0,0 +1,116 @@
+import asyncio
+from typing import AsyncIterator, List
+from modelos import Producto, CATEGORIAS_VALIDAS
+from limitador_async import LimitadorConcurrencia, LimitadorTasa
+from cliente_ecomarket import EcoMarketClient
+
+# ==========================================
+# EXPORTACIÓN PARALELA DEL CATÁLOGO
+# ==========================================
+# En vez de un solo flujo secuencial, partimos el catálogo en "franjas"
+# independientes y las pedimos a la vez, respetando los límites de
+# concurrencia y de tasa. Los resultados se mezclan en un único flujo
+# sin duplicados (un producto puede aparecer en dos franjas si cambia
+# de página mientras exportamos).
+
+PARTICIONES_VALIDAS = ("categoria", "paginas", "productor")
+
+def _crear_particiones(particion: str, productores: List[str] = None, franjas: int = 4) -> List[dict]:
+    if particion == "categoria":
+        return [{"categoria": c} for c in sorted(CATEGORIAS_VALIDAS)]
+    if particion == "productor":
+        if not productores:
+            raise ValueError("La partición por productor necesita la lista de 'productores'.")
+        return [{"productor_id": p} for p in productores]
+    if particion == "paginas":
+        if franjas < 1:
+            raise ValueError("Se necesita al menos una franja de páginas.")
+        # Franja k toma las páginas k+1, k+1+franjas, k+1+2*franjas...
+        return [{"pagina_inicial": k + 1, "salto": franjas} for k in range(franjas)]
+    raise ValueError(f"Partición desconocida: {particion}. Opciones: {PARTICIONES_VALIDAS}")
+
+async def exportar_catalogo(cliente: EcoMarketClient, particion: str = "categoria",
+                            productores: List[str] = None, franjas: int = 4,
+                            limite: int = 100, concurrencia: int = 5,
+                            tasa: float = 20) -> AsyncIterator[Producto]:
+    """
+    Descarga todo el catálogo en paralelo y lo entrega como un solo flujo.
+
+    Args:
+        particion: "categoria" (una franja por categoría válida), "paginas"
+            (franjas de páginas intercaladas) o "productor".
+        productores: IDs de productor (solo para particion="productor").
+        franjas: Número de franjas para particion="paginas".
+        limite: Productos por página.
+        concurrencia: Máximo de páginas en vuelo a la vez.
+        tasa: Máximo de peticiones por segundo.
+    """
+    particiones = _crear_particiones(particion, productores, franjas)
+    limitador_concurrencia = LimitadorConcurrencia(concurrencia)
+    limitador_tasa = LimitadorTasa(tasa)
+
+    # Cola acotada: si el consumidor es lento, las franjas se frenan solas
+    cola = asyncio.Queue(maxsize=concurrencia * 2)
+    fin = object()
+
+    async def pedir_pagina(**kwargs):
+        async with limitador_concurrencia:
+            async with limitador_tasa:
+                return await cliente.obtener_pagina(limite=limite, **kwargs)
+
+    async def recorrer(filtro: dict):
+        pagina = filtro.pop("pagina_inicial", 1)
+        salto = filtro.pop("salto", None)
+        while pagina is not None:
+            productos, siguiente = await pedir_pagina(pagina=pagina, **filtro)
+            if productos:
+                await cola.put(productos)
+            if siguiente is None:
+                return
+            pagina = pagina + salto if salto else siguiente
+
+    async def supervisor():
+        tareas = [asyncio.create_task(recorrer(dict(p))) for p in particiones]
+        try:
+            await asyncio.gather(*tareas)
+            await cola.put(fin)
+        except Exception as e:
+            # Falla una franja = falla la exportación (no entregamos un catálogo incompleto)
+            for t in tareas:
+                t.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            await cola.put(e)
+        except asyncio.CancelledError:
+            for t in tareas:
+                t.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            raise
+
+    tarea_supervisor = asyncio.create_task(supervisor())
+    vistos = set()
+    try:
+        while True:
+            item = await cola.get()
+            if item is fin:
+                return
+            if isinstance(item, Exception):
+                raise item
+            for producto in item:
+                if producto.id in vistos:
+                    continue
+                vistos.add(producto.id)
+                yield producto
+    finally:
+        tarea_supervisor.cancel()
+        await asyncio.gather(tarea_supervisor, return_exceptions=True)
+
+async def exportar_catalogo_a_archivo(cliente: EcoMarketClient, ruta: str, **kwargs) -> int:
+    """Exporta el catálogo a un archivo JSON Lines (un producto por línea). Retorna cuántos escribió."""
+    total = 0
+    with open(ruta, "w", encoding="utf-8") as f:
+        async for producto in exportar_catalogo(cliente, **kwargs):
+            f.write(producto.model_dump_json())
+            f.write("\n")
+            total += 1
+    print(f"📦 Catálogo exportado: {total} productos en '{ruta}'")
+    return total
@@ -0,0 +1,318 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import eco_logger
+from cliente_ecomarket import EcoMarketClient
+from metricas import HistogramaLatencia
+from modelos import CATEGORIAS_VALIDAS
+
+# ==========================================
+# GENERADOR DE CARGA (LAZO ABIERTO / LAZO CERRADO)
+# ==========================================
+# Dos formas de meter carga, que responden preguntas distintas:
+#
+#   LAZO CERRADO (N usuarios virtuales): cada usuario manda una petición,
+#   espera la respuesta, "piensa" y manda la siguiente. Si el sistema se
+#   pone lento, los usuarios mandan MENOS: la carga se autorregula y
+#   esconde la saturación.
+#
+#   LAZO ABIERTO (tasa objetivo, llegadas de Poisson): las peticiones
+#   llegan a su hora, estén o no libres las anteriores, como usuarios
+#   reales independientes. Si el sistema no da abasto, se acumulan en
+#   vuelo y la latencia se dispara: así se encuentra el punto de saturación.
+#
+# En lazo abierto la latencia se mide desde la hora PROGRAMADA de llegada,
+# no desde que la tarea arrancó: si no, el retraso del propio generador
+# se esconde (omisión coordinada).
+
+BASE_URL = "http://localhost:9999"
+
+# --- OPERACIONES (mismas que ClienteEcoMarketAsync) ---
+
+class EstadoCarga:
+    """Ids conocidos para que obtener/actualizar/eliminar apunten a productos reales."""
+
+    def __init__(self, rng: random.Random, ids_iniciales: List[str] = None):
+        self.rng = rng
+        self.ids: List[str] = list(ids_iniciales or [])
+
+    def un_id(self) -> str:
+        return self.rng.choice(self.ids) if self.ids else "1"
+
+    def sacar_id(self) -> Optional[str]:
+        if not self.ids:
+            return None
+        return self.ids.pop(self.rng.randrange(len(self.ids)))
+
+    def producto_nuevo(self) -> dict:
+        return {"nombre": f"Producto carga {self.rng.randrange(10**6)}",
+                "precio": round(self.rng.uniform(10, 500), 2),
+                "categoria": self.rng.choice(sorted(CATEGORIAS_VALIDAS))}
+
+async def op_listar(cliente: EcoMarketClient, estado: EstadoCarga):
+    productos = await cliente.listar_productos()
+    if productos and not estado.ids:
+        estado.ids.extend(p.id for p in productos[:1000])
+
+async def op_obtener(cliente, estado):
+    await cliente.obtener_producto(estado.un_id())
+
+async def op_crear(cliente, estado):
+    producto = await cliente.crear_producto(estado.producto_nuevo())
+    estado.ids.append(producto.id)
+
+async def op_actualizar_total(cliente, estado):
+    await cliente.actualizar_producto_total(estado.un_id(), estado.producto_nuevo())
+
+async def op_actualizar_parcial(cliente, estado):
+    await cliente.actualizar_producto_parcial(estado.un_id(), {"precio": round(estado.rng.uniform(10, 500), 2)})
+
+async def op_eliminar(cliente, estado):
+    id_prod = estado.sacar_id()
+    if id_prod is not None:
+        await cliente.eliminar_producto(id_prod)
+
+OPERACIONES: Dict[str, Callable] = {
+    "listar": op_listar,
+    "obtener": op_obtener,
+    "crear": op_crear,
+    "actualizar_total": op_actualizar_total,
+    "actualizar_parcial": op_actualizar_parcial,
+    "eliminar": op_eliminar,
+}
+
+# Mezcla típica de una tienda: mucha lectura, poca escritura
+MEZCLA_POR_DEFECTO = {"listar": 0.15, "obtener": 0.55, "crear": 0.1,
+                      "actualizar_total": 0.05, "actualizar_parcial": 0.1, "eliminar": 0.05}
+
+# --- RESULTADOS ---
+
+@dataclass
+class VentanaCarga:
+    """Lo que pasó en un intervalo de 'ventana_s' segundos."""
+    inicio_s: float
+    completadas: int = 0
+    errores: int = 0
+    latencias: HistogramaLatencia = field(default_factory=HistogramaLatencia)
+
+    def resumen(self, ventana_s: float) -> dict:
+        total = self.completadas + self.errores
+        return {
+            "t": round(self.inicio_s, 2),
+            "rps": round(total / ventana_s, 1),
+            "errores_pct": round(100 * self.errores / total, 2) if total else 0.0,
+            "p50_ms": round(self.latencias.percentil(50), 2),
+            "p95_ms": round(self.latencias.percentil(95), 2),
+            "p99_ms": round(self.latencias.percentil(99), 2),
+        }
+
+class ResultadoCarga:
+    def __init__(self, modo: str, ventana_s: float = 1.0, objetivo: dict = None):
+        self.modo = modo
+        self.ventana_s = ventana_s
+        self.objetivo = objetivo or {}
+        self.ventanas: Dict[int, VentanaCarga] = {}
+        self.por_operacion: Dict[str, HistogramaLatencia] = defaultdict(HistogramaLatencia)
+        self.errores_por_tipo: Dict[str, int] = defaultdict(int)
+        self.total = HistogramaLatencia()
+        self.completadas = 0
+        self.errores = 0
+        self.llegadas = 0        # lazo abierto: llegadas generadas (incluye descartadas)
+        self.descartadas = 0     # lazo abierto: llegadas que no cupieron (max_en_vuelo)
+        self.duracion_s = 0.0
+
+    def registrar(self, t_relativo: float, operacion: str, latencia_ms: float, error: Exception = None):
+        indice = int(t_relativo // self.ventana_s)
+        ventana = self.ventanas.get(indice)
+        if ventana is None:
+            ventana = self.ventanas[indice] = VentanaCarga(indice * self.ventana_s)
+        ventana.latencias.registrar(latencia_ms)
+        self.por_operacion[operacion].registrar(latencia_ms)
+        self.total.registrar(latencia_ms)
+        if error is None:
+            ventana.completadas += 1
+            self.completadas += 1
+        else:
+            ventana.errores += 1
+            self.errores += 1
+            self.errores_por_tipo[type(error).__name__] += 1
+
+    @property
+    def throughput(self) -> float:
+        return self.completadas / self.duracion_s if self.duracion_s else 0.0
+
+    def serie(self) -> List[dict]:
+        return [self.ventanas[i].resumen(self.ventana_s) for i in sorted(self.ventanas)]
+
+    def resumen(self) -> dict:
+        total = self.completadas + self.errores
+        return {
+            "modo": self.modo,
+            **self.objetivo,
+            "duracion_s": round(self.duracion_s, 2),
+            "completadas": self.completadas,
+            "errores": self.errores,
+            "llegadas": self.llegadas,
+            "descartadas": self.descartadas,
+            "errores_pct": round(100 * self.errores / total, 2) if total else 0.0,
+            "throughput_rps": round(self.throughput, 1),
+            "p50_ms": round(self.total.percentil(50), 2),
+            "p95_ms": round(self.total.percentil(95), 2),
+            "p99_ms": round(self.total.percentil(99), 2),
+            "max_ms": round(self.total.max_ms, 2),
+            "por_operacion": {op: {"n": h.conteo, "p50_ms": round(h.percentil(50), 2),
+                                   "p99_ms": round(h.percentil(99), 2)}
+                              for op, h in sorted(self.por_operacion.items())},
+            "errores_por_tipo": dict(self.errores_por_tipo),
+        }
+
+    def imprimir(self):
+        r = self.resumen()
+        print(f"\n📊 {self.modo.upper()} {self.objetivo} -> {r['throughput_rps']} req/s | "
+              f"p50 {r['p50_ms']}ms p95 {r['p95_ms']}ms p99 {r['p99_ms']}ms | "
+              f"errores {r['errores_pct']}% | descartadas {r['descartadas']}")
+        print(f"{'t(s)':>6} {'req/s':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for v in self.serie():
+            print(f"{v['t']:>6} {v['rps']:>8} {v['errores_pct']:>6} {v['p50_ms']:>8} {v['p95_ms']:>8} {v['p99_ms']:>8}")
+        for tipo, n in self.errores_por_tipo.items():
+            print(f"❌ {tipo}: {n}")
+
+# --- GENERADOR ---
+
+class GeneradorCarga:
+    def __init__(self, cliente: EcoMarketClient, mezcla: Dict[str, float] = None,
+                 semilla: int = None, ventana_s: float = 1.0):
+        mezcla = mezcla or MEZCLA_POR_DEFECTO
+        desconocidas = set(mezcla) - set(OPERACIONES)
+        if desconocidas:
+            raise ValueError(f"Operaciones desconocidas en la mezcla: {sorted(desconocidas)}")
+        self.cliente = cliente
+        self.rng = random.Random(semilla)
+        self.ventana_s = ventana_s
+        self._nombres = [op for op, peso in mezcla.items() if peso > 0]
+        self._pesos = [mezcla[op] for op in self._nombres]
+        self.estado = EstadoCarga(self.rng)
+
+    def _elegir(self) -> str:
+        return self.rng.choices(self._nombres, self._pesos)[0]
+
+    async def _ejecutar(self, resultado: ResultadoCarga, t0: float, operacion: str, llegada: float):
+        error = None
+        try:
+            await OPERACIONES[operacion](self.cliente, self.estado)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        fin = time.perf_counter()
+        resultado.registrar(llegada - t0, operacion, (fin - llegada) * 1000, error)
+
+    async def lazo_abierto(self, tasa_rps: float, duracion_s: float, max_en_vuelo: int = 1000) -> ResultadoCarga:
+        """Llegadas de Poisson a 'tasa_rps' durante 'duracion_s' segundos."""
+        resultado = ResultadoCarga("abierto", self.ventana_s, {"tasa_rps": tasa_rps})
+        en_vuelo = set()
+        t0 = time.perf_counter()
+        llegada = t0
+        fin = t0 + duracion_s
+        while True:
+            llegada += self.rng.expovariate(tasa_rps)
+            if llegada >= fin:
+                break
+            espera = llegada - time.perf_counter()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            resultado.llegadas += 1
+            if len(en_vuelo) >= max_en_vuelo:
+                resultado.descartadas += 1
+                continue
+            tarea = asyncio.create_task(self._ejecutar(resultado, t0, self._elegir(), llegada))
+            en_vuelo.add(tarea)
+            tarea.add_done_callback(en_vuelo.discard)
+        if en_vuelo:
+            await asyncio.gather(*en_vuelo)
+        resultado.duracion_s = time.perf_counter() - t0
+        return resultado
+
+    async def lazo_cerrado(self, usuarios: int, duracion_s: float, pausa_s: float = 0.0) -> ResultadoCarga:
+        """'usuarios' virtuales en bucle; 'pausa_s' es el tiempo medio de "pensar" entre peticiones."""
+        resultado = ResultadoCarga("cerrado", self.ventana_s, {"usuarios": usuarios})
+        t0 = time.perf_counter()
+        fin = t0 + duracion_s
+
+        async def usuario():
+            while time.perf_counter() < fin:
+                await self._ejecutar(resultado, t0, self._elegir(), time.perf_counter())
+                if pausa_s > 0:
+                    await asyncio.sleep(self.rng.expovariate(1 / pausa_s))
+
+        await asyncio.gather(*(usuario() for _ in range(usuarios)))
+        resultado.duracion_s = time.perf_counter() - t0
+        return resultado
+
+    async def buscar_saturacion(self, tasas: List[float], duracion_s: float,
+                                tolerancia: float = 0.9, max_en_vuelo: int = 1000) -> List[dict]:
+        """
+        Sube la tasa en escalones (lazo abierto). El sistema está saturado
+        cuando lo logrado cae debajo de 'tolerancia' x lo que realmente llegó
+        (no x la tasa nominal: en corridas cortas Poisson varía bastante), o
+        cuando empiezan a descartarse llegadas.
+        """
+        escalones = []
+        for tasa in tasas:
+            resultado = await self.lazo_abierto(tasa, duracion_s, max_en_vuelo)
+            resumen = resultado.resumen()
+            ofrecida = resultado.llegadas / duracion_s
+            resumen["saturado"] = (resultado.throughput < ofrecida * tolerancia) or resultado.descartadas > 0
+            escalones.append(resumen)
+            print(f"🪜 {tasa:>7} req/s pedidas -> {resumen['throughput_rps']:>7} logradas | "
+                  f"p99 {resumen['p99_ms']}ms | errores {resumen['errores_pct']}%"
+                  f"{' 🔥 SATURADO' if resumen['saturado'] else ''}")
+            if resumen["saturado"]:
+                break
+        return escalones
+
+# --- CLI ---
+
+async def _main(args):
+    # Con miles de peticiones por segundo, loguear cada éxito compite con la carga misma
+    eco_logger.configurar_pipeline(muestreo_exito=args.log_muestreo)
+    mezcla = json.loads(args.mezcla) if args.mezcla else None
+    async with EcoMarketClient(base_url=args.url, token=args.token, timeout=args.timeout) as cliente:
+        generador = GeneradorCarga(cliente, mezcla, semilla=args.semilla, ventana_s=args.ventana)
+        if args.escalones:
+            salida = await generador.buscar_saturacion(args.escalones, args.duracion)
+        elif args.modo == "abierto":
+            resultado = await generador.lazo_abierto(args.tasa, args.duracion)
+            resultado.imprimir()
+            salida = {**resultado.resumen(), "serie": resultado.serie()}
+        else:
+            resultado = await generador.lazo_cerrado(args.usuarios, args.duracion, args.pausa)
+            resultado.imprimir()
+            salida = {**resultado.resumen(), "serie": resultado.serie()}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(salida, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados en {args.json}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de carga para EcoMarket")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--token", default="token_carga")
+    parser.add_argument("--modo", choices=["abierto", "cerrado"], default="abierto")
+    parser.add_argument("--tasa", type=float, default=50, help="Lazo abierto: llegadas por segundo")
+    parser.add_argument("--usuarios", type=int, default=10, help="Lazo cerrado: usuarios virtuales")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Lazo cerrado: tiempo medio de pensar (s)")
+    parser.add_argument("--duracion", type=float, default=10)
+    parser.add_argument("--ventana", type=float, default=1.0, help="Segundos por punto de la serie")
+    parser.add_argument("--mezcla", help='JSON, ej. \'{"obtener": 0.8, "crear": 0.2}\'')
+    parser.add_argument("--escalones", type=float, nargs="+", help="Busca saturación: tasas a probar")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--semilla", type=int)
+    parser.add_argument("--json", help="Guarda el resumen en este archivo")
+    parser.add_argument("--log-muestreo", type=float, default=0.01, help="Fracción de éxitos que se loguean")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,153 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from pydantic import ValidationError
+from modelos import Producto
+
+# ==========================================
+# CATÁLOGO CON ÍNDICES SECUNDARIOS
+# ==========================================
+# Consultas como "todos los productos del productor X" o "miel disponible
+# por menos de $200" ya no recorren la lista completa:
+#   - id                       -> dict (O(1))
+#   - categoria / productor.id -> índice invertido valor -> {ids} (O(1))
+#   - disponible               -> dos conjuntos (True / False)
+#   - precio                   -> lista ordenada de (precio, id) + bisect (O(log n))
+# Cada cambio individual actualiza SOLO las entradas de ese producto.
+
+class CatalogoIndexado:
+    def __init__(self, productos: Iterable[Producto] = None):
+        self._por_id: Dict[str, Producto] = {}
+        self._por_categoria: Dict[str, Set[str]] = defaultdict(set)
+        self._por_productor: Dict[str, Set[str]] = defaultdict(set)
+        self._por_disponible: Dict[bool, Set[str]] = {True: set(), False: set()}
+        self._por_precio: List[tuple] = []   # (precio, id) siempre ordenada
+        if productos:
+            self.cargar(productos)
+
+    # --- CARGA ---
+
+    def cargar(self, productos: Iterable[Producto]):
+        """Carga en bloque: indexa todo y ordena los precios UNA sola vez."""
+        for p in productos:
+            if p.id in self._por_id:
+                self._quitar_de_indices(self._por_id[p.id])
+            self._por_id[p.id] = p
+            self._agregar_a_indices(p)
+        self._por_precio = sorted((p.precio, p.id) for p in self._por_id.values())
+
+    async def cargar_desde_cliente(self, cliente) -> int:
+        """Llena el catálogo en streaming desde GET /productos (EcoMarketClient)."""
+        antes = len(self)
+        self.cargar([p async for p in cliente.iterar_productos()])
+        return len(self) - antes
+
+    # --- CAMBIOS INCREMENTALES ---
+
+    def upsert(self, producto: Producto):
+        """Inserta o reemplaza un producto tocando solo sus entradas de índice."""
+        anterior = self._por_id.get(producto.id)
+        if anterior is not None:
+            self._quitar_de_indices(anterior)
+            self._quitar_precio(anterior)
+        self._por_id[producto.id] = producto
+        self._agregar_a_indices(producto)
+        insort(self._por_precio, (producto.precio, producto.id))
+
+    def eliminar(self, id_prod: str) -> bool:
+        anterior = self._por_id.pop(id_prod, None)
+        if anterior is None:
+            return False
+        self._quitar_de_indices(anterior)
+        self._quitar_precio(anterior)
+        return True
+
+    def actualizar(self, datos: List[dict]):
+        """
+        Observador para el monitor: recibe la lista de productos cambiados
+        (dicts del servidor) y los aplica uno a uno.
+        """
+        for item in datos or []:
+            if item.get("eliminado"):
+                self.eliminar(str(item.get("id")))
+                continue
+            try:
+                self.upsert(Producto(**item))
+            except ValidationError as e:
+                print(f"⚠️ [Índice] Producto ignorado por datos inválidos: {e.error_count()} errores")
+
+    # --- CONSULTAS ---
+
+    def obtener(self, id_prod: str) -> Optional[Producto]:
+        return self._por_id.get(id_prod)
+
+    def ids_en_rango_precio(self, precio_min: float = None, precio_max: float = None) -> List[str]:
+        inicio = 0 if precio_min is None else bisect_left(self._por_precio, (precio_min,))
+        # (precio_max, chr(0x10FFFF)) queda después de cualquier id con ese mismo precio
+        if precio_max is None:
+            fin = len(self._por_precio)
+        else:
+            fin = bisect_right(self._por_precio, (precio_max, chr(0x10FFFF)))
+        return [id_prod for _, id_prod in self._por_precio[inicio:fin]]
+
+    def buscar(self, categoria: str = None, productor_id: str = None, disponible: bool = None,
+               precio_min: float = None, precio_max: float = None) -> List[Producto]:
+        """
+        Combina los índices necesarios. Se parte del conjunto más chico y se
+        intersecta con los demás, así el costo depende del resultado y no
+        del tamaño del catálogo. Sin filtros devuelve todo ordenado por precio.
+        """
+        candidatos = []
+        if categoria is not None:
+            candidatos.append(self._por_categoria.get(categoria.lower(), set()))
+        if productor_id is not None:
+            candidatos.append(self._por_productor.get(productor_id, set()))
+        if disponible is not None:
+            candidatos.append(self._por_disponible[bool(disponible)])
+
+        if not candidatos:
+            # Solo rango de precio: lo resuelve directamente el índice ordenado
+            return [self._por_id[i] for i in self.ids_en_rango_precio(precio_min, precio_max)]
+
+        candidatos.sort(key=len)
+        ids = set(candidatos[0])
+        for otro in candidatos[1:]:
+            ids &= otro
+            if not ids:
+                break
+
+        resultado = [self._por_id[i] for i in ids]
+        if precio_min is not None:
+            resultado = [p for p in resultado if p.precio >= precio_min]
+        if precio_max is not None:
+            resultado = [p for p in resultado if p.precio <= precio_max]
+        return sorted(resultado, key=lambda p: (p.precio, p.id))
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    def __contains__(self, id_prod: str) -> bool:
+        return id_prod in self._por_id
+
+    # --- Internos ---
+
+    def _agregar_a_indices(self, p: Producto):
+        self._por_categoria[p.categoria].add(p.id)
+        if p.productor is not None:
+            self._por_productor[p.productor.id].add(p.id)
+        self._por_disponible[p.disponible].add(p.id)
+
+    def _quitar_de_indices(self, p: Producto):
+        self._por_categoria[p.categoria].discard(p.id)
+        if not self._por_categoria[p.categoria]:
+            del self._por_categoria[p.categoria]
+        if p.productor is not None:
+            self._por_productor[p.productor.id].discard(p.id)
+            if not self._por_productor[p.productor.id]:
+                del self._por_productor[p.productor.id]
+        self._por_disponible[p.disponible].discard(p.id)
+
+    def _quitar_precio(self, p: Producto):
+        pos = bisect_left(self._por_precio, (p.precio, p.id))
+        if pos < len(self._por_precio) and self._por_precio[pos] == (p.precio, p.id):
+            del self._por_precio[pos]
@@ -0,0 +1,287 @@
+import asyncio
+import fnmatch
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from aiohttp import web
+
+# ==========================================
+# INYECTOR DE FALLOS DECLARATIVO
+# ==========================================
+# Los chaos_server*.py tienen los fallos escritos en el código (el id 500
+# duerme, el 999 da 500, 10% de errores al azar...). Para reproducir un
+# incidente había que editar el servidor. Aquí los fallos se declaran en
+# un YAML/JSON y se aplican sobre servidor_ecomarket:
+#
+#   semilla: 42
+#   reglas:
+#     - ruta: "/productos/{id}"        # ruta del router o patrón sobre el path ("/productos/99*")
+#       metodos: [GET]
+#       latencia: {tipo: pareto, escala_ms: 20, alfa: 1.5, max_ms: 5000}
+#       errores: {500: 0.05, 429: 0.02}   # status -> probabilidad
+#       retry_after: 2                   # segundos, para los 429/503
+#       reset: 0.01                      # cortar la conexión sin responder
+#       parcial: {probabilidad: 0.01, bytes: 16, pausa_ms: 3000, completar: false}
+#       limite_tasa: {rps: 50}           # por encima -> 429 + Retry-After
+#       programa:                        # cambios en el tiempo (segundos desde el arranque)
+#         - {desde_s: 30, hasta_s: 60, errores: {503: 0.5}}
+#       ciclo_s: 120                     # opcional: el programa se repite
+#
+# Latencias: fija {ms}, uniforme {min_ms, max_ms}, normal {media_ms, desv_ms},
+# pareto {escala_ms, alfa} (cola larga). Todas aceptan max_ms y
+# probabilidad (por defecto 1: siempre).
+
+class ErrorConfigFallos(ValueError):
+    pass
+
+TIPOS_LATENCIA = {"fija", "uniforme", "normal", "pareto"}
+CAMPOS_REGLA = {"ruta", "metodos", "latencia", "errores", "retry_after", "reset", "parcial",
+                "limite_tasa", "programa", "ciclo_s"}
+CAMPOS_FASE = {"desde_s", "hasta_s", "latencia", "errores", "retry_after", "reset", "parcial", "limite_tasa"}
+
+def _validar_latencia(latencia: Optional[dict]):
+    if latencia is None:
+        return
+    tipo = latencia.get("tipo")
+    if tipo not in TIPOS_LATENCIA:
+        raise ErrorConfigFallos(f"Tipo de latencia desconocido: {tipo!r}. Opciones: {sorted(TIPOS_LATENCIA)}")
+    if tipo == "pareto" and latencia.get("alfa", 0) <= 0:
+        raise ErrorConfigFallos("La latencia pareto necesita 'alfa' > 0")
+    _validar_probabilidad("latencia.probabilidad", latencia.get("probabilidad", 1))
+
+def _validar_probabilidad(nombre: str, valor):
+    if not isinstance(valor, (int, float)) or not 0 <= valor <= 1:
+        raise ErrorConfigFallos(f"'{nombre}' debe ser una probabilidad entre 0 y 1 (llegó {valor!r})")
+
+def _normalizar_errores(errores: Optional[dict]) -> Dict[int, float]:
+    resultado = {}
+    for status, prob in (errores or {}).items():
+        try:
+            codigo = int(status)
+        except ValueError:
+            raise ErrorConfigFallos(f"Status inválido en 'errores': {status!r}")
+        if not 400 <= codigo <= 599:
+            raise ErrorConfigFallos(f"Solo se inyectan errores 4xx/5xx (llegó {codigo})")
+        _validar_probabilidad(f"errores.{codigo}", prob)
+        resultado[codigo] = prob
+    if sum(resultado.values()) > 1:
+        raise ErrorConfigFallos("La suma de probabilidades de 'errores' no puede superar 1")
+    return resultado
+
+@dataclass
+class Fallos:
+    """Lo que aplica a una petición en un instante dado (regla base + fase activa)."""
+    latencia: Optional[dict] = None
+    errores: Dict[int, float] = field(default_factory=dict)
+    retry_after: float = 1
+    reset: float = 0.0
+    parcial: Optional[dict] = None
+    limite_tasa: Optional[dict] = None
+
+    @classmethod
+    def desde_dict(cls, datos: dict, base: "Fallos" = None) -> "Fallos":
+        base = base or cls()
+        _validar_latencia(datos.get("latencia"))
+        if "reset" in datos:
+            _validar_probabilidad("reset", datos["reset"])
+        parcial = datos.get("parcial", base.parcial)
+        if parcial is not None:
+            _validar_probabilidad("parcial.probabilidad", parcial.get("probabilidad", 0))
+        return cls(
+            latencia=datos.get("latencia", base.latencia),
+            errores=_normalizar_errores(datos["errores"]) if "errores" in datos else base.errores,
+            retry_after=datos.get("retry_after", base.retry_after),
+            reset=datos.get("reset", base.reset),
+            parcial=parcial,
+            limite_tasa=datos.get("limite_tasa", base.limite_tasa),
+        )
+
+class _CuboTokens:
+    """Token bucket síncrono (el servidor corre en un solo hilo/loop)."""
+
+    def __init__(self, rps: float, rafaga: float = None):
+        self.rps = rps
+        self.capacidad = rafaga or rps
+        self.tokens = self.capacidad
+        self.ultimo = time.monotonic()
+
+    def tomar(self) -> bool:
+        ahora = time.monotonic()
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.rps)
+        self.ultimo = ahora
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class ReglaFallos:
+    def __init__(self, datos: dict):
+        desconocidos = set(datos) - CAMPOS_REGLA
+        if desconocidos:
+            raise ErrorConfigFallos(f"Campos desconocidos en la regla: {sorted(desconocidos)}")
+        if "ruta" not in datos:
+            raise ErrorConfigFallos("Cada regla necesita 'ruta' (usa \"*\" para todas)")
+        self.ruta = datos["ruta"]
+        self.metodos = {m.upper() for m in datos.get("metodos", [])}
+        self.base = Fallos.desde_dict(datos)
+        self.ciclo_s = datos.get("ciclo_s")
+        self.programa = []
+        for fase in datos.get("programa", []):
+            desconocidos = set(fase) - CAMPOS_FASE
+            if desconocidos:
+                raise ErrorConfigFallos(f"Campos desconocidos en la fase: {sorted(desconocidos)}")
+            desde, hasta = fase.get("desde_s", 0), fase.get("hasta_s", float("inf"))
+            if hasta <= desde:
+                raise ErrorConfigFallos(f"Fase inválida: hasta_s ({hasta}) <= desde_s ({desde})")
+            self.programa.append((desde, hasta, Fallos.desde_dict(fase, self.base)))
+        # Un cubo por (fase, rps): cambiar de fase no hereda tokens de la anterior
+        self._cubos: Dict[int, _CuboTokens] = {}
+
+    def aplica(self, request: web.Request) -> bool:
+        if self.metodos and request.method not in self.metodos:
+            return False
+        if self.ruta == "*":
+            return True
+        ruta_router = request.match_info.route.resource.canonical if request.match_info.route.resource else None
+        return self.ruta == ruta_router or fnmatch.fnmatchcase(request.path, self.ruta)
+
+    def fallos_en(self, t: float) -> Fallos:
+        if self.ciclo_s:
+            t %= self.ciclo_s
+        for desde, hasta, fallos in self.programa:
+            if desde <= t < hasta:
+                return fallos
+        return self.base
+
+    def cubo(self, fallos: Fallos) -> Optional[_CuboTokens]:
+        if not fallos.limite_tasa:
+            return None
+        cubo = self._cubos.get(id(fallos))
+        if cubo is None:
+            cubo = self._cubos[id(fallos)] = _CuboTokens(fallos.limite_tasa["rps"], fallos.limite_tasa.get("rafaga"))
+        return cubo
+
+class InyectorFallos:
+    """
+    Se engancha en servidor_ecomarket.crear_app(fallos=...). Para cada
+    petición aplica la PRIMERA regla que coincida:
+      1. límite de tasa (429)   2. reset de conexión   3. latencia
+      4. error por status       5. cuerpo parcial (slowloris)
+    """
+
+    def __init__(self, config: dict):
+        if not isinstance(config, dict):
+            raise ErrorConfigFallos("La configuración debe ser un objeto con 'reglas'")
+        self.reglas: List[ReglaFallos] = [ReglaFallos(r) for r in config.get("reglas", [])]
+        self.rng = random.Random(config.get("semilla"))
+        self.inicio = time.monotonic()
+        self.contadores = Counter()
+
+    @classmethod
+    def desde_archivo(cls, ruta: str) -> "InyectorFallos":
+        with open(ruta, encoding="utf-8") as f:
+            texto = f.read()
+        if ruta.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ErrorConfigFallos("Para leer YAML instala 'pyyaml' (o usa JSON).")
+            return cls(yaml.safe_load(texto))
+        return cls(json.loads(texto))
+
+    def reiniciar_reloj(self):
+        """El programa de fases cuenta desde aquí."""
+        self.inicio = time.monotonic()
+
+    def _latencia_ms(self, latencia: dict) -> float:
+        if "probabilidad" in latencia and self.rng.random() >= latencia["probabilidad"]:
+            return 0.0
+        tipo = latencia["tipo"]
+        if tipo == "fija":
+            valor = latencia.get("ms", 0)
+        elif tipo == "uniforme":
+            valor = self.rng.uniform(latencia.get("min_ms", 0), latencia.get("max_ms", 0))
+        elif tipo == "normal":
+            valor = self.rng.gauss(latencia.get("media_ms", 0), latencia.get("desv_ms", 0))
+        else:  # pareto: la mayoría cerca de escala_ms, unas pocas MUY lentas
+            valor = latencia.get("escala_ms", 1) * self.rng.paretovariate(latencia["alfa"])
+        return max(0.0, min(valor, latencia.get("max_ms", float("inf"))))
+
+    def _elegir_error(self, errores: Dict[int, float]) -> Optional[int]:
+        if not errores:
+            return None
+        tirada = self.rng.random()
+        acumulado = 0.0
+        for status, prob in errores.items():
+            acumulado += prob
+            if tirada < acumulado:
+                return status
+        return None
+
+    def _error(self, status: int, fallos: Fallos) -> web.Response:
+        headers = {}
+        if status in (429, 503):
+            headers["Retry-After"] = f"{fallos.retry_after:g}"
+        return web.json_response({"error": f"Fallo inyectado ({status})"}, status=status, headers=headers)
+
+    async def ejecutar(self, request: web.Request, handler):
+        regla = next((r for r in self.reglas if r.aplica(request)), None)
+        if regla is None:
+            return await handler(request)
+        fallos = regla.fallos_en(time.monotonic() - self.inicio)
+
+        cubo = regla.cubo(fallos)
+        if cubo is not None and not cubo.tomar():
+            self.contadores["limite_tasa"] += 1
+            return self._error(429, fallos)
+
+        if fallos.reset and self.rng.random() < fallos.reset:
+            self.contadores["reset"] += 1
+            return self._cortar(request)
+
+        if fallos.latencia:
+            espera = self._latencia_ms(fallos.latencia)
+            if espera:
+                self.contadores["latencia"] += 1
+                await asyncio.sleep(espera / 1000)
+
+        status = self._elegir_error(fallos.errores)
+        if status is not None:
+            self.contadores[f"error_{status}"] += 1
+            return self._error(status, fallos)
+
+        parcial = fallos.parcial
+        if parcial and self.rng.random() < parcial.get("probabilidad", 0):
+            self.contadores["parcial"] += 1
+            return await self._cuerpo_parcial(request, await handler(request), parcial)
+
+        return await handler(request)
+
+    def _cortar(self, request: web.Request):
+        # Cerramos el socket sin mandar nada: el cliente ve "Server disconnected"
+        if request.transport is not None:
+            request.transport.abort()
+        raise asyncio.CancelledError()
+
+    async def _cuerpo_parcial(self, request: web.Request, respuesta: web.Response, parcial: dict):
+        """Manda cabeceras + unos bytes, se queda callado y luego completa o corta."""
+        cuerpo = respuesta.body or b""
+        corte = min(parcial.get("bytes", 16), len(cuerpo))
+        stream = web.StreamResponse(status=respuesta.status, headers={
+            "Content-Type": respuesta.headers.get("Content-Type", "application/json"),
+            "Content-Length": str(len(cuerpo)),
+        })
+        await stream.prepare(request)
+        await stream.write(cuerpo[:corte])
+        await asyncio.sleep(parcial.get("pausa_ms", 1000) / 1000)
+        if not parcial.get("completar", False):
+            self._cortar(request)
+        await stream.write(cuerpo[corte:])
+        await stream.write_eof()
+        return stream
+
+    def estadisticas(self) -> dict:
+        return {"segundos": round(time.monotonic() - self.inicio, 1), "inyectados": dict(self.contadores)}
@@ -0,0 +1,160 @@
+import asyncio
+import random
+import reloj
+import eco_logger
+import trazas
+
+# --- 1. LIMITADOR DE CONCURRENCIA (SEMÁFORO) ---
+class LimitadorConcurrencia:
+    def __init__(self, max_concurrent):
+        self.sem = asyncio.Semaphore(max_concurrent)
+        self.max = max_concurrent
+    
+    async def __aenter__(self):
+        # Intentamos entrar al carril (el span mide cuánto esperamos en la fila)
+        with trazas.span("limitador.concurrencia.espera", max_concurrent=self.max):
+            await self.sem.acquire()
+        # Retornamos self para poder usar métodos si fuera necesario
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Salimos del carril, liberando espacio para otro
+        self.sem.release()
+
+# --- 2. LIMITADOR DE TASA (TOKEN BUCKET) ---
+class LimitadorTasa:
+    def __init__(self, rate_per_second):
+        self.rate = rate_per_second
+        self.tokens = rate_per_second # Empezamos con el cubo lleno
+        self.capacity = rate_per_second
+        self.last_check = None # Se fija en el primer uso (el cubo ya empieza lleno)
+        self.lock = asyncio.Lock() # Para evitar condiciones de carrera
+
+    async def __aenter__(self):
+        # El span cubre la fila del lock + el posible sleep del token bucket
+        with trazas.span("limitador.tasa.espera", tasa=self.rate) as span:
+            await self._tomar_token(span)
+
+    async def _tomar_token(self, span):
+        async with self.lock:
+            # reloj.ahora() en vez de time.monotonic(): en un BucleVirtual es la hora virtual
+            now = reloj.ahora()
+            elapsed = now - self.last_check if self.last_check is not None else 0
+            self.last_check = now
+            
+            # 1. Rellenar el cubo (Refill)
+            # Calculamos cuántos tokens se generaron en este tiempo
+            new_tokens = elapsed * self.rate
+            self.tokens = min(self.capacity, self.tokens + new_tokens)
+            
+            # 2. Consumir token
+            if self.tokens < 1:
+                # No hay tokens, hay que esperar a que se genere 1
+                wait_time = (1 - self.tokens) / self.rate
+                span.atributo("frenado_s", round(wait_time, 4))
+                # En debug: bajo carga esto se dispara en casi cada petición
+                eco_logger.logger.debug("💧 [RateLimit] Frenando... Esperando %.3fs", wait_time)
+                await asyncio.sleep(wait_time)
+                self.tokens = 0 # Consumimos el que acabamos de generar
+                # El tiempo dormido ya se convirtió en ese token: no lo volvemos a contar
+                self.last_check = reloj.ahora()
+            else:
+                self.tokens -= 1 # Consumimos 1 token existente
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+# --- 3. CLIENTE ESTRANGULADO (THROTTLED CLIENT) ---
+class ClienteControlado:
+    def __init__(self, max_concurrent=10, max_per_sec=20):
+        self.concurrency = LimitadorConcurrencia(max_concurrent)
+        self.rate_limit = LimitadorTasa(max_per_sec)
+        self.active_requests = 0 # Solo para estadísticas
+
+    async def solicitar(self, pid):
+        # APLICAMOS DOBLE CAPA DE PROTECCIÓN
+        
+        # Capa 1: Semáforo (¿Hay carriles libres?)
+        async with self.concurrency:
+            # Capa 2: Tasa (¿Vamos muy rápido?)
+            async with self.rate_limit:
+                
+                # --- ZONA CRÍTICA (Simulación de Request) ---
+                self.active_requests += 1
+                # print(f"🚀 [POST] Prod-{pid} en vuelo (Activos: {self.active_requests})")
+                
+                # Simulamos latencia de red variable (0.1 a 0.5s)
+                # Si fuera real, aquí iría: await session.post(...)
+                await asyncio.sleep(random.uniform(0.1, 0.5))
+                
+                self.active_requests -= 1
+                return f"Prod-{pid} Creado"
+
+# --- 4. TEST DE ESTRÉS ---
+async def test_traffic_control():
+    # CONFIGURACIÓN DEL EXPERIMENTO
+    N_PETICIONES = 50
+    MAX_CONCURRENT = 10
+    MAX_PER_SEC = 20  # Límite de velocidad
+    
+    print(f"🚦 INICIANDO PRUEBA DE ESTRÉS")
+    print(f"   - Total Peticiones: {N_PETICIONES}")
+    print(f"   - Max Simultáneas:  {MAX_CONCURRENT} (Semáforo)")
+    print(f"   - Max por Segundo:  {MAX_PER_SEC} (Token Bucket)")
+    print("-" * 40)
+
+    cliente = ClienteControlado(MAX_CONCURRENT, MAX_PER_SEC)
+    start_global = reloj.ahora()
+
+    # Función auxiliar para monitorizar concurrencia real
+    async def monitor():
+        max_seen = 0
+        while True:
+            current = cliente.active_requests
+            if current > max_seen: max_seen = current
+            # Si vemos más de 10, fallamos el test
+            if current > MAX_CONCURRENT:
+                print(f"💀 ¡ALERTA! Se violó el límite de concurrencia: {current}")
+            await asyncio.sleep(0.01)
+            # Detenemos monitor si ya acabaron todos (truco sucio para demo)
+            if reloj.ahora() - start_global > 5 and current == 0:
+                break
+        return max_seen
+
+    # Lanzamos el monitor en paralelo
+    monitor_task = asyncio.create_task(monitor())
+
+    # Lanzamos las 50 peticiones de golpe
+    tareas = [cliente.solicitar(i) for i in range(N_PETICIONES)]
+    
+    # Gather espera a todas
+    await asyncio.gather(*tareas)
+    
+    end_global = reloj.ahora()
+    duration = end_global - start_global
+    
+    # Cancelamos monitor
+    monitor_task.cancel()
+    try: await monitor_task
+    except asyncio.CancelledError: pass
+
+    # --- RESULTADOS ---
+    rps_real = N_PETICIONES / duration
+    
+    print("-" * 40)
+    print("📊 REPORTE FINAL DE TRÁFICO")
+    print("-" * 40)
+    print(f"✅ Tiempo Total:      {duration:.2f} segundos")
+    print(f"✅ Velocidad Real:    {rps_real:.2f} req/s")
+    print(f"✅ Límite Config:     {MAX_PER_SEC} req/s")
+    
+    if rps_real <= MAX_PER_SEC + 2: # Margen de error pequeño aceptable
+        print("🏆 PRUEBA SUPERADA: Se respetó el límite de velocidad.")
+    else:
+        print("❌ FALLO: Fuiste demasiado rápido.")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(test_traffic_control())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
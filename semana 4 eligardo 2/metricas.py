@@ -0,0 +1,238 @@
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+# ==========================================
+# REGISTRO DE MÉTRICAS DE LATENCIA
+# ==========================================
+# Un promedio esconde la cola: 99 peticiones de 50ms y una de 5s dan un
+# promedio "sano" de ~100ms. Aquí cada combinación método + endpoint +
+# status tiene su histograma y sus contadores, y de ahí salen p50/p95/p99
+# y el máximo.
+#
+# El histograma usa cubetas logarítmicas (como HDR): cada cubeta es un
+# 2% más ancha que la anterior, así que el error relativo de cualquier
+# percentil es <= 2% sin guardar las muestras. Registrar es un log() y
+# un incremento en un dict.
+
+# Límites (segundos) de las cubetas que se exponen a Prometheus
+LIMITES_PROMETHEUS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class HistogramaLatencia:
+    """Histograma de cubetas logarítmicas en milisegundos."""
+
+    __slots__ = ("precision", "minimo_ms", "_base", "_cubetas", "conteo", "suma_ms", "max_ms", "_lock")
+
+    def __init__(self, precision: float = 0.02, minimo_ms: float = 0.01):
+        self.precision = precision
+        self.minimo_ms = minimo_ms
+        self._base = math.log1p(precision)
+        self._cubetas: Dict[int, int] = {}
+        self.conteo = 0
+        self.suma_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, valor_ms: float):
+        indice = int(math.log(max(valor_ms, self.minimo_ms) / self.minimo_ms) / self._base)
+        with self._lock:
+            self._cubetas[indice] = self._cubetas.get(indice, 0) + 1
+            self.conteo += 1
+            self.suma_ms += valor_ms
+            if valor_ms > self.max_ms:
+                self.max_ms = valor_ms
+
+    def _limite_superior(self, indice: int) -> float:
+        return self.minimo_ms * (1 + self.precision) ** (indice + 1)
+
+    def _acumulado(self):
+        """(límite superior en ms, conteo acumulado) por cubeta, en orden."""
+        with self._lock:
+            cubetas = sorted(self._cubetas.items())
+        acumulado = 0
+        for indice, n in cubetas:
+            acumulado += n
+            yield self._limite_superior(indice), acumulado
+
+    def percentil(self, q: float) -> float:
+        """Percentil q (0-100) en ms. 0 si no hay muestras."""
+        if not self.conteo:
+            return 0.0
+        objetivo = max(1, math.ceil(self.conteo * q / 100))
+        for limite, acumulado in self._acumulado():
+            if acumulado >= objetivo:
+                return min(limite, self.max_ms)
+        return self.max_ms
+
+    def conteo_hasta(self, limites_ms) -> list:
+        """Conteos acumulados para cada límite (formato 'le' de Prometheus)."""
+        cubetas = list(self._acumulado())
+        resultado, i, acumulado = [], 0, 0
+        for limite in limites_ms:
+            while i < len(cubetas) and cubetas[i][0] <= limite:
+                acumulado = cubetas[i][1]
+                i += 1
+            resultado.append(acumulado)
+        return resultado
+
+# --- NORMALIZACIÓN DE ENDPOINTS ---
+# /productos/123 y /productos/456 son la misma ruta; si no se agrupan,
+# cada id crea su propia serie y el registro crece sin límite.
+_SEGMENTO_ID = re.compile(r"^(\d+|[0-9a-fA-F-]{16,})$")
+
+@lru_cache(maxsize=4096)
+def normalizar_endpoint(url: str) -> str:
+    ruta = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    segmentos = ["{id}" if _SEGMENTO_ID.match(s) else s for s in ruta.strip("/").split("/") if s]
+    return "/" + "/".join(segmentos)
+
+Clave = Tuple[str, str, str]
+
+class RegistroMetricas:
+    """
+    Contadores e histogramas por (método, endpoint, status).
+
+    Uso:
+        REGISTRO.observar("GET", "http://api/productos/7", 200, 35.2)
+        REGISTRO.resumen()            # p50/p95/p99/max por ruta
+        REGISTRO.exportar_prometheus() # texto para /metrics
+    """
+
+    def __init__(self, prefijo: str = "ecomarket_http"):
+        self.prefijo = prefijo
+        self._histogramas: Dict[Clave, HistogramaLatencia] = {}
+        self._errores: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, method: str, url: str, status, duracion_ms: float, error: bool = None):
+        """
+        Registra una petición. 'status' puede ser 0/None si no hubo respuesta
+        (timeout, conexión rechazada); en ese caso cuenta como error.
+        """
+        endpoint = normalizar_endpoint(str(url))
+        codigo = int(status) if str(status).isdigit() and int(status) else None
+        status = str(status) if status else "sin_respuesta"
+        clave = (str(method).upper(), endpoint, status)
+        histograma = self._histogramas.get(clave)
+        if histograma is None:
+            with self._lock:
+                histograma = self._histogramas.setdefault(clave, HistogramaLatencia())
+        histograma.registrar(duracion_ms)
+
+        if error is None:
+            error = codigo is None or codigo >= 400
+        if error:
+            with self._lock:
+                self._errores[clave[:2]] = self._errores.get(clave[:2], 0) + 1
+
+    @contextmanager
+    def medir(self, method: str, endpoint: str):
+        """Mide un bloque como si fuera una petición (status 200 u 'error')."""
+        inicio = time.perf_counter()
+        status = 200
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            self.observar(method, endpoint, status, duracion, error=status != 200)
+
+    # --- LECTURA ---
+
+    def resumen(self) -> Dict[str, dict]:
+        """{"GET /productos/{id} 200": {"peticiones", "p50", "p95", "p99", "max", "promedio"}}"""
+        resultado = {}
+        for (method, endpoint, status), h in sorted(self._histogramas.items()):
+            resultado[f"{method} {endpoint} {status}"] = {
+                "peticiones": h.conteo,
+                "p50": round(h.percentil(50), 2),
+                "p95": round(h.percentil(95), 2),
+                "p99": round(h.percentil(99), 2),
+                "max": round(h.max_ms, 2),
+                "promedio": round(h.suma_ms / h.conteo, 2) if h.conteo else 0.0,
+            }
+        return resultado
+
+    def errores(self) -> Dict[str, int]:
+        return {f"{m} {e}": n for (m, e), n in sorted(self._errores.items())}
+
+    def histograma(self, method: str, url: str, status) -> HistogramaLatencia:
+        return self._histogramas.get((method.upper(), normalizar_endpoint(url), str(status)))
+
+    def imprimir_resumen(self):
+        print("\n📈 --- LATENCIA POR RUTA (ms) ---")
+        print(f"{'RUTA':<40} {'N':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for ruta, r in self.resumen().items():
+            print(f"{ruta:<40} {r['peticiones']:>6} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+                  f"{r['p99']:>8.1f} {r['max']:>8.1f}")
+        for ruta, n in self.errores().items():
+            print(f"❌ {ruta}: {n} errores")
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._errores.clear()
+
+    # --- EXPOSICIÓN PROMETHEUS ---
+
+    def exportar_prometheus(self) -> str:
+        """Formato de texto de Prometheus (version 0.0.4)."""
+        p = self.prefijo
+        lineas = [
+            f"# HELP {p}_peticiones_total Peticiones HTTP por método, endpoint y status.",
+            f"# TYPE {p}_peticiones_total counter",
+        ]
+        histogramas = sorted(self._histogramas.items())
+        for clave, h in histogramas:
+            lineas.append(f"{p}_peticiones_total{{{_etiquetas(*clave)}}} {h.conteo}")
+
+        lineas += [
+            f"# HELP {p}_errores_total Peticiones fallidas (4xx, 5xx o sin respuesta).",
+            f"# TYPE {p}_errores_total counter",
+        ]
+        for (method, endpoint), n in sorted(self._errores.items()):
+            lineas.append(f"{p}_errores_total{{{_etiquetas(method, endpoint)}}} {n}")
+
+        lineas += [
+            f"# HELP {p}_duracion_segundos Latencia de las peticiones HTTP.",
+            f"# TYPE {p}_duracion_segundos histogram",
+        ]
+        for clave, h in histogramas:
+            etiquetas = _etiquetas(*clave)
+            conteos = h.conteo_hasta([l * 1000 for l in LIMITES_PROMETHEUS])
+            for limite, n in zip(LIMITES_PROMETHEUS, conteos):
+                lineas.append(f'{p}_duracion_segundos_bucket{{{etiquetas},le="{limite:g}"}} {n}')
+            lineas.append(f'{p}_duracion_segundos_bucket{{{etiquetas},le="+Inf"}} {h.conteo}')
+            lineas.append(f"{p}_duracion_segundos_sum{{{etiquetas}}} {h.suma_ms / 1000:.6f}")
+            lineas.append(f"{p}_duracion_segundos_count{{{etiquetas}}} {h.conteo}")
+        return "\n".join(lineas) + "\n"
+
+def _etiquetas(method, endpoint, status=None) -> str:
+    def escapar(valor):
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    texto = f'method="{escapar(method)}",endpoint="{escapar(endpoint)}"'
+    if status is not None:
+        texto += f',status="{escapar(status)}"'
+    return texto
+
+# Registro global del proceso (lo alimenta eco_logger.auditar_peticion_http)
+REGISTRO = RegistroMetricas()
+
+def agregar_ruta_metricas(app, registro: RegistroMetricas = None, ruta: str = "/metrics"):
+    """Monta GET /metrics en una aiohttp.web.Application para que Prometheus lo raspe."""
+    from aiohttp import web
+    registro = registro or REGISTRO
+
+    async def metricas(request):
+        return web.Response(text=registro.exportar_prometheus(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    app.router.add_get(ruta, metricas)
+    return app
@@ -1,15 +1,24 @@
 """
 Documento de Decisiones (Trade-offs):
-1. Bloqueo Síncrono: Los observadores se ejecutan secuencialmente. Si uno es lento, retrasa el polling.
+1. Observadores aislados: con DespachadorAsync cada observador tiene su propia cola y worker, así uno lento
+   ya no retrasa el polling. A cambio, según su política puede perder estados intermedios (descartar/coalescer)
+   o frenar al monitor cuando su cola se llena (bloquear).
 2. Sin límite de reintentos: El backoff llega a 60s, pero no se apaga solo tras múltiples fallos 5xx.
-3. Timeout estático: Usamos 10s para Short Polling; habría que aumentarlo drásticamente para Long Polling.
+3. Transportes intercambiables: SSE -> Long Polling -> Short Polling, con caída automática al siguiente
+   si el servidor no soporta uno. Long Polling usa timeout = espera + 10s; SSE no tiene timeout total.
 """
 
 import asyncio
 import aiohttp
 import datetime
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from transportes_monitor import (TransporteNoSoportado, TransporteShortPolling,
+                                 TransporteLongPolling, TransporteSSE)
 
-ServicioWebSocket : Observable
+URL_INVENTARIO = "http://localhost:9999/productos/500"
+URL_EVENTOS = "http://localhost:9999/eventos"
 
 # ==========================================
 # 1. CLASE OBSERVABLE (La base)
@@ -26,62 +35,188 @@ class Observable:
         for observador in self._observadores:
             observador(datos)
 
+# ==========================================
+# 1.1 DESPACHO ASÍNCRONO (Observadores aislados)
+# ==========================================
+POLITICAS_COLA = ("descartar_antiguo", "coalescer", "bloquear")
+
+class _CanalObservador:
+    """Cola acotada + worker propio para UN observador."""
+
+    def __init__(self, observador, politica, capacidad, executor):
+        if politica not in POLITICAS_COLA:
+            raise ValueError(f"Política desconocida: {politica}. Opciones: {POLITICAS_COLA}")
+        self.observador = observador
+        self.nombre = getattr(observador, "__qualname__", repr(observador))
+        self.politica = politica
+        # 'coalescer' solo necesita guardar el último estado pendiente
+        self.cola = asyncio.Queue(maxsize=1 if politica == "coalescer" else capacidad)
+        self._executor = executor
+        self._es_async = inspect.iscoroutinefunction(observador)
+        self.entregados = 0
+        self.descartados = 0
+        self.errores = 0
+        self._latencia_total = 0.0
+        self.latencia_max = 0.0
+        self.tarea = asyncio.create_task(self._trabajar())
+
+    async def encolar(self, datos):
+        item = (time.perf_counter(), datos)
+        if self.politica == "bloquear":
+            await self.cola.put(item)
+            return
+        if self.cola.full():
+            # descartar_antiguo: sale el más viejo / coalescer: el pendiente se reemplaza por el nuevo
+            self.cola.get_nowait()
+            self.cola.task_done()
+            self.descartados += 1
+        self.cola.put_nowait(item)
+
+    async def _trabajar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            encolado_en, datos = await self.cola.get()
+            try:
+                if self._es_async:
+                    await self.observador(datos)
+                else:
+                    # Los observadores síncronos corren en un hilo: nunca bloquean el event loop
+                    await loop.run_in_executor(self._executor, self.observador, datos)
+                self.entregados += 1
+            except Exception as e:
+                self.errores += 1
+                print(f"⚠️ Error en observador {self.nombre}: {e}")
+            finally:
+                latencia = time.perf_counter() - encolado_en
+                self._latencia_total += latencia
+                self.latencia_max = max(self.latencia_max, latencia)
+                self.cola.task_done()
+
+    def metricas(self) -> dict:
+        procesados = self.entregados + self.errores
+        return {
+            "politica": self.politica,
+            "pendientes": self.cola.qsize(),   # lag: notificaciones aún sin procesar
+            "entregados": self.entregados,
+            "descartados": self.descartados,
+            "errores": self.errores,
+            "latencia_ms_prom": (self._latencia_total / procesados * 1000) if procesados else 0.0,
+            "latencia_ms_max": self.latencia_max * 1000,
+        }
+
+class DespachadorAsync:
+    """
+    Reemplazo asíncrono de Observable.notificar.
+
+    Cada observador recibe su propia cola acotada y su propio worker, así que
+    uno lento (o que falla) no frena a los demás ni al ciclo de polling.
+    Las políticas por observador definen qué pasa cuando su cola se llena:
+      - "descartar_antiguo": se tira la notificación más vieja.
+      - "coalescer": solo se conserva el estado más reciente.
+      - "bloquear": notificar() espera (contrapresión hacia el monitor).
+    """
+
+    def __init__(self, capacidad: int = 10, politica: str = "descartar_antiguo", max_hilos: int = 4):
+        self._capacidad = capacidad
+        self._politica = politica
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="observador")
+        self._canales = []
+
+    def agregar_observador(self, observador, politica: str = None, capacidad: int = None):
+        """Debe llamarse con el event loop corriendo (crea la tarea del worker)."""
+        if any(c.observador is observador for c in self._canales):
+            return
+        self._canales.append(_CanalObservador(
+            observador, politica or self._politica, capacidad or self._capacidad, self._executor))
+
+    async def notificar(self, datos):
+        for canal in self._canales:
+            await canal.encolar(datos)
+
+    async def drenar(self):
+        """Espera a que todos los observadores procesen lo pendiente."""
+        await asyncio.gather(*(c.cola.join() for c in self._canales))
+
+    def metricas(self) -> dict:
+        """Por observador, con clave "<nombre>#<orden de alta>": dos lambdas o el mismo
+        método de dos instancias comparten __qualname__ y se pisarían."""
+        return {f"{c.nombre}#{i}": c.metricas() for i, c in enumerate(self._canales)}
+
+    async def detener(self, drenar: bool = True):
+        if drenar:
+            await self.drenar()
+        for canal in self._canales:
+            canal.tarea.cancel()
+        await asyncio.gather(*(c.tarea for c in self._canales), return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
 # ==========================================
 # 2. EL SERVICIO DE WEBSOCKET (El motor)
 # ==========================================
 class ServicioWebSocket(Observable):
-    def __init__(self):
+    def __init__(self, despachador: DespachadorAsync = None, transportes: list = None):
         super().__init__()
-        self._intervalo = 5       # Inicia en 5 segundos
-        self._etag = None         # Memoria del último ETag
         self._activo = False
+        self._despachador = despachador
+        # Orden de preferencia: se usa el primero que el servidor soporte
+        self._transportes = transportes or [TransporteShortPolling(URL_INVENTARIO)]
+        self.transporte_activo = None
+        self._escucha = None
+
+    def agregar_observador(self, observador, **kwargs):
+        if self._despachador is not None:
+            self._despachador.agregar_observador(observador, **kwargs)
+        elif kwargs:
+            raise ValueError(f"{sorted(kwargs)} solo aplican con un DespachadorAsync (este monitor notifica en línea).")
+        else:
+            super().agregar_observador(observador)
+
+    async def _emitir(self, datos):
+        if self._despachador is not None:
+            await self._despachador.notificar(datos)
+            return
+        # Sin despachador cada observador corre aquí mismo: uno que falla no debe tumbar la escucha
+        for observador in list(self._observadores):
+            try:
+                observador(datos)
+            except Exception as e:
+                print(f"⚠️ Error en observador {getattr(observador, '__qualname__', observador)}: {e}")
 
-    async def _consultar(self, session):
-        url = "http://localhost:9999/productos/500"
-        headers = {}
-        if self._etag:
-            headers["If-None-Match"] = self._etag
-
-        try:
-            async with session.get(url, headers=headers, timeout=10) as resp:
-                if resp.status == 200:
-                    self._etag = resp.headers.get("ETag", self._etag)
-                    datos = await resp.json()
-                    
-                    # Convertimos a lista si es un solo dict para facilitar a los observadores
-                    if isinstance(datos, dict) and "id" in datos:
-                        datos = [datos]
-
-                    self.notificar(datos)
-                    self._intervalo = max(5, self._intervalo - 5)
-                    print(f"🔄 [HTTP 200] Cambio detectado. Intervalo reducido a: {self._intervalo}s")
-
-                elif resp.status == 304:
-                    self._intervalo = min(60, self._intervalo + 5)
-                    print(f"💤 [HTTP 304] Sin cambios. Intervalo aumentado a: {self._intervalo}s")
-
-                elif resp.status >= 500:
-                    self._intervalo = min(60, self._intervalo + 10)
-                    print(f"⚠️ [HTTP {resp.status}] Servidor fallando. Backoff a: {self._intervalo}s")
-
-        except asyncio.TimeoutError:
-            self._intervalo = min(60, self._intervalo + 10)
-            print(f"⏳ [TIMEOUT] El servidor no respondió. Backoff a: {self._intervalo}s")
-        except Exception as e:
-            print(f"❌ Error de conexión: {e}")
+    async def _escuchar(self, session):
+        for transporte in self._transportes:
+            if not self._activo:
+                return
+            self.transporte_activo = transporte
+            print(f"📡 Transporte: {transporte.nombre}")
+            try:
+                async for datos in transporte.escuchar(session, lambda: self._activo):
+                    await self._emitir(datos)
+                return
+            except TransporteNoSoportado as e:
+                print(f"↪️  {e} Probando el siguiente transporte...")
+        self.transporte_activo = None
+        print("💀 Ningún transporte disponible en el servidor.")
 
     async def iniciar(self):
         self._activo = True
         print("🚀 Iniciando Monitor de Inventario EcoMarket...")
-        
+
         async with aiohttp.ClientSession() as session:
-            while self._activo:
-                await self._consultar(session)
-                print(f"⏳ Esperando {self._intervalo} segundos...\n")
-                await asyncio.sleep(self._intervalo)
+            self._escucha = asyncio.create_task(self._escuchar(session))
+            try:
+                await self._escucha
+            except asyncio.CancelledError:
+                # detener() corta la espera (long polling / SSE pueden estar bloqueados)
+                if self._activo:
+                    raise
+
+        if self._despachador is not None:
+            await self._despachador.detener()
 
     def detener(self):
         self._activo = False
+        if self._escucha is not None:
+            self._escucha.cancel()
         print("🛑 Deteniendo Monitor...")
 
 # ==========================================
@@ -106,12 +241,26 @@ def registrar_log(datos):
 # 4. BLOQUE PRINCIPAL DE EJECUCIÓN
 # ==========================================
 async def main():
-    monitor = ServicioWebSocket()
-    
+    from sincronizacion import SincronizadorCatalogo
+
+    # Despacho aislado: el sincronizador solo necesita el último inventario
+    monitor = ServicioWebSocket(
+        despachador=DespachadorAsync(),
+        transportes=[
+            TransporteSSE(URL_EVENTOS),
+            TransporteLongPolling(URL_INVENTARIO),
+            TransporteShortPolling(URL_INVENTARIO),
+        ],
+    )
+
+    # Sincronización incremental: el monitor entrega el inventario completo,
+    # el sincronizador calcula el delta y los observadores solo ven lo que cambió
+    sincronizador = SincronizadorCatalogo()
+    monitor.agregar_observador(sincronizador.procesar, politica="coalescer")
+
     # Conectando cables (Patrón Observer)
-    monitor.agregar_observador(imprimir_actualizados)
-    monitor.agregar_observador(detectar_agotados)
-    monitor.agregar_observador(registrar_log)
+    for observador in (imprimir_actualizados, detectar_agotados, registrar_log):
+        sincronizador.agregar_observador(lambda delta, obs=observador: obs(delta.cambiados))
 
     # Creamos una tarea para que el monitor corra en el fondo
     tarea_monitor = asyncio.create_task(monitor.iniciar())
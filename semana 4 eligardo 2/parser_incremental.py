@@ -0,0 +1,109 @@
+import codecs
+import json
+import re
+from typing import Any, Iterator
+
+class ErrorParser(ValueError):
+    """El flujo no es un arreglo JSON bien formado."""
+    pass
+
+class ParserArrayJSON:
+    """
+    Parser incremental para un arreglo JSON de nivel superior (ej. GET /productos).
+
+    Recibe el cuerpo en trozos de bytes y entrega cada elemento en cuanto
+    está completo. Solo guarda en memoria el elemento que se está armando,
+    así que el consumo depende del tamaño de UN producto y no del payload.
+    """
+
+    # Estados del arreglo de nivel superior
+    _ABRIR, _PRIMERO, _VALOR, _SEPARADOR, _CERRADO = range(5)
+    _ESPACIOS = re.compile(r"[ \t\r\n]*")
+    _ESCALAR = re.compile(r"[^ \t\r\n,\]]*")   # Un número/true/null termina en espacio, ',' o ']'
+    _DECODER = json.JSONDecoder()
+    _CIERRES = {"{": "}", "[": "]", '"': '"'}
+
+    def __init__(self, encoding: str = "utf-8"):
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._estado = self._ABRIR
+        self._revisado = 0         # Hasta dónde ya sabemos que el elemento pendiente NO cierra
+
+    def alimentar(self, chunk: bytes) -> Iterator[Any]:
+        """Agrega un trozo de bytes y devuelve los elementos que quedaron completos."""
+        self._buffer += self._decoder.decode(chunk)
+        yield from self._escanear(final=False)
+
+    def finalizar(self) -> Iterator[Any]:
+        """Cierra el flujo. Falla si el arreglo quedó incompleto."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        yield from self._escanear(final=True)
+        if self._estado != self._CERRADO:
+            raise ErrorParser("El arreglo JSON terminó de forma inesperada.")
+
+    # --- Internos ---
+
+    def _escanear(self, final: bool) -> Iterator[Any]:
+        # Los límites de cada elemento los encuentra raw_decode (en C); en Python
+        # solo recorremos los espacios, comas y corchetes ENTRE elementos.
+        buf = self._buffer
+        n = len(buf)
+        i = 0
+        while True:
+            i = self._ESPACIOS.match(buf, i).end()
+            if i >= n:
+                break
+            c = buf[i]
+
+            if self._estado == self._CERRADO:
+                raise ErrorParser(f"Contenido extra después del arreglo: {c!r}")
+
+            if self._estado == self._ABRIR:
+                if c != "[":
+                    raise ErrorParser(f"Se esperaba '[' y llegó {c!r}")
+                self._estado = self._PRIMERO
+                i += 1
+                continue
+
+            if self._estado == self._SEPARADOR:
+                if c == ",":
+                    self._estado = self._VALOR
+                elif c == "]":
+                    self._estado = self._CERRADO
+                else:
+                    raise ErrorParser(f"Se esperaba ',' o ']' y llegó {c!r}")
+                i += 1
+                continue
+
+            # _PRIMERO o _VALOR: toca un elemento
+            if c == "]" and self._estado == self._PRIMERO:
+                self._estado = self._CERRADO
+                i += 1
+                continue
+            if c in ",]":
+                raise ErrorParser(f"Se esperaba un valor y llegó {c!r} (coma sobrante)")
+            # Con trozos chicos no re-decodificamos un elemento largo en cada trozo:
+            # solo vale la pena si llegó algún carácter que pueda cerrarlo
+            cierre = self._CIERRES.get(c)
+            if not final and cierre and buf.find(cierre, max(i + 1, self._revisado)) == -1:
+                self._revisado = n
+                break
+            # Un escalar pegado al final del trozo puede seguir en el siguiente ("1" -> "1.5e3")
+            if not final and not cierre and self._ESCALAR.match(buf, i).end() == n:
+                break
+            try:
+                valor, fin = self._DECODER.raw_decode(buf, i)
+            except json.JSONDecodeError as e:
+                # Un escalar ya delimitado que no decodifica está mal, no incompleto
+                if final or not cierre:
+                    raise ErrorParser(f"Elemento JSON inválido: {e}")
+                self._revisado = n
+                break   # Elemento incompleto: esperamos el próximo trozo
+            self._estado = self._SEPARADOR
+            self._revisado = 0
+            i = fin
+            yield valor
+
+        # Descartamos lo ya consumido para que el buffer no crezca
+        self._buffer = buf[i:]
+        self._revisado = max(0, self._revisado - i)
@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import random
+import time
+import aiohttp
+from dataclasses import dataclass
+from typing import Dict, Optional
+from monitor import Observable
+from limitador_async import LimitadorTasa
+
+# ==========================================
+# PLANIFICADOR DE POLLING MULTI-RECURSO
+# ==========================================
+# Vigilar cientos de URLs con un ServicioWebSocket por URL significa
+# cientos de tareas que despiertan todas al mismo tiempo. Aquí un solo
+# ciclo maneja todos los recursos:
+#   - Una cola de prioridad (heap) ordenada por "próxima consulta".
+#   - Intervalo adaptativo POR recurso (200 -> vuelve al mínimo,
+#     304 -> crece x1.5, error -> crece x2, siempre dentro de [min, max]).
+#   - Jitter para que recursos con el mismo intervalo no se sincronicen.
+#   - Techo global de peticiones por segundo (LimitadorTasa).
+#   - Las consultas que vencen juntas salen en lote sobre la MISMA sesión.
+
+@dataclass
+class RecursoVigilado:
+    url: str
+    intervalo_min: float = 5
+    intervalo_max: float = 60
+    intervalo: float = 0
+    etag: Optional[str] = None
+    proxima: float = 0
+    consultas: int = 0
+    cambios: int = 0
+    errores: int = 0
+
+    def __post_init__(self):
+        self.intervalo = self.intervalo or self.intervalo_min
+
+class PlanificadorPolling(Observable):
+    """
+    Los observadores reciben {"url": ..., "datos": ...} cada vez que un
+    recurso responde 200 (cambió).
+    """
+
+    def __init__(self, max_rps: float = 20, jitter: float = 0.1, ventana_lote: float = 0.05,
+                 max_lote: int = 50, timeout: float = 10):
+        super().__init__()
+        self.jitter = jitter
+        self.ventana_lote = ventana_lote
+        self.max_lote = max_lote
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._limitador = LimitadorTasa(max_rps)
+        self._recursos: Dict[str, RecursoVigilado] = {}
+        self._agenda = []          # heap de (proxima, secuencia, url)
+        self._secuencia = 0
+        self._despertar = asyncio.Event()
+        self._activo = False
+
+    # --- ALTA / BAJA DE RECURSOS ---
+
+    def vigilar(self, url: str, intervalo_min: float = 5, intervalo_max: float = 60) -> RecursoVigilado:
+        if url in self._recursos:
+            return self._recursos[url]
+        recurso = RecursoVigilado(url, intervalo_min, intervalo_max)
+        self._recursos[url] = recurso
+        # La primera consulta se reparte dentro del primer intervalo (evita la estampida inicial)
+        self._agendar(recurso, time.monotonic() + random.uniform(0, intervalo_min))
+        return recurso
+
+    def dejar_de_vigilar(self, url: str):
+        # Las entradas viejas del heap se ignoran al salir (borrado perezoso)
+        self._recursos.pop(url, None)
+
+    def recursos(self) -> Dict[str, RecursoVigilado]:
+        return dict(self._recursos)
+
+    def _agendar(self, recurso: RecursoVigilado, cuando: float):
+        recurso.proxima = cuando
+        self._secuencia += 1
+        heapq.heappush(self._agenda, (cuando, self._secuencia, recurso.url))
+        self._despertar.set()
+
+    def _reagendar(self, recurso: RecursoVigilado):
+        factor = 1 + random.uniform(-self.jitter, self.jitter)
+        self._agendar(recurso, time.monotonic() + recurso.intervalo * factor)
+
+    # --- CICLO PRINCIPAL ---
+
+    def _tomar_vencidos(self) -> list:
+        """Saca del heap los recursos que vencen dentro de la ventana de lote."""
+        limite = time.monotonic() + self.ventana_lote
+        lote = []
+        while self._agenda and self._agenda[0][0] <= limite and len(lote) < self.max_lote:
+            cuando, _, url = heapq.heappop(self._agenda)
+            recurso = self._recursos.get(url)
+            if recurso is not None and recurso.proxima == cuando:
+                lote.append(recurso)
+        return lote
+
+    async def _esperar_siguiente(self):
+        self._despertar.clear()
+        if self._agenda:
+            espera = max(0, self._agenda[0][0] - time.monotonic())
+        else:
+            espera = None
+        try:
+            await asyncio.wait_for(self._despertar.wait(), espera)
+        except asyncio.TimeoutError:
+            pass
+
+    async def iniciar(self, session: aiohttp.ClientSession = None):
+        self._activo = True
+        propia = session is None
+        session = session or aiohttp.ClientSession(timeout=self.timeout)
+        en_vuelo = set()
+        try:
+            while self._activo:
+                lote = self._tomar_vencidos()
+                if not lote:
+                    await self._esperar_siguiente()
+                    continue
+                for recurso in lote:
+                    tarea = asyncio.create_task(self._consultar(session, recurso))
+                    en_vuelo.add(tarea)
+                    tarea.add_done_callback(en_vuelo.discard)
+        finally:
+            for tarea in list(en_vuelo):
+                tarea.cancel()
+            await asyncio.gather(*en_vuelo, return_exceptions=True)
+            if propia:
+                await session.close()
+
+    def detener(self):
+        self._activo = False
+        self._despertar.set()
+
+    async def _consultar(self, session: aiohttp.ClientSession, recurso: RecursoVigilado):
+        headers = {"If-None-Match": recurso.etag} if recurso.etag else {}
+        try:
+            async with self._limitador:
+                recurso.consultas += 1
+                async with session.get(recurso.url, headers=headers) as resp:
+                    if resp.status == 200:
+                        recurso.etag = resp.headers.get("ETag", recurso.etag)
+                        datos = await resp.json()
+                        recurso.cambios += 1
+                        recurso.intervalo = recurso.intervalo_min
+                        self.notificar({"url": recurso.url, "datos": datos})
+                    elif resp.status == 304:
+                        recurso.intervalo = min(recurso.intervalo_max, recurso.intervalo * 1.5)
+                    else:
+                        recurso.errores += 1
+                        recurso.intervalo = min(recurso.intervalo_max, recurso.intervalo * 2)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            recurso.errores += 1
+            recurso.intervalo = min(recurso.intervalo_max, recurso.intervalo * 2)
+            print(f"❌ [{recurso.url}] Error de conexión: {e!r}")
+        except Exception as e:
+            recurso.errores += 1
+            print(f"⚠️ [{recurso.url}] Error en observador o respuesta: {e}")
+        finally:
+            if recurso.url in self._recursos:
+                self._reagendar(recurso)
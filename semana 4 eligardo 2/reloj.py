@@ -0,0 +1,114 @@
+import asyncio
+import contextvars
+import selectors
+import time
+from contextlib import contextmanager
+
+# ==========================================
+# RELOJ INYECTABLE + BUCLE DE TIEMPO VIRTUAL
+# ==========================================
+# Los limitadores, el retry y el coordinador esperan con asyncio.sleep y
+# miden con time.monotonic(). Probarlos en tiempo real cuesta segundos por
+# test y los resultados bailan según la carga de la máquina.
+#
+# Todos leen la hora con reloj.ahora() y duermen (en código síncrono) con
+# reloj.dormir(). Por defecto son time.monotonic()/time.sleep(); dentro de
+# un BucleVirtual la hora es la del bucle y avanza de golpe hasta el
+# siguiente timer en cuanto no queda nada listo para correr:
+#
+#   resultado = reloj.correr_virtual(main())   # como asyncio.run, pero instantáneo
+#
+#   with reloj.virtual() as r:                 # para código síncrono (time.sleep)
+#       operacion_con_retry()
+#       assert r.ahora() == 3.0
+#
+# OJO: es para lógica de tiempos, no para red real. Si hay E/S pendiente
+# (sockets, hilos) y también un timer, el bucle salta al timer sin esperarla.
+
+class RelojReal:
+    def ahora(self) -> float:
+        return time.monotonic()
+
+    def dormir(self, segundos: float):
+        time.sleep(segundos)
+
+class RelojVirtual:
+    """Hora que solo avanza cuando alguien duerme (o se la avanza a mano)."""
+
+    def __init__(self, inicio: float = 0.0):
+        self._ahora = inicio
+        self.dormido = 0.0          # total de segundos "ahorrados"
+
+    def ahora(self) -> float:
+        return self._ahora
+
+    def avanzar(self, segundos: float):
+        if segundos > 0:
+            self._ahora += segundos
+            self.dormido += segundos
+
+    def dormir(self, segundos: float):
+        self.avanzar(segundos)
+
+_RELOJ_SYNC = contextvars.ContextVar("reloj_sync", default=RelojReal())
+
+def ahora() -> float:
+    """Hora monotónica: la del bucle si hay uno corriendo, si no la del reloj síncrono."""
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return _RELOJ_SYNC.get().ahora()
+
+def dormir(segundos: float):
+    """time.sleep() reemplazable por un reloj virtual."""
+    _RELOJ_SYNC.get().dormir(segundos)
+
+@contextmanager
+def virtual(inicio: float = 0.0):
+    reloj = RelojVirtual(inicio)
+    token = _RELOJ_SYNC.set(reloj)
+    try:
+        yield reloj
+    finally:
+        _RELOJ_SYNC.reset(token)
+
+# --- BUCLE DE TIEMPO VIRTUAL ---
+
+class _SelectorVirtual(selectors.DefaultSelector):
+    """
+    asyncio llama a select(timeout) con lo que falta para el próximo timer.
+    En vez de bloquear ese tiempo, miramos si hay E/S lista y, si no, movemos
+    el reloj hasta el timer.
+    """
+
+    def __init__(self, reloj: RelojVirtual):
+        super().__init__()
+        self._reloj = reloj
+
+    def select(self, timeout=None):
+        eventos = super().select(0)
+        if eventos or timeout == 0:
+            return eventos
+        if timeout is None:
+            # Sin timers: solo puede despertarnos E/S real (p. ej. un hilo que termina)
+            return super().select(None)
+        self._reloj.avanzar(timeout)
+        return []
+
+class BucleVirtual(asyncio.SelectorEventLoop):
+    def __init__(self, reloj: RelojVirtual = None):
+        self.reloj = reloj or RelojVirtual()
+        super().__init__(_SelectorVirtual(self.reloj))
+
+    def time(self) -> float:
+        return self.reloj.ahora()
+
+def correr_virtual(coro, reloj: RelojVirtual = None):
+    """asyncio.run() sobre un BucleVirtual. El código síncrono del mismo hilo también ve el reloj virtual."""
+    bucle = BucleVirtual(reloj)
+    token = _RELOJ_SYNC.set(bucle.reloj)
+    try:
+        with asyncio.Runner(loop_factory=lambda: bucle) as runner:
+            return runner.run(coro)
+    finally:
+        _RELOJ_SYNC.reset(token)
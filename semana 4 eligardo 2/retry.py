@@ -0,0 +1,108 @@
+import asyncio
+import inspect
+import random
+import logging
+from functools import wraps
+import aiohttp
+import requests
+import reloj
+import trazas
+
+# Configuración básica de logs
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("RetryEngine")
+
+# Errores de red que vale la pena reintentar en el cliente asíncrono
+ERRORES_REINTENTABLES_ASYNC = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+def _reintentable_async(e: Exception) -> bool:
+    """
+    ¿Vale la pena reintentar este error del cliente asíncrono?
+    Además de los errores de red, EcoMarketClient envuelve las respuestas
+    HTTP en ErrorNegocio (con .status) y los timeouts en EcoMarketError
+    (con el asyncio.TimeoutError como causa): no importamos esas clases
+    para no crear una dependencia circular con cliente_ecomarket.
+    """
+    if isinstance(e, ERRORES_REINTENTABLES_ASYNC + (aiohttp.ClientResponseError,)):
+        return True
+    if isinstance(e.__cause__, asyncio.TimeoutError):
+        return True
+    status = getattr(e, "status", None)
+    return isinstance(status, int) and (status >= 500 or status == 429)
+
+def with_retry(max_retries=3, base_delay=1, backoff_factor=2):
+    """
+    Decorador para reintentar operaciones HTTP con Exponential Backoff + Jitter.
+    Funciona con funciones normales (requests) y con corrutinas (aiohttp).
+    Cada intento queda en su propio span ("intento") para ver en la traza
+    cuánto tiempo se fue en fallos y esperas.
+    
+    Args:
+        max_retries (int): Número máximo de intentos adicionales.
+        base_delay (int): Tiempo base de espera en segundos.
+        backoff_factor (int): Multiplicador para el tiempo de espera (exponencial).
+    """
+    def decidir_espera(e, attempt):
+        """Devuelve los segundos a esperar, o None si hay que propagar el error."""
+        # 1. Análisis del error
+        response = getattr(e, "response", None)
+        status_code = getattr(response, "status_code", None) or getattr(e, "status", None)
+
+        # NO REINTENTAR errores de cliente (4xx), excepto 429 (Too Many Requests)
+        if status_code and 400 <= status_code < 500 and status_code != 429:
+            logger.error(f"❌ Error de cliente ({status_code}). No se reintenta.")
+            return None
+
+        # 2. Si se acabaron los intentos, lanzamos el error final
+        if attempt == max_retries:
+            logger.critical(f"💀 Se agotaron los {max_retries} reintentos. Fallo final: {e}")
+            return None
+
+        # 3. Cálculo de espera (Backoff + Jitter)
+        delay = base_delay * (backoff_factor ** attempt)
+        jitter = random.uniform(0, 1) # Aleatoriedad para evitar colisiones
+        total_sleep = delay + jitter
+
+        logger.warning(
+            f"⚠️ Intento {attempt + 1}/{max_retries} falló por {e}. "
+            f"Reintentando en {total_sleep:.2f}s..."
+        )
+        return total_sleep
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper_async(*args, **kwargs):
+                attempt = 0
+                while attempt <= max_retries:
+                    try:
+                        with trazas.span("intento", numero=attempt + 1, funcion=func.__name__):
+                            return await func(*args, **kwargs)
+                    except Exception as e:
+                        if not _reintentable_async(e):
+                            raise
+                        total_sleep = decidir_espera(e, attempt)
+                        if total_sleep is None:
+                            raise e
+                        with trazas.span("retry.backoff", segundos=round(total_sleep, 3)):
+                            await asyncio.sleep(total_sleep)
+                        attempt += 1
+            return wrapper_async
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            attempt = 0
+            while attempt <= max_retries:
+                try:
+                    with trazas.span("intento", numero=attempt + 1, funcion=func.__name__):
+                        return func(*args, **kwargs)
+                
+                except requests.RequestException as e:
+                    total_sleep = decidir_espera(e, attempt)
+                    if total_sleep is None:
+                        raise e
+                    with trazas.span("retry.backoff", segundos=round(total_sleep, 3)):
+                        reloj.dormir(total_sleep)  # time.sleep, o avance virtual en tests
+                    attempt += 1
+        return wrapper
+    return decorator
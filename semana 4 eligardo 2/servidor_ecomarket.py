@@ -0,0 +1,445 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from aiohttp import web
+from modelos import CATEGORIAS_VALIDAS
+from inyector_fallos import InyectorFallos
+
+# ==========================================
+# SERVIDOR ECOMARKET EN MEMORIA (aiohttp)
+# ==========================================
+# Los servidores de prueba anteriores (MockServerHandler del benchmark,
+# chaos_server*.py) usan http.server: un hilo por conexión o, peor, uno
+# solo. Con unos cientos de req/s ya están saturados y el benchmark mide
+# al mock, no al cliente.
+#
+# Este implementa el contrato completo de EcoMarket en memoria sobre
+# asyncio, con keep-alive y sin log de acceso:
+#   GET    /productos            (q, categoria, productor_id; page+limit -> lista,
+#                                 limit+cursor -> {"items", "siguiente_cursor"},
+#                                 updated_since -> {"items", "eliminados", "hasta"})
+#   POST   /productos            201
+#   POST   /productos/lote       {"items": [...]} -> {"resultados": [{"status", "producto"|"error"}]}
+#                                (hasta MAX_LOTE; cada item se valida por separado)
+#   GET    /productos/{id}       ETag / If-None-Match -> 304, 404
+#   PUT    /productos/{id}       reemplazo completo
+#   PATCH  /productos/{id}       cambio parcial
+#   DELETE /productos/{id}       204 / 404
+#   GET    /perfil, /anuncios, /categorias, /salud
+#   GET    /_fallos              (solo con fallos=: qué se inyectó hasta ahora)
+# Las respuestas de lectura se serializan UNA vez por versión y se guardan
+# como bytes: servir un GET es buscar en un dict y escribir al socket.
+# ?delay=<ms> en cualquier ruta simula latencia de red/BD sin bloquear.
+
+def _ahora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _a_bytes(datos) -> bytes:
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class ErrorDatos(ValueError):
+    pass
+
+MAX_LOTE = 1000
+
+def validar_producto(datos, parcial: bool = False) -> dict:
+    """Reglas del contrato (ProductoNuevo). En PATCH solo se validan los campos enviados."""
+    if not isinstance(datos, dict):
+        raise ErrorDatos("Se esperaba un objeto JSON")
+    if not parcial:
+        faltantes = [c for c in ("nombre", "precio", "categoria") if c not in datos]
+        if faltantes:
+            raise ErrorDatos(f"Faltan campos obligatorios: {faltantes}")
+    if "nombre" in datos and (not isinstance(datos["nombre"], str) or not datos["nombre"].strip()):
+        raise ErrorDatos("'nombre' debe ser un texto no vacío")
+    if "precio" in datos:
+        precio = datos["precio"]
+        if isinstance(precio, bool) or not isinstance(precio, (int, float)) or precio <= 0:
+            raise ErrorDatos("'precio' debe ser un número positivo")
+    if "stock" in datos and (isinstance(datos["stock"], bool) or not isinstance(datos["stock"], int)
+                             or datos["stock"] < 0):
+        raise ErrorDatos("'stock' debe ser un entero >= 0")
+    if "categoria" in datos:
+        if not isinstance(datos["categoria"], str) or datos["categoria"].lower() not in CATEGORIAS_VALIDAS:
+            raise ErrorDatos(f"Categoría no permitida. Opciones: {sorted(CATEGORIAS_VALIDAS)}")
+    return {k: v for k, v in datos.items() if k != "id"}
+
+class AlmacenProductos:
+    """Productos en memoria con versión, caché de bytes y bitácora de bajas."""
+
+    def __init__(self):
+        self.productos: Dict[str, dict] = {}
+        self._versiones: Dict[str, int] = {}
+        self._cache: Dict[str, Tuple[bytes, str]] = {}   # id -> (cuerpo, etag)
+        self._cache_listado: Optional[bytes] = None
+        self._bajas: List[Tuple[str, str]] = []          # (cuando, id)
+        self._siguiente_id = 1
+
+    def sembrar(self, cantidad: int):
+        categorias = sorted(CATEGORIAS_VALIDAS)
+        for i in range(cantidad):
+            self.crear({"nombre": f"Producto {i + 1}", "precio": round(10 + (i * 7.3) % 490, 2),
+                        "categoria": categorias[i % len(categorias)], "stock": i % 50,
+                        "disponible": i % 10 != 0,
+                        "productor": {"id": f"prod-{i % 25}", "nombre": f"Productor {i % 25}"}})
+
+    def _guardar(self, id_prod: str, producto: dict) -> dict:
+        self._versiones[id_prod] = self._versiones.get(id_prod, 0) + 1
+        producto = {**producto, "id": id_prod, "actualizado_en": _ahora_iso()}
+        producto["categoria"] = producto["categoria"].lower()
+        producto.setdefault("disponible", True)
+        self.productos[id_prod] = producto
+        self._cache.pop(id_prod, None)
+        self._cache_listado = None
+        return producto
+
+    def crear(self, datos: dict) -> dict:
+        id_prod = str(self._siguiente_id)
+        self._siguiente_id += 1
+        return self._guardar(id_prod, {**datos, "creado_en": _ahora_iso()})
+
+    def reemplazar(self, id_prod: str, datos: dict) -> Optional[dict]:
+        anterior = self.productos.get(id_prod)
+        if anterior is None:
+            return None
+        return self._guardar(id_prod, {**datos, "creado_en": anterior.get("creado_en")})
+
+    def modificar(self, id_prod: str, campos: dict) -> Optional[dict]:
+        anterior = self.productos.get(id_prod)
+        if anterior is None:
+            return None
+        return self._guardar(id_prod, {**anterior, **campos})
+
+    def eliminar(self, id_prod: str) -> bool:
+        if self.productos.pop(id_prod, None) is None:
+            return False
+        self._cache.pop(id_prod, None)
+        self._cache_listado = None
+        self._bajas.append((_ahora_iso(), id_prod))
+        return True
+
+    def cuerpo(self, id_prod: str) -> Optional[Tuple[bytes, str]]:
+        """(bytes JSON, ETag) del producto, serializado una sola vez por versión."""
+        en_cache = self._cache.get(id_prod)
+        if en_cache is None:
+            producto = self.productos.get(id_prod)
+            if producto is None:
+                return None
+            en_cache = self._cache[id_prod] = (_a_bytes(producto), f'"{id_prod}-v{self._versiones[id_prod]}"')
+        return en_cache
+
+    def cuerpo_listado(self) -> bytes:
+        if self._cache_listado is None:
+            self._cache_listado = _a_bytes(list(self.productos.values()))
+        return self._cache_listado
+
+    def filtrar(self, q: str = None, categoria: str = None, productor_id: str = None,
+                desde: str = None) -> List[dict]:
+        q = q.lower() if q else None
+        categoria = categoria.lower() if categoria else None
+        resultado = []
+        for p in self.productos.values():
+            if categoria and p["categoria"] != categoria:
+                continue
+            if productor_id and (p.get("productor") or {}).get("id") != productor_id:
+                continue
+            if q and q not in p["nombre"].lower() and q not in (p.get("descripcion") or "").lower():
+                continue
+            if desde and p["actualizado_en"] <= desde:
+                continue
+            resultado.append(p)
+        return resultado
+
+    def bajas_desde(self, desde: str) -> List[str]:
+        return [id_prod for cuando, id_prod in self._bajas if cuando > desde]
+
+ALMACEN = web.AppKey("almacen", AlmacenProductos)
+
+def _json(datos, status: int = 200, headers: dict = None) -> web.Response:
+    return web.Response(body=_a_bytes(datos), status=status, headers=headers,
+                        content_type="application/json")
+
+def _error(status: int, mensaje: str) -> web.Response:
+    return _json({"error": mensaje}, status)
+
+async def _leer_json(request):
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise ErrorDatos("El cuerpo no es JSON válido")
+
+def _entero(valor: str, nombre: str, minimo: int = 0) -> int:
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ErrorDatos(f"'{nombre}' debe ser un entero")
+    if numero < minimo:
+        raise ErrorDatos(f"'{nombre}' debe ser >= {minimo}")
+    return numero
+
+def crear_app(productos_iniciales: int = 100, token: str = None, latencia_ms: float = 0,
+              fallos: Optional[InyectorFallos] = None, lote: bool = True) -> web.Application:
+    """
+    token: si se da, exige 'Authorization: Bearer <token>' (401 si no).
+    latencia_ms: retraso fijo para todas las respuestas (además de ?delay=).
+    fallos: InyectorFallos con las reglas de caos (ver inyector_fallos.py).
+    lote: False apaga POST /productos/lote (para probar la caída a POST individuales).
+    """
+
+    # Token, ?delay= y errores de datos se resuelven envolviendo cada handler
+    # al registrarlo. Un @web.middleware hace lo mismo pero arma la cadena de
+    # llamadas en CADA petición (~10-15us medidos), que aquí es lo que queremos evitar.
+    def envolver(handler):
+        async def envuelto(request):
+            if token and request.headers.get("Authorization") != f"Bearer {token}":
+                return _error(401, "Token inválido o ausente")
+            retraso = latencia_ms
+            if "delay=" in request.query_string:
+                try:
+                    retraso += float(request.query["delay"])
+                except (KeyError, ValueError):
+                    return _error(400, "'delay' debe ser un número (ms)")
+            if retraso > 0:
+                await asyncio.sleep(retraso / 1000)
+            try:
+                if fallos is not None:
+                    return await fallos.ejecutar(request, handler)
+                return await handler(request)
+            except ErrorDatos as e:
+                return _error(400, str(e))
+        return envuelto
+
+    app = web.Application()
+    almacen = AlmacenProductos()
+    almacen.sembrar(productos_iniciales)
+    app[ALMACEN] = almacen
+
+    async def listar(request):
+        query = request.query
+        filtros = {k: query.get(k) for k in ("q", "categoria", "productor_id")}
+        desde = query.get("updated_since")
+
+        # Camino rápido: listado completo sin filtros (lo más común en benchmarks)
+        if not any(filtros.values()) and not desde and "limit" not in query and "page" not in query:
+            return web.Response(body=almacen.cuerpo_listado(), content_type="application/json")
+
+        hasta = _ahora_iso()
+        items = almacen.filtrar(**filtros, desde=desde)
+        if desde:
+            return _json({"items": items, "eliminados": almacen.bajas_desde(desde), "hasta": hasta})
+
+        limite = _entero(query.get("limit", 100), "limit", minimo=1)
+        if "page" in query:
+            pagina = _entero(query["page"], "page", minimo=1)
+            return _json(items[(pagina - 1) * limite: pagina * limite])
+        if "limit" in query:
+            inicio = _entero(query.get("cursor") or 0, "cursor")
+            siguiente = inicio + limite
+            return _json({"items": items[inicio:siguiente],
+                          "siguiente_cursor": str(siguiente) if siguiente < len(items) else None})
+        return _json(items)
+
+    async def crear(request):
+        datos = validar_producto(await _leer_json(request))
+        return _json(almacen.crear(datos), status=201)
+
+    async def crear_lote(request):
+        cuerpo = await _leer_json(request)
+        items = cuerpo.get("items") if isinstance(cuerpo, dict) else cuerpo
+        if not isinstance(items, list):
+            raise ErrorDatos("Se esperaba {\"items\": [...]}")
+        if len(items) > MAX_LOTE:
+            return _error(413, f"Máximo {MAX_LOTE} productos por lote")
+        # Un item inválido no tumba el lote: cada uno lleva su propio status
+        resultados = []
+        for item in items:
+            try:
+                resultados.append({"status": 201, "producto": almacen.crear(validar_producto(item))})
+            except ErrorDatos as e:
+                resultados.append({"status": 400, "error": str(e)})
+        return _json({"resultados": resultados})
+
+    async def obtener(request):
+        en_cache = almacen.cuerpo(request.match_info["id"])
+        if en_cache is None:
+            return _error(404, "Producto no encontrado")
+        cuerpo, etag = en_cache
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=cuerpo, content_type="application/json", headers={"ETag": etag})
+
+    async def reemplazar(request):
+        datos = validar_producto(await _leer_json(request))
+        producto = almacen.reemplazar(request.match_info["id"], datos)
+        return _json(producto) if producto else _error(404, "Producto no encontrado")
+
+    async def modificar(request):
+        campos = validar_producto(await _leer_json(request), parcial=True)
+        producto = almacen.modificar(request.match_info["id"], campos)
+        return _json(producto) if producto else _error(404, "Producto no encontrado")
+
+    async def eliminar(request):
+        if almacen.eliminar(request.match_info["id"]):
+            return web.Response(status=204)
+        return _error(404, "Producto no encontrado")
+
+    perfil = _a_bytes({"usuario": "Eligardo", "nivel": "Oro"})
+    anuncios = _a_bytes([{"id": "1", "texto": "Envío gratis en miel esta semana"}])
+    categorias = _a_bytes(sorted(CATEGORIAS_VALIDAS))
+
+    def estatico(cuerpo: bytes):
+        async def handler(request):
+            return web.Response(body=cuerpo, content_type="application/json")
+        return handler
+
+    async def salud(request):
+        return _json({"status": "ok", "productos": len(almacen.productos)})
+
+    rutas = [
+        ("GET", "/productos", listar),
+        ("POST", "/productos", crear),
+        ("POST", "/productos/lote", crear_lote),
+        ("GET", "/productos/{id}", obtener),
+        ("PUT", "/productos/{id}", reemplazar),
+        ("PATCH", "/productos/{id}", modificar),
+        ("DELETE", "/productos/{id}", eliminar),
+        ("GET", "/perfil", estatico(perfil)),
+        ("GET", "/anuncios", estatico(anuncios)),
+        ("GET", "/categorias", estatico(categorias)),
+        ("GET", "/salud", salud),
+    ]
+    if not lote:
+        rutas = [r for r in rutas if r[1] != "/productos/lote"]
+    for metodo, ruta, handler in rutas:
+        app.router.add_route(metodo, ruta, envolver(handler))
+    if fallos is not None:
+        async def estadisticas_fallos(request):
+            return _json(fallos.estadisticas())
+        # Sin envolver: consultar las estadísticas no debe sufrir los fallos
+        app.router.add_get("/_fallos", estadisticas_fallos)
+        app.on_startup.append(lambda app: _reiniciar_reloj(fallos))
+    return app
+
+async def _reiniciar_reloj(fallos: InyectorFallos):
+    # Las fases del programa cuentan desde que el servidor arranca, no desde que se leyó el archivo
+    fallos.reiniciar_reloj()
+
+class ServidorEnHilo:
+    """
+    Levanta el servidor en un hilo con su propio event loop, para usarlo
+    desde código síncrono (benchmark, requests):
+
+        with ServidorEnHilo() as url:
+            requests.get(f"{url}/productos")
+    """
+
+    def __init__(self, puerto: int = 0, **opciones):
+        self.puerto = puerto
+        self.opciones = opciones
+        self.url = None
+        self._loop = None
+        self._runner = None
+        self._hilo = None
+
+    def iniciar(self) -> str:
+        listo = threading.Event()
+
+        def correr():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(crear_app(**self.opciones), access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            sitio = web.TCPSite(self._runner, "127.0.0.1", self.puerto)
+            self._loop.run_until_complete(sitio.start())
+            self.puerto = self._runner.addresses[0][1]
+            self.url = f"http://127.0.0.1:{self.puerto}"
+            listo.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=correr, name="servidor-ecomarket", daemon=True)
+        self._hilo.start()
+        listo.wait(10)
+        return self.url
+
+    def detener(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join(10)
+            self._loop = None
+
+    def __enter__(self) -> str:
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.detener()
+
+def _correr_en_proceso(cola, puerto: int, opciones: dict):
+    async def arrancar():
+        runner = web.AppRunner(crear_app(**opciones), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", puerto).start()
+        cola.put(runner.addresses[0][1])
+        await asyncio.Event().wait()   # Hasta que el proceso padre nos termine
+
+    asyncio.run(arrancar())
+
+class ServidorEnProceso:
+    """
+    Igual que ServidorEnHilo pero en OTRO proceso: el servidor no comparte
+    el GIL con el cliente que se está midiendo (lo que usa el benchmark).
+    """
+
+    def __init__(self, puerto: int = 0, **opciones):
+        self.puerto = puerto
+        self.opciones = opciones
+        self.url = None
+        self._proceso = None
+
+    def iniciar(self) -> str:
+        cola = multiprocessing.Queue()
+        self._proceso = multiprocessing.Process(target=_correr_en_proceso, name="servidor-ecomarket",
+                                                args=(cola, self.puerto, self.opciones), daemon=True)
+        self._proceso.start()
+        self.puerto = cola.get(timeout=30)
+        self.url = f"http://127.0.0.1:{self.puerto}"
+        return self.url
+
+    def detener(self):
+        if self._proceso is not None:
+            self._proceso.terminate()
+            self._proceso.join(10)
+            self._proceso = None
+
+    def __enter__(self) -> str:
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.detener()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor EcoMarket en memoria (aiohttp)")
+    parser.add_argument("--puerto", type=int, default=9999)
+    parser.add_argument("--productos", type=int, default=100, help="Productos sembrados al iniciar")
+    parser.add_argument("--token", help="Exigir este Bearer token")
+    parser.add_argument("--latencia", type=float, default=0, help="Retraso fijo por respuesta (ms)")
+    parser.add_argument("--fallos", help="Archivo YAML/JSON con reglas de inyección de fallos")
+    args = parser.parse_args()
+    fallos = InyectorFallos.desde_archivo(args.fallos) if args.fallos else None
+
+    try:
+        import uvloop  # Opcional: event loop más rápido
+        uvloop.install()
+    except ImportError:
+        pass
+
+    print(f"🌿 Servidor EcoMarket en memoria en puerto {args.puerto} ({args.productos} productos)")
+    if fallos:
+        print(f"💥 Inyección de fallos activa: {len(fallos.reglas)} reglas desde {args.fallos}")
+    # access_log=None: escribir una línea por petición costaría más que atenderla
+    web.run_app(crear_app(args.productos, args.token, args.latencia, fallos), port=args.puerto, access_log=None)
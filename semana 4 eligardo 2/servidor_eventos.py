@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import json
+import random
+from aiohttp import web
+
+# ==========================================
+# SERVIDOR LOCAL DE EVENTOS (para probar el monitor)
+# ==========================================
+# Simula el inventario de EcoMarket y lo va cambiando solo. Ofrece los
+# tres transportes que entiende monitor.py:
+#   GET /productos/{id}   -> Short Polling (ETag / 304)
+#                          + Long Polling con "Prefer: wait=N"
+#   GET /eventos           -> SSE (text/event-stream)
+# Con --sin-sse o --sin-long-polling se apagan para probar la caída
+# automática al siguiente transporte.
+
+class InventarioSimulado:
+    def __init__(self, id_producto: str = "500"):
+        self.version = 1
+        self.producto = {"id": id_producto, "nombre": "Miel de Yucatán", "precio": 150.0,
+                         "categoria": "miel", "disponible": True, "stock": 10}
+        self._evento_cambio = asyncio.Event()
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    def cambiar(self):
+        """Aplica un cambio y despierta a todos los que esperan (long polling y SSE)."""
+        stock = max(0, self.producto["stock"] + random.choice([-3, -2, -1, 2, 5]))
+        self.producto = {**self.producto, "stock": stock, "disponible": stock > 0}
+        self.version += 1
+        evento, self._evento_cambio = self._evento_cambio, asyncio.Event()
+        evento.set()
+
+    async def esperar_cambio(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._evento_cambio.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+INVENTARIO = web.AppKey("inventario", InventarioSimulado)
+TAREA_CAMBIOS = web.AppKey("tarea_cambios", asyncio.Task)
+
+def _leer_espera(request) -> float:
+    """Extrae N de 'Prefer: wait=N' (RFC 7240)."""
+    for preferencia in request.headers.get("Prefer", "").split(","):
+        nombre, _, valor = preferencia.strip().partition("=")
+        if nombre.lower() == "wait":
+            try:
+                return min(float(valor), 60)
+            except ValueError:
+                return 0
+    return 0
+
+def crear_app(intervalo_cambios: float = 3.0, long_polling: bool = True, sse: bool = True) -> web.Application:
+    app = web.Application()
+    inventario = InventarioSimulado()
+    app[INVENTARIO] = inventario
+
+    async def obtener_producto(request):
+        if request.match_info["id"] != inventario.producto["id"]:
+            raise web.HTTPNotFound()
+
+        cabeceras = {}
+        espera = _leer_espera(request) if long_polling else 0
+        if espera:
+            cabeceras["Preference-Applied"] = f"wait={espera:g}"
+            # Retenemos la petición mientras el cliente ya tenga la versión actual
+            if request.headers.get("If-None-Match") == inventario.etag:
+                await inventario.esperar_cambio(espera)
+
+        if request.headers.get("If-None-Match") == inventario.etag:
+            return web.Response(status=304, headers={**cabeceras, "ETag": inventario.etag})
+        return web.json_response(inventario.producto, headers={**cabeceras, "ETag": inventario.etag})
+
+    async def eventos(request):
+        resp = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+        })
+        await resp.prepare(request)
+        await resp.write(b"retry: 1000\n\n")
+
+        ultimo = request.headers.get("Last-Event-ID")
+        try:
+            while True:
+                if ultimo != str(inventario.version):
+                    ultimo = str(inventario.version)
+                    mensaje = f"id: {ultimo}\nevent: inventario\ndata: {json.dumps(inventario.producto)}\n\n"
+                    await resp.write(mensaje.encode("utf-8"))
+                elif not await inventario.esperar_cambio(15):
+                    await resp.write(b": keep-alive\n\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return resp
+
+    async def cambios_automaticos(app):
+        while True:
+            await asyncio.sleep(intervalo_cambios)
+            inventario.cambiar()
+            print(f"🔁 Inventario cambiado -> versión {inventario.version}")
+
+    async def al_iniciar(app):
+        if intervalo_cambios > 0:
+            app[TAREA_CAMBIOS] = asyncio.create_task(cambios_automaticos(app))
+
+    async def al_cerrar(app):
+        tarea = app.get(TAREA_CAMBIOS)
+        if tarea:
+            tarea.cancel()
+            await asyncio.gather(tarea, return_exceptions=True)
+
+    app.router.add_get("/productos/{id}", obtener_producto)
+    if sse:
+        app.router.add_get("/eventos", eventos)
+    app.on_startup.append(al_iniciar)
+    app.on_cleanup.append(al_cerrar)
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de eventos de inventario EcoMarket")
+    parser.add_argument("--puerto", type=int, default=9999)
+    parser.add_argument("--intervalo", type=float, default=3.0, help="Segundos entre cambios simulados")
+    parser.add_argument("--sin-sse", action="store_true")
+    parser.add_argument("--sin-long-polling", action="store_true")
+    args = parser.parse_args()
+
+    print(f"📡 Servidor de eventos en puerto {args.puerto} "
+          f"(SSE: {not args.sin_sse}, Long Polling: {not args.sin_long_polling})")
+    web.run_app(crear_app(args.intervalo, long_polling=not args.sin_long_polling, sse=not args.sin_sse),
+                port=args.puerto)
@@ -0,0 +1,137 @@
+import datetime
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from monitor import Observable
+
+# ==========================================
+# SINCRONIZACIÓN INCREMENTAL DEL CATÁLOGO
+# ==========================================
+# En vez de comparar "datos != ultimo_estado" sobre la lista completa y
+# avisar a todos con TODO el inventario, guardamos una huella por producto
+# y calculamos qué se agregó, qué cambió y qué desapareció. Los
+# observadores reciben solo ese delta.
+#
+# Si el servidor entiende ?updated_since=<ISO-8601> solo viajan los
+# cambios. Para saber si lo entiende esperamos un sobre:
+#   {"items": [...], "eliminados": ["id", ...], "hasta": "<ISO-8601>"}
+# Si en cambio responde una lista plana, ignoró el filtro y tratamos la
+# respuesta como un listado completo (y dejamos de mandar el parámetro).
+
+# Campos que, si vienen, ya identifican la versión del producto (más barato que hashear)
+CAMPOS_VERSION = ("version", "actualizado_en")
+
+@dataclass
+class DeltaCatalogo:
+    agregados: List[dict] = field(default_factory=list)
+    modificados: List[dict] = field(default_factory=list)
+    eliminados: List[str] = field(default_factory=list)
+
+    @property
+    def cambiados(self) -> List[dict]:
+        """Agregados + modificados: lo que un observador tiene que (re)pintar."""
+        return self.agregados + self.modificados
+
+    def vacio(self) -> bool:
+        return not (self.agregados or self.modificados or self.eliminados)
+
+    def __len__(self) -> int:
+        return len(self.agregados) + len(self.modificados) + len(self.eliminados)
+
+def huella(item: dict) -> Any:
+    """Identifica el contenido de un producto para detectar cambios."""
+    for campo in CAMPOS_VERSION:
+        if item.get(campo) is not None:
+            return (campo, item[campo])
+    contenido = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).digest()
+
+class SincronizadorCatalogo(Observable):
+    """
+    Mantiene huellas por id y notifica a sus observadores con un DeltaCatalogo.
+
+    Se puede usar de dos formas:
+      1. Como observador de ServicioWebSocket: monitor.agregar_observador(sync.procesar)
+      2. Tirando del servidor: await sync.sincronizar(cliente)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._huellas: Dict[str, Any] = {}
+        self._ultima_sync: Optional[str] = None
+        self.soporta_updated_since: Optional[bool] = None  # None = aún no sabemos
+
+    def calcular_delta(self, datos: List[dict], completo: bool = True,
+                       eliminados: List[str] = None) -> DeltaCatalogo:
+        """
+        Compara 'datos' contra las huellas guardadas y las actualiza.
+
+        completo=True: 'datos' es el inventario entero; lo que falta se considera eliminado.
+        completo=False: 'datos' trae solo cambios (updated_since); las bajas llegan
+        en 'eliminados' o como items con "eliminado": true.
+        """
+        delta = DeltaCatalogo()
+        vistos = set()
+
+        for item in datos or []:
+            id_prod = str(item.get("id"))
+            if item.get("eliminado"):
+                if self._huellas.pop(id_prod, None) is not None:
+                    delta.eliminados.append(id_prod)
+                continue
+            vistos.add(id_prod)
+            nueva = huella(item)
+            anterior = self._huellas.get(id_prod)
+            if anterior is None:
+                delta.agregados.append(item)
+            elif anterior != nueva:
+                delta.modificados.append(item)
+            else:
+                continue
+            self._huellas[id_prod] = nueva
+
+        if completo:
+            faltantes = [i for i in self._huellas if i not in vistos]
+        else:
+            faltantes = [str(i) for i in eliminados or [] if str(i) in self._huellas]
+        for id_prod in faltantes:
+            del self._huellas[id_prod]
+            delta.eliminados.append(id_prod)
+
+        return delta
+
+    def procesar(self, datos: List[dict]):
+        """Observador para ServicioWebSocket: reenvía solo lo que cambió."""
+        delta = self.calcular_delta(datos)
+        if not delta.vacio():
+            self.notificar(delta)
+
+    async def sincronizar(self, cliente) -> DeltaCatalogo:
+        """Trae cambios desde el servidor (con updated_since si lo soporta) y notifica el delta."""
+        inicio = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        params = {}
+        if self._ultima_sync and self.soporta_updated_since is not False:
+            params["updated_since"] = self._ultima_sync
+
+        data = await cliente._request("GET", "productos", query_params=params)
+
+        if isinstance(data, dict) and "items" in data:
+            if params:
+                self.soporta_updated_since = True
+            delta = self.calcular_delta(data["items"], completo=not params,
+                                        eliminados=data.get("eliminados"))
+            # Preferimos el reloj del servidor para no perder cambios por desfase
+            self._ultima_sync = data.get("hasta", inicio)
+        else:
+            if params:
+                self.soporta_updated_since = False
+            delta = self.calcular_delta(data or [], completo=True)
+            self._ultima_sync = inicio
+
+        if not delta.vacio():
+            self.notificar(delta)
+        return delta
+
+    def __len__(self) -> int:
+        return len(self._huellas)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+import pytest
+from backends_concurrencia import BACKENDS, BackendAsyncio, BackendHilos, crear_backend, fetch_many
+from inyector_fallos import InyectorFallos
+from servidor_ecomarket import ServidorEnHilo
+
+# Cada id "lento" tarda 200ms en el servidor: secuencial suma, hilos/asyncio solapan
+FALLOS = {"reglas": [
+    {"ruta": "/productos/13", "errores": {"503": 1.0}},
+    {"ruta": "/productos/{id}", "latencia": {"tipo": "fija", "ms": 200}},
+]}
+
+@pytest.fixture(scope="module")
+def url():
+    with ServidorEnHilo(productos_iniciales=20, token="t", fallos=InyectorFallos(FALLOS)) as url:
+        yield url
+
+@pytest.mark.parametrize("nombre", sorted(BACKENDS))
+def test_mismo_resultado_en_los_tres_backends(url, nombre):
+    resultados = fetch_many([3, 13, 404, 1], url, backend=nombre, token="t")
+    assert [r.id for r in resultados] == [3, 13, 404, 1]          # mismo orden que la entrada
+    assert [r.status for r in resultados] == [200, 503, 404, 200]
+    assert resultados[0].datos["id"] == "3" and resultados[0].ok
+    assert resultados[1].error == "HTTP 503" and resultados[2].datos is None
+
+def test_hilos_y_asyncio_solapan_las_esperas(url):
+    ids = list(range(1, 9))
+    tiempos = {}
+    for nombre in BACKENDS:
+        with crear_backend(nombre, url, token="t", max_concurrentes=8) as backend:
+            inicio = time.perf_counter()
+            assert all(r.ok for r in backend.fetch_many(ids))
+            tiempos[nombre] = time.perf_counter() - inicio
+    assert tiempos["secuencial"] >= 1.6
+    assert tiempos["hilos"] < 0.8 and tiempos["asyncio"] < 0.8
+
+def test_asyncio_timeout_no_cuenta_la_espera_en_fila():
+    # 40 ids por 5 carriles = 8 tandas de 300ms (~2.4s): cada petición tarda
+    # 300ms, muy por debajo del timeout de 1s, aunque el lote entero lo supere.
+    with ServidorEnHilo(productos_iniciales=40, token="t", latencia_ms=300) as url_lenta:
+        with BackendAsyncio(url_lenta, token="t", max_concurrentes=5, timeout=1) as backend:
+            resultados = backend.fetch_many(range(1, 41))
+    assert [r.error for r in resultados if not r.ok] == []
+    assert max(r.duracion_s for r in resultados) < 1
+
+def test_hilos_una_sesion_por_hilo_y_pool_acotado(url):
+    with BackendHilos(url, token="t", max_concurrentes=3) as backend:
+        backend.fetch_many(range(1, 7))
+        backend.fetch_many(range(1, 7))
+        # Las sesiones se crean una vez por hilo y se reutilizan entre llamadas
+        assert len(backend._sesiones) == 3
+    assert not [h for h in threading.enumerate() if h.name.startswith("fetch")]
+
+def test_errores_de_red_no_cortan_el_lote():
+    resultados = fetch_many([1, 2], "http://127.0.0.1:9", backend="hilos", timeout=1)
+    assert [r.status for r in resultados] == [None, None]
+    assert all("ConnectionError" in r.error for r in resultados)
+
+def test_asyncio_desde_codigo_async(url):
+    async def principal():
+        async with BackendAsyncio(url, token="t") as backend:
+            with pytest.raises(RuntimeError, match="afetch_many"):
+                backend.fetch_many([1])
+            return await backend.afetch_many([1, 2])
+
+    assert [r.status for r in asyncio.run(principal())] == [200, 200]
+    with pytest.raises(ValueError, match="Opciones"):
+        crear_backend("procesos", url)
@@ -0,0 +1,59 @@
+import statistics
+import pytest
+from benchmark_sync_vs_async import (percentil, intervalo_mediana, resumir, comparar, recomendar,
+                                     ejecutar_benchmark, construir_reporte, start_mock_server)
+
+def _fila(mediana, ic, tipo="async", escenario="Dashboard", latencia=100):
+    return {"escenario": escenario, "latencia_ms": latencia, "tipo": tipo,
+            "mediana_s": mediana, "ic95_mediana_s": list(ic)}
+
+def test_estadisticos_basicos():
+    tiempos = [0.10, 0.11, 0.12, 0.13, 0.50]
+    assert percentil(tiempos, 50) == 0.12
+    assert percentil(tiempos, 95) == pytest.approx(0.13 + (0.50 - 0.13) * 0.8)
+    bajo, alto = intervalo_mediana(tiempos)
+    assert bajo <= statistics.median(tiempos) <= alto
+
+    resumen = resumir(tiempos, n_peticiones=4)
+    assert resumen["mediana_s"] == 0.12
+    assert resumen["max_s"] == 0.50
+    assert resumen["rps"] == 4 / 0.12
+    assert resumen["muestras"] == 5
+
+def test_regresion_requiere_superar_umbral_y_ruido():
+    base = {"resultados": [_fila(0.100, (0.095, 0.105)), _fila(0.200, (0.19, 0.21), tipo="sync")]}
+    # async: +30% y sin solape -> regresión. sync: +30% pero con solape -> ruido
+    actual = {"resultados": [_fila(0.130, (0.125, 0.135)), _fila(0.260, (0.20, 0.30), tipo="sync")]}
+    resultado = {c["tipo"]: c for c in comparar(base, actual, umbral=0.10)}
+    assert resultado["async"]["regresion"] is True
+    assert resultado["sync"]["regresion"] is False
+
+    mejora = {"resultados": [_fila(0.050, (0.045, 0.055))]}
+    assert not any(c["regresion"] for c in comparar(base, mejora))
+
+def test_recomendacion_sale_de_los_datos():
+    resultados = [
+        _fila(0.40, (0.39, 0.41), "sync", latencia=0), _fila(0.39, (0.30, 0.45), "async", latencia=0),
+        _fila(0.80, (0.79, 0.81), "sync", latencia=100), _fila(0.20, (0.19, 0.21), "async", latencia=100),
+    ]
+    lineas = recomendar(resultados)
+    assert "sin diferencia clara" in lineas[0]
+    assert "async gana" in lineas[1]
+    assert lineas[-1] == "- Async gana con significancia desde 100 ms de latencia simulada."
+
+def test_corrida_corta_contra_servidor_local():
+    server = start_mock_server(0)
+    try:
+        url_base = f"http://localhost:{server.server_address[1]}"
+        resultados = ejecutar_benchmark(url_base, escenarios={"Mini": [("GET", "/stats")] * 3},
+                                        latencias=[0], repeticiones=3, calentamiento=1,
+                                        pasadas_memoria=1, verbose=False)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [f["tipo"] for f in resultados] == ["sync", "async"]
+    assert all(f["muestras"] == 3 and f["memoria_pico_kb"] > 0 for f in resultados)
+    reporte = construir_reporte(resultados, repeticiones=3, calentamiento=1)
+    assert reporte["meta"]["repeticiones"] == 3
+    assert comparar(reporte, reporte)[0]["cambio"] == 0
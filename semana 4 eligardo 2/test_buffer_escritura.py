@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from aiohttp.test_utils import TestServer
+import reloj
+from buffer_escritura import BufferEscritura
+from cliente_ecomarket import EcoMarketClient
+from servidor_ecomarket import ALMACEN, crear_app
+
+# Los tests de tiempo usan un cliente de mentira + reloj.correr_virtual:
+# la edad (max_edad_s) se verifica al instante exacto y sin esperar.
+
+class ClienteFalso:
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+        self.llamadas = []          # (momento de inicio, id, campos)
+        self.en_vuelo = set()
+
+    async def actualizar_producto_parcial(self, id_prod, campos):
+        assert id_prod not in self.en_vuelo, "dos PATCH del mismo id a la vez"
+        self.en_vuelo.add(id_prod)
+        self.llamadas.append((reloj.ahora(), id_prod, dict(campos)))
+        await asyncio.sleep(self.latencia)
+        self.en_vuelo.discard(id_prod)
+        if id_prod == "404":
+            return None
+        return {"id": id_prod, **campos}
+
+def test_fusiona_por_producto_y_el_ultimo_gana():
+    async def principal():
+        cliente = ClienteFalso()
+        async with BufferEscritura(cliente, max_edad_s=10) as buffer:
+            futuros = [buffer.actualizar("1", {"stock": s}) for s in range(10, 0, -1)]
+            buffer.actualizar("1", {"disponible": False})
+            buffer.actualizar(2, {"precio": 5.0})
+            otro = buffer.actualizar("404", {"stock": 1})
+        return cliente, buffer, futuros, otro
+
+    cliente, buffer, futuros, otro = reloj.correr_virtual(principal())
+    assert [(i, c) for _, i, c in cliente.llamadas] == [
+        ("1", {"stock": 1, "disponible": False}), ("2", {"precio": 5.0}), ("404", {"stock": 1})]
+    assert all(f.result() == {"id": "1", "stock": 1, "disponible": False} for f in futuros)
+    assert otro.result() is None
+    assert buffer.estadisticas == {"encolados": 13, "fusionados": 10, "enviados": 3}
+
+def test_flush_por_edad_y_por_tamano():
+    async def principal():
+        cliente = ClienteFalso()
+        buffer = BufferEscritura(cliente, max_pendientes=3, max_edad_s=0.5)
+        buffer.actualizar("1", {"stock": 1})
+        await asyncio.sleep(0.2)
+        buffer.actualizar("1", {"stock": 2})     # se fusiona, pero no rejuvenece al pendiente
+        await asyncio.sleep(1)
+        for i in ("a", "b", "c"):               # 3 distintos = max_pendientes: sale ya
+            buffer.actualizar(i, {"stock": 0})
+        await asyncio.sleep(0)
+        await buffer.cerrar()
+        return cliente
+
+    llamadas = reloj.correr_virtual(principal()).llamadas
+    assert llamadas[0] == (0.5, "1", {"stock": 2})
+    assert [(t, i) for t, i, _ in llamadas[1:]] == [(1.2, "a"), (1.2, "b"), (1.2, "c")]
+
+def test_orden_por_producto_con_patch_en_vuelo():
+    async def principal():
+        cliente = ClienteFalso(latencia=1.0)
+        buffer = BufferEscritura(cliente, max_edad_s=0.1)
+        primero = buffer.actualizar("1", {"stock": 5})
+        await asyncio.sleep(0.5)                 # el primero ya viaja (salió en t=0.1)
+        segundo = buffer.actualizar("1", {"stock": 4})
+        tercero = buffer.actualizar("1", {"stock": 3})
+        await buffer.cerrar()
+        return cliente, primero.result(), segundo.result(), tercero.result()
+
+    cliente, primero, segundo, tercero = reloj.correr_virtual(principal())
+    assert [(t, c) for t, _, c in cliente.llamadas] == [(0.1, {"stock": 5}), (1.1, {"stock": 3})]
+    assert primero["stock"] == 5 and segundo["stock"] == tercero["stock"] == 3
+
+def test_cancelar_envio_cancela_a_quien_espera():
+    async def principal():
+        buffer = BufferEscritura(ClienteFalso(latencia=10), max_edad_s=0.1)
+        futuro = buffer.actualizar("1", {"stock": 5})
+        await asyncio.sleep(1)                   # el PATCH ya viaja
+        envio = buffer._en_vuelo["1"]
+        envio.cancel()
+        await asyncio.gather(envio, return_exceptions=True)
+        return buffer, futuro
+
+    buffer, futuro = reloj.correr_virtual(principal())
+    assert futuro.cancelled() and not buffer._en_vuelo
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_tormenta_de_stock_contra_el_servidor():
+    app = crear_app(productos_iniciales=5)
+    async with TestServer(app) as servidor:
+        async with EcoMarketClient(str(servidor.make_url("")), "t") as cliente:
+            async with cliente.buffer_escritura(max_edad_s=0.05) as buffer:
+                for ronda in range(10):
+                    for id_prod in range(1, 6):
+                        buffer.actualizar(id_prod, {"stock": 100 - ronda})
+                buffer.actualizar("3", {"precio": 1.5})
+            with pytest.raises(RuntimeError, match="cerrado"):
+                buffer.actualizar("1", {"stock": 0})
+
+    almacen = app[ALMACEN]
+    assert buffer.estadisticas["enviados"] == 5       # 51 cambios -> 5 PATCH
+    assert {p["stock"] for p in almacen.productos.values()} == {91}
+    assert almacen.productos["3"]["precio"] == 1.5
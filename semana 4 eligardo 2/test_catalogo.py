@@ -0,0 +1,193 @@
+import re
+import time
+import pytest
+from modelos import Producto
+from catalogo_compacto import CatalogoColumnar, ProductoCompacto
+from consulta_catalogo import ConsultaCatalogo
+from indice_catalogo import CatalogoIndexado
+from sincronizacion import SincronizadorCatalogo
+from aioresponses import aioresponses
+from cliente_ecomarket import EcoMarketClient
+
+def _producto(i, categoria="frutas", precio=10.0, disponible=True, productor=None, **extra):
+    datos = {"id": str(i), "nombre": f"Prod-{i}", "precio": precio, "categoria": categoria,
+             "disponible": disponible, **extra}
+    if productor:
+        datos["productor"] = {"id": productor, "nombre": f"Granja {productor}"}
+    return Producto(**datos)
+
+@pytest.fixture
+def productos():
+    return [
+        _producto(1, "miel", 150.0, productor="p1", creado_en="2025-01-01T10:00:00Z"),
+        _producto(2, "miel", 250.0, disponible=False, productor="p1"),
+        _producto(3, "frutas", 20.0, productor="p2", descripcion="Manzana roja"),
+        _producto(4, "lacteos", 80.0),
+    ]
+
+# --- CATÁLOGO COLUMNAR ---
+
+def test_columnar_mismos_atributos(productos):
+    catalogo = CatalogoColumnar.desde_productos(productos)
+    assert len(catalogo) == 4
+    for original, vista in zip(productos, catalogo):
+        assert isinstance(vista, ProductoCompacto)
+        for campo in Producto.model_fields:
+            assert getattr(vista, campo) == getattr(original, campo)
+
+def test_columnar_vista_sin_dict(productos):
+    vista = CatalogoColumnar.desde_productos(productos)[0]
+    assert not hasattr(vista, "__dict__")
+    with pytest.raises(AttributeError):
+        vista.precio = 1.0
+
+def test_columnar_reconstruye_producto(productos):
+    catalogo = CatalogoColumnar.desde_productos(productos)
+    assert catalogo.obtener("3").a_producto() == productos[2]
+    assert catalogo.obtener("no-existe") is None
+
+@pytest.mark.parametrize("creado_en", ["2025-01-01T10:00:00", "2025-01-01T10:00:00+02:00"])
+def test_columnar_fecha_ida_y_vuelta(creado_en, monkeypatch):
+    # Con una zona local distinta de UTC, .timestamp() de una fecha naive se correría
+    monkeypatch.setenv("TZ", "America/Bogota")
+    time.tzset()
+    try:
+        original = _producto(1, creado_en=creado_en)
+        vista = CatalogoColumnar.desde_productos([original]).obtener("1")
+        assert vista.creado_en == original.creado_en
+        assert vista.creado_en.utcoffset() == original.creado_en.utcoffset()
+        assert vista.a_producto() == original
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+def test_columnar_id_repetido_reemplaza(productos):
+    catalogo = CatalogoColumnar.desde_productos(productos)
+    catalogo.extender([_producto(3, "frutas", 25.0)])
+    assert len(catalogo) == 4
+    assert catalogo.obtener("3").precio == 25.0
+    assert catalogo.obtener("3").descripcion is None
+
+def test_columnar_comparte_productor(productos):
+    catalogo = CatalogoColumnar.desde_productos(productos)
+    assert catalogo[0].productor is catalogo[1].productor
+    assert catalogo[3].productor is None
+
+# --- CONSULTAS VECTORIZADAS ---
+
+def test_consulta_filtros_combinados(productos):
+    consulta = ConsultaCatalogo.desde_productos(productos)
+    assert consulta.filtrar(categoria="Miel", disponible=True, precio_max=200).ids() == ["1"]
+    assert consulta.filtrar(productor_id="p1").ids() == ["1", "2"]
+    assert consulta.filtrar(categoria=["frutas", "lacteos"], precio_min=50).ids() == ["4"]
+    assert consulta.filtrar(categoria="conservas").contar() == 0
+
+def test_consulta_orden_y_limite(productos):
+    consulta = ConsultaCatalogo.desde_productos(productos)
+    assert consulta.ordenar_por("precio", descendente=True).limitar(2).ids() == ["2", "1"]
+    assert [p.nombre for p in consulta.ordenar_por("precio").limitar(1).productos()] == ["Prod-3"]
+    with pytest.raises(ValueError):
+        consulta.ordenar_por("nombre")
+
+def test_consulta_orden_por_categoria_alfabetico(productos):
+    # Se insertan miel, frutas, lacteos: el orden debe ser alfabético, no de aparición
+    consulta = ConsultaCatalogo.desde_productos(productos)
+    assert consulta.ordenar_por("categoria").ids() == ["3", "4", "1", "2"]
+    assert consulta.ordenar_por("categoria", descendente=True).ids()[:2] == ["2", "1"]
+
+def test_consulta_agrupar_por_categoria(productos):
+    grupos = ConsultaCatalogo.desde_productos(productos).agrupar_por_categoria()
+    assert grupos["miel"] == {"conteo": 2, "precio_promedio": 200.0, "precio_min": 150.0,
+                              "precio_max": 250.0, "agotados": 1}
+    assert grupos["frutas"]["conteo"] == 1
+    assert "conservas" not in grupos
+
+# --- ÍNDICES SECUNDARIOS ---
+
+def test_indice_busquedas(productos):
+    catalogo = CatalogoIndexado(productos)
+    assert [p.id for p in catalogo.buscar(categoria="miel", disponible=True, precio_max=200)] == ["1"]
+    assert [p.id for p in catalogo.buscar(productor_id="p1")] == ["1", "2"]
+    assert [p.id for p in catalogo.buscar(precio_min=50, precio_max=150)] == ["4", "1"]
+    assert catalogo.buscar(categoria="conservas") == []
+    assert catalogo.obtener("3").nombre == "Prod-3"
+
+def test_indice_actualizacion_incremental(productos):
+    catalogo = CatalogoIndexado(productos)
+    catalogo.upsert(_producto(2, "miel", 90.0, disponible=True, productor="p3"))
+    assert [p.id for p in catalogo.buscar(categoria="miel", disponible=True)] == ["2", "1"]
+    assert [p.id for p in catalogo.buscar(productor_id="p1")] == ["1"]
+    assert [p.id for p in catalogo.buscar(precio_min=200)] == []
+    assert catalogo.eliminar("1") is True
+    assert catalogo.eliminar("1") is False
+    assert [p.id for p in catalogo.buscar(categoria="miel")] == ["2"]
+    assert len(catalogo) == 3
+
+def test_indice_como_observador(productos):
+    catalogo = CatalogoIndexado(productos)
+    catalogo.actualizar([
+        {"id": "5", "nombre": "Queso", "precio": 60.0, "categoria": "lacteos"},
+        {"id": "4", "eliminado": True},
+        {"id": "6", "nombre": "Sin precio", "categoria": "miel"},
+    ])
+    assert [p.id for p in catalogo.buscar(categoria="lacteos")] == ["5"]
+    assert "6" not in catalogo
+
+
+# --- SINCRONIZACIÓN INCREMENTAL ---
+
+def _dict(i, precio=10.0, **extra):
+    return {"id": str(i), "nombre": f"Prod-{i}", "precio": precio, "categoria": "frutas", **extra}
+
+def test_sync_delta_listado_completo():
+    sync = SincronizadorCatalogo()
+    recibidos = []
+    sync.agregar_observador(recibidos.append)
+
+    sync.procesar([_dict(1), _dict(2), _dict(3)])
+    sync.procesar([_dict(1), _dict(2), _dict(3)])          # sin cambios: no notifica
+    sync.procesar([_dict(1), _dict(2, precio=99.0), _dict(4)])
+
+    assert len(recibidos) == 2
+    delta = recibidos[1]
+    assert [d["id"] for d in delta.agregados] == ["4"]
+    assert [d["id"] for d in delta.modificados] == ["2"]
+    assert delta.eliminados == ["3"]
+
+def test_sync_delta_parcial_con_bajas():
+    sync = SincronizadorCatalogo()
+    sync.calcular_delta([_dict(1, version=1), _dict(2, version=1), _dict(3, version=1)])
+    delta = sync.calcular_delta([_dict(1, version=2), {"id": "2", "eliminado": True}],
+                                completo=False, eliminados=["3"])
+    assert [d["id"] for d in delta.modificados] == ["1"]
+    assert sorted(delta.eliminados) == ["2", "3"]
+    assert len(sync) == 1
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_sync_usa_updated_since():
+    async with EcoMarketClient(base_url="http://api.ecomarket.com", token="t") as cliente:
+        sync = SincronizadorCatalogo()
+        with aioresponses() as m:
+            m.get("http://api.ecomarket.com/productos",
+                  payload={"items": [_dict(1), _dict(2)], "hasta": "2026-01-01T00:00:00Z"})
+            m.get("http://api.ecomarket.com/productos?updated_since=2026-01-01T00%3A00%3A00Z",
+                  payload={"items": [_dict(2, precio=5.0)], "eliminados": ["1"], "hasta": "2026-01-02T00:00:00Z"})
+            primero = await sync.sincronizar(cliente)
+            segundo = await sync.sincronizar(cliente)
+    assert len(primero.agregados) == 2
+    assert [d["id"] for d in segundo.modificados] == ["2"]
+    assert segundo.eliminados == ["1"]
+    assert sync.soporta_updated_since is True
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_sync_servidor_sin_updated_since():
+    async with EcoMarketClient(base_url="http://api.ecomarket.com", token="t") as cliente:
+        sync = SincronizadorCatalogo()
+        with aioresponses() as m:
+            m.get("http://api.ecomarket.com/productos", payload=[_dict(1), _dict(2)])
+            # Ignora el filtro y responde el listado completo como lista plana
+            m.get(re.compile(r".*/productos\?updated_since=.*"), payload=[_dict(2)])
+            await sync.sincronizar(cliente)
+            delta = await sync.sincronizar(cliente)
+    assert delta.eliminados == ["1"]
+    assert sync.soporta_updated_since is False
@@ -1,9 +1,11 @@
 import pytest
 import asyncio
+import json
 import aiohttp
 from aioresponses import aioresponses, CallbackResult
 # Asegúrate de importar las excepciones desde tu cliente
 from cliente_ecomarket import EcoMarketClient, ErrorNegocio, ErrorValidacion, EcoMarketError
+from parser_incremental import ParserArrayJSON
 
 pytestmark = pytest.mark.asyncio(loop_scope="function")
 
@@ -138,6 +140,38 @@ async def test_error_504(client):
         m.get("http://api.ecomarket.com/productos/1", status=504)
         with pytest.raises(ErrorNegocio): await client.obtener_producto("1")
 
+@pytest.fixture
+async def client_reintentos(monkeypatch):
+    monkeypatch.setattr("retry.random.uniform", lambda a, b: 0)
+    async with EcoMarketClient(base_url="http://api.ecomarket.com", token="token_test",
+                               reintentos=2, espera_reintento=0.001) as c:
+        yield c
+
+@pytest.mark.parametrize("fallo", [{"status": 503}, {"status": 429}, {"exception": asyncio.TimeoutError()}])
+async def test_reintenta_errores_transitorios(client_reintentos, fallo):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos/1", **fallo)
+        m.get("http://api.ecomarket.com/productos/1", payload=PRODUCTO_VALIDO)
+        res = await client_reintentos.obtener_producto("1")
+        assert res.nombre == "Manzana"
+
+async def test_no_reintenta_4xx_ni_post(client_reintentos):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos/1", status=400)
+        m.post("http://api.ecomarket.com/productos", status=503)
+        with pytest.raises(ErrorNegocio):
+            await client_reintentos.obtener_producto("1")
+        with pytest.raises(ErrorNegocio):
+            await client_reintentos.crear_producto(PRODUCTO_NUEVO)
+        assert sum(len(llamadas) for llamadas in m.requests.values()) == 2
+
+async def test_reintentos_agotados_propagan_el_error(client_reintentos):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos/1", status=500, repeat=True)
+        with pytest.raises(ErrorNegocio):
+            await client_reintentos.obtener_producto("1")
+        assert len(list(m.requests.values())[0]) == 3   # 1 intento + 2 reintentos
+
 async def test_request_204_no_content(client):
     """Verifica respuesta vacía."""
     with aioresponses() as m:
@@ -160,4 +194,102 @@ async def test_listar_varios_elementos(client):
     with aioresponses() as m:
         m.get("http://api.ecomarket.com/productos", payload=[PRODUCTO_VALIDO, PRODUCTO_VALIDO])
         res = await client._request("GET", "productos")
-        assert len(res) == 2
\ No newline at end of file
+        assert len(res) == 2
+# --- STREAMING DE /productos ---
+
+async def test_iterar_productos_streaming(client):
+    """Los productos llegan uno a uno aunque el cuerpo venga en trozos pequeños."""
+    lista = [{**PRODUCTO_VALIDO, "id": str(i), "descripcion": 'con "comillas", [y] {llaves}'} for i in range(5)]
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos", payload=lista)
+        res = [p async for p in client.iterar_productos(chunk_size=7)]
+    assert [p.id for p in res] == ["0", "1", "2", "3", "4"]
+    assert res[0].categoria == "frutas"
+
+async def test_iterar_productos_item_invalido(client):
+    lista = [PRODUCTO_VALIDO, {"id": "2", "nombre": "Sin precio"}]
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos", payload=lista)
+        recibidos = []
+        with pytest.raises(ErrorValidacion):
+            async for p in client.iterar_productos():
+                recibidos.append(p)
+    assert len(recibidos) == 1
+
+async def test_iterar_productos_json_truncado(client):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos", body='[{"id": "1", "nombre"', content_type="application/json")
+        with pytest.raises(EcoMarketError) as exc:
+            [p async for p in client.iterar_productos()]
+        assert "JSON válido" in str(exc.value)
+
+@pytest.mark.parametrize("plantilla", ["[,P]", "[P,,P]", "[P,]", "[P P]"])
+async def test_iterar_productos_comas_invalidas(client, plantilla):
+    cuerpo = plantilla.replace("P", json.dumps(PRODUCTO_VALIDO))
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos", body=cuerpo, content_type="application/json")
+        with pytest.raises(EcoMarketError, match="JSON válido"):
+            [p async for p in client.iterar_productos()]
+
+async def test_parser_escalares_partidos_entre_trozos():
+    """Un número cortado por el trozo ("1" + ".5e3") no se entrega antes de tiempo."""
+    datos = [12345, -1.5e3, True, None, "a,]", [], {"x": [1, {"y": "}"}]}]
+    crudo = json.dumps(datos).encode()
+    for tam in (1, 3, len(crudo)):
+        parser = ParserArrayJSON()
+        salida = [v for k in range(0, len(crudo), tam) for v in parser.alimentar(crudo[k:k + tam])]
+        assert salida + list(parser.finalizar()) == datos
+
+# --- PAGINACIÓN ---
+
+def _pagina(ids):
+    return [{**PRODUCTO_VALIDO, "id": str(i)} for i in ids]
+
+async def test_paginar_productos_por_pagina(client):
+    """Se detiene al recibir una página incompleta."""
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos?limit=2&page=1", payload=_pagina([1, 2]))
+        m.get("http://api.ecomarket.com/productos?limit=2&page=2", payload=_pagina([3, 4]))
+        m.get("http://api.ecomarket.com/productos?limit=2&page=3", payload=_pagina([5]))
+        paginas = [p async for p in client.paginar_productos(limite=2, prefetch=2)]
+    assert [[p.id for p in pag] for pag in paginas] == [["1", "2"], ["3", "4"], ["5"]]
+
+async def test_paginar_productos_por_cursor_con_filtro(client):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos?categoria=miel&limit=2&cursor=",
+              payload={"items": _pagina([1, 2]), "siguiente_cursor": "abc"})
+        m.get("http://api.ecomarket.com/productos?categoria=miel&limit=2&cursor=abc",
+              payload={"items": _pagina([3]), "siguiente_cursor": None})
+        ids = [p.id async for p in client.iterar_catalogo(
+            categoria="miel", limite=2, estilo="cursor", cursor="")]
+    assert ids == ["1", "2", "3"]
+
+async def test_paginar_productos_propaga_error(client):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos?limit=2&page=1", payload=_pagina([1, 2]))
+        m.get("http://api.ecomarket.com/productos?limit=2&page=2", status=500)
+        recibidas = []
+        with pytest.raises(ErrorNegocio):
+            async for pagina in client.paginar_productos(limite=2):
+                recibidas.append(pagina)
+    assert len(recibidas) == 1
+
+# --- CRUD COMPLETO ---
+
+async def test_listar_actualizar_y_eliminar(client):
+    with aioresponses() as m:
+        m.get("http://api.ecomarket.com/productos", payload=[PRODUCTO_VALIDO])
+        m.put("http://api.ecomarket.com/productos/1", payload={**PRODUCTO_VALIDO, "precio": 11.0})
+        m.patch("http://api.ecomarket.com/productos/1", payload={**PRODUCTO_VALIDO, "precio": 9.5})
+        m.delete("http://api.ecomarket.com/productos/1", status=204)
+        m.delete("http://api.ecomarket.com/productos/2", status=404)
+
+        assert [p.id for p in await client.listar_productos()] == ["1"]
+        assert (await client.actualizar_producto_total("1", {**PRODUCTO_NUEVO, "precio": 11.0})).precio == 11.0
+        assert (await client.actualizar_producto_parcial("1", {"precio": 9.5})).precio == 9.5
+        assert await client.eliminar_producto("1") is True
+        assert await client.eliminar_producto("2") is False
+
+async def test_actualizar_total_valida_antes_de_enviar(client):
+    with pytest.raises(ErrorNegocio):
+        await client.actualizar_producto_total("1", {"nombre": "Sin precio"})
@@ -0,0 +1,74 @@
+import gc
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from cliente_profesional import EcoMarketClient, ErrorNegocio
+from servidor_ecomarket import ServidorEnHilo
+
+HILOS = 32
+
+@pytest.fixture(scope="module")
+def url():
+    # 20ms por respuesta: así los 32 hilos de verdad se solapan
+    with ServidorEnHilo(productos_iniciales=40, token="t", latencia_ms=20) as url:
+        yield url
+
+@pytest.fixture(autouse=True)
+def silenciar_urllib3():
+    # "Connection pool is full, discarding connection" es justo lo que contamos
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+
+def _golpear(cliente, peticiones=128):
+    with ThreadPoolExecutor(HILOS) as pool:
+        productos = list(pool.map(lambda i: cliente.obtener_producto(i % 40 + 1), range(peticiones)))
+        estado = cliente.estado_pool()   # Con los hilos vivos: sus Session siguen registradas
+    assert all(p is not None for p in productos)
+    return estado
+
+def _host(estado):
+    return next(iter(estado["hosts"].values()))
+
+def test_pool_por_defecto_descarta_conexiones_con_32_hilos(url):
+    with EcoMarketClient(url, "t") as cliente:
+        estado = _golpear(cliente)
+        host = _host(estado)
+        assert host["descartadas"] > 0 and host["creadas"] > 10
+        assert estado["sesiones"] == HILOS      # una Session por hilo
+
+def test_pool_dimensionado_reutiliza_conexiones(url):
+    with EcoMarketClient(url, "t", pool_maxsize=HILOS) as cliente:
+        _golpear(cliente)
+        host = _host(_golpear(cliente))
+        assert host["descartadas"] == 0 and host["creadas"] <= HILOS
+        assert host["peticiones"] == 256 and host["libres"] == host["creadas"]
+        assert cliente.estado_pool()["en_vuelo"] == 0
+
+def test_pool_bloqueante_espera_en_vez_de_abrir_mas(url):
+    with EcoMarketClient(url, "t", pool_maxsize=4, pool_block=True) as cliente:
+        host = _host(_golpear(cliente))
+        assert host["creadas"] <= 4 and host["descartadas"] == 0
+        assert host["esperas"] > 0 and host["segundos_esperando"] > 0
+
+def test_hilos_efimeros_no_acumulan_sesiones(url):
+    with EcoMarketClient(url, "t") as cliente:
+        for _ in range(10):
+            hilo = threading.Thread(target=cliente.obtener_producto, args=(1,))
+            hilo.start()
+            hilo.join()
+        gc.collect()
+        assert cliente.estado_pool()["sesiones"] == 0
+        assert cliente.estado_pool()["hosts"]      # ...pero sus conexiones siguen en el pool
+    # cerrar() no depende de que quede alguna Session viva: vacía el pool igual
+    assert not cliente.adapter.poolmanager.pools
+
+def test_modo_con_lock_y_errores(url):
+    with EcoMarketClient(url, "t", modo_sesion="con_lock") as cliente:
+        _golpear(cliente, peticiones=16)
+        assert cliente.estado_pool()["sesiones"] == 1
+        assert cliente.obtener_producto(9999) is None
+    with EcoMarketClient(url, "malo") as cliente:
+        with pytest.raises(ErrorNegocio, match="401"):
+            cliente.listar_productos()
+    with pytest.raises(ValueError, match="modo_sesion"):
+        EcoMarketClient(url, "t", modo_sesion="global")
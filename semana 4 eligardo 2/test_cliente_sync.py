@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from cliente_ecomarket import EcoMarketError, ErrorNegocio
+from cliente_sync import EcoMarketClientSync
+from servidor_ecomarket import ServidorEnHilo
+
+@pytest.fixture(scope="module")
+def url():
+    with ServidorEnHilo(productos_iniciales=30, token="t", latencia_ms=100) as url:
+        yield url
+
+@pytest.fixture
+def cliente(url):
+    with EcoMarketClientSync(url, "t") as c:
+        yield c
+
+def test_crud_bloqueante(cliente):
+    creado = cliente.crear_producto({"nombre": "Queso fresco", "precio": 95.0, "categoria": "lacteos"})
+    assert cliente.obtener_producto(creado.id).nombre == "Queso fresco"
+    assert cliente.actualizar_producto_parcial(creado.id, {"precio": 80.0}).precio == 80.0
+    assert cliente.eliminar_producto(creado.id) is True
+    assert cliente.obtener_producto(creado.id) is None
+    with pytest.raises(ErrorNegocio, match="400"):
+        cliente.actualizar_producto_parcial("1", {"precio": -1})
+
+def test_fan_out_concurrente(cliente):
+    inicio = time.perf_counter()
+    productos = cliente.obtener_productos([str(i) for i in range(1, 21)] + ["999"])
+    # 21 GET de 100ms cada uno, de a 10: ~0.3s en vez de ~2.1s
+    assert time.perf_counter() - inicio < 1.0
+    assert [p.id for p in productos[:3]] == ["1", "2", "3"] and productos[-1] is None
+
+def test_varios_hilos_comparten_un_loop(cliente):
+    with ThreadPoolExecutor(16) as pool:
+        inicio = time.perf_counter()
+        nombres = list(pool.map(lambda i: cliente.obtener_producto(str(i)).nombre, range(1, 17)))
+    assert nombres[0] == "Producto 1" and len(set(nombres)) == 16
+    assert time.perf_counter() - inicio < 1.0
+    assert len([h for h in threading.enumerate() if h.name == "ecomarket-loop"]) == 1
+
+def test_iterar_catalogo_y_corte_temprano(cliente):
+    assert len(list(cliente.iterar_catalogo(limite=7))) == 30
+    for i, _ in enumerate(cliente.iterar_catalogo(limite=5, prefetch=2)):
+        if i == 2:
+            break        # el generador async se cierra y cancela el prefetch
+    assert cliente.obtener_producto("1") is not None
+
+def test_timeout_de_llamada_y_cierre(url):
+    cliente = EcoMarketClientSync(url, "t", timeout_llamada=0.05)
+    with pytest.raises(EcoMarketError, match="timeout_llamada"):
+        cliente.obtener_producto("1")
+    cliente.cerrar()
+    cliente.cerrar()   # idempotente
+    with pytest.raises(EcoMarketError, match="cerrado"):
+        cliente.obtener_producto("1")
+    assert not [h for h in threading.enumerate() if h.name == "ecomarket-loop"]
+
+def test_fallo_al_iniciar_no_deja_el_hilo_vivo(url, monkeypatch):
+    async def aenter_roto(self):
+        raise RuntimeError("sin sesión")
+
+    monkeypatch.setattr("cliente_sync.EcoMarketClient.__aenter__", aenter_roto)
+    with pytest.raises(RuntimeError, match="sin sesión"):
+        EcoMarketClientSync(url, "t")
+    assert not [h for h in threading.enumerate() if h.name == "ecomarket-loop"]
@@ -0,0 +1,89 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cliente_ecomarket import EcoMarketClient
+from escritura_lotes import agrupar
+from inyector_fallos import InyectorFallos
+from servidor_ecomarket import ALMACEN, crear_app
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+def _productos(n):
+    return [{"nombre": f"Import {i}", "precio": 10.0 + i, "categoria": "frutas"} for i in range(n)]
+
+async def _crear(app, productos, **opciones):
+    async with TestServer(app) as servidor:
+        async with EcoMarketClient(str(servidor.make_url("")), "t") as cliente:
+            resultado = await cliente.crear_multiples_productos(productos, **opciones)
+            return resultado, cliente, app.get(ALMACEN)
+
+async def test_lotes_con_resultados_por_item():
+    productos = _productos(1200)
+    productos[5] = {"nombre": "Uranio", "precio": -50, "categoria": "nuclear"}   # lo frena la validación local
+    productos[700] = {**productos[700], "stock": -3}                            # solo lo rechaza el servidor
+
+    resultado, cliente, almacen = await _crear(crear_app(productos_iniciales=0), productos, tamano_lote=500)
+
+    assert cliente.soporta_lote is True and resultado.modos == {"lote"}
+    assert resultado.peticiones == 3                 # 1199 válidos en lotes de 500
+    assert len(resultado.creados) == 1198 and len(almacen.productos) == 1198
+    assert resultado.items[5].invalido and resultado.items[5].status is None
+    assert resultado.items[700].status == 400 and "stock" in resultado.items[700].error
+    assert resultado.items[0].producto.nombre == "Import 0"
+    assert resultado.por_reenviar(productos) == []   # ninguno de los dos mejora reenviándolo
+
+async def test_sin_endpoint_de_lote_cae_a_post_individuales():
+    resultado, cliente, almacen = await _crear(crear_app(productos_iniciales=0, lote=False), _productos(30))
+    assert cliente.soporta_lote is False and resultado.modos == {"individual"}
+    assert resultado.peticiones == 31                # la sonda del lote + 30 POST
+    assert len(resultado.creados) == 30 and len(almacen.productos) == 30
+
+async def test_fallo_de_un_lote_solo_marca_sus_items():
+    fallos = InyectorFallos({"semilla": 3, "reglas": [{"ruta": "/productos/lote", "errores": {"503": 0.5}}]})
+    productos = _productos(100)
+    resultado, _, almacen = await _crear(crear_app(productos_iniciales=0, fallos=fallos), productos, tamano_lote=10)
+
+    reenviar = resultado.por_reenviar(productos)
+    assert 0 < len(reenviar) < 100 and len(reenviar) % 10 == 0
+    assert len(resultado.creados) + len(reenviar) == 100 == len(almacen.productos) + len(reenviar)
+    assert all(i.status == 503 for i in resultado.fallidos)
+
+async def test_respuesta_de_lote_malformada_se_anota_por_item():
+    async def lote(request):
+        bueno = {"id": "1", "nombre": "Import 0", "precio": 10.0, "categoria": "frutas"}
+        return web.json_response({"resultados": [
+            {"status": 201, "producto": bueno}, {"status": 201, "producto": {"nombre": "sin id"}},
+            {"status": 201}, "basura", {"status": "201", "producto": {**bueno, "id": "5"}}, {"status": [201]},
+        ]})
+
+    app = web.Application()
+    app.router.add_post("/productos/lote", lote)
+    resultado, _, _ = await _crear(app, _productos(6))
+    assert resultado.items[0].ok and resultado.items[0].producto.id == "1"
+    assert resultado.items[4].ok and resultado.items[4].status == 201   # "201" se acepta como número
+    assert all("inválid" in resultado.items[i].error for i in (1, 2, 3, 5))
+    assert [i.incierto for i in resultado.items] == [False, False, False, True, False, True]
+    # Todos llegaron al servidor (y quizá se crearon): ninguno se reenvía
+    assert resultado.por_reenviar(_productos(6)) == []
+
+async def test_lote_con_cantidad_de_resultados_distinta_no_se_reenvia():
+    async def lote(request):
+        return web.json_response({"resultados": [{"status": 201}]})
+
+    app = web.Application()
+    app.router.add_post("/productos/lote", lote)
+    resultado, _, _ = await _crear(app, _productos(3))
+    assert all(i.incierto and not i.ok for i in resultado.items)
+    assert resultado.por_reenviar(_productos(3)) == []
+    assert resultado.errores_lote == ["El lote devolvió 1 resultados para 3 items"]
+
+async def test_post_individual_404_no_es_reintentable():
+    resultado, cliente, _ = await _crear(web.Application(), _productos(2))
+    assert cliente.soporta_lote is False
+    assert [i.status for i in resultado.items] == [404, 404]
+    assert resultado.por_reenviar(_productos(2)) == []
+
+async def test_agrupar_por_cantidad_y_bytes():
+    assert agrupar([10] * 7, max_items=3, max_bytes=10_000) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert agrupar([40, 40, 40, 200, 10], max_items=100, max_bytes=100) == [[0, 1], [2], [3], [4]]
+    assert agrupar([], 10, 10) == []
@@ -0,0 +1,49 @@
+import pytest
+from aioresponses import aioresponses
+from cliente_ecomarket import EcoMarketClient, ErrorNegocio
+from exportador import exportar_catalogo, exportar_catalogo_a_archivo
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+BASE = "http://api.ecomarket.com/productos"
+
+def _productos(ids, categoria="frutas"):
+    return [{"id": str(i), "nombre": f"Prod-{i}", "precio": 10.0, "categoria": categoria} for i in ids]
+
+@pytest.fixture
+async def client():
+    async with EcoMarketClient(base_url="http://api.ecomarket.com", token="token_test") as c:
+        yield c
+
+async def test_exportar_por_categoria_sin_duplicados(client):
+    with aioresponses() as m:
+        for cat in ["conservas", "frutas", "lacteos", "verduras"]:
+            m.get(f"{BASE}?categoria={cat}&limit=2&page=1", payload=[])
+        # El producto 2 aparece dos veces (cambió de página durante la exportación)
+        m.get(f"{BASE}?categoria=miel&limit=2&page=1", payload=_productos([1, 2], "miel"))
+        m.get(f"{BASE}?categoria=miel&limit=2&page=2", payload=_productos([2, 3], "miel"))
+        m.get(f"{BASE}?categoria=miel&limit=2&page=3", payload=[])
+        ids = sorted([p.id async for p in exportar_catalogo(client, limite=2)])
+    assert ids == ["1", "2", "3"]
+
+async def test_exportar_por_franjas_de_paginas(client, tmp_path):
+    with aioresponses() as m:
+        m.get(f"{BASE}?limit=2&page=1", payload=_productos([1, 2]))
+        m.get(f"{BASE}?limit=2&page=2", payload=_productos([3, 4]))
+        m.get(f"{BASE}?limit=2&page=3", payload=_productos([5]))
+        m.get(f"{BASE}?limit=2&page=4", payload=[])
+        ruta = tmp_path / "catalogo.jsonl"
+        total = await exportar_catalogo_a_archivo(client, str(ruta), particion="paginas", franjas=2, limite=2)
+    assert total == 5
+    assert len(ruta.read_text(encoding="utf-8").splitlines()) == 5
+
+async def test_exportar_falla_si_una_franja_falla(client):
+    with aioresponses() as m:
+        m.get(f"{BASE}?productor_id=p1&limit=2&page=1", payload=_productos([1]))
+        m.get(f"{BASE}?productor_id=p2&limit=2&page=1", status=500)
+        with pytest.raises(ErrorNegocio):
+            [p async for p in exportar_catalogo(client, particion="productor", productores=["p1", "p2"], limite=2)]
+
+async def test_particion_desconocida(client):
+    with pytest.raises(ValueError):
+        [p async for p in exportar_catalogo(client, particion="alfabetica")]
@@ -0,0 +1,89 @@
+import itertools
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cliente_ecomarket import EcoMarketClient
+from generador_carga import GeneradorCarga
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+def _app_crud(fallar_cada: int = 0):
+    productos = {str(i): {"id": str(i), "nombre": f"P{i}", "precio": 10.0, "categoria": "miel"} for i in range(1, 6)}
+    ids = itertools.count(100)
+    contador = itertools.count(1)
+
+    @web.middleware
+    async def fallos(request, handler):
+        if fallar_cada and next(contador) % fallar_cada == 0:
+            return web.json_response({"error": "caído"}, status=500)
+        return await handler(request)
+
+    async def listar(request):
+        return web.json_response(list(productos.values()))
+
+    async def obtener(request):
+        p = productos.get(request.match_info["id"])
+        return web.json_response(p) if p else web.json_response({"error": "no"}, status=404)
+
+    async def crear(request):
+        datos = await request.json()
+        p = {**datos, "id": str(next(ids))}
+        productos[p["id"]] = p
+        return web.json_response(p, status=201)
+
+    async def actualizar(request):
+        pid = request.match_info["id"]
+        if pid not in productos:
+            return web.json_response({"error": "no"}, status=404)
+        productos[pid] = {**productos[pid], **await request.json(), "id": pid}
+        return web.json_response(productos[pid])
+
+    async def eliminar(request):
+        return web.Response(status=204 if productos.pop(request.match_info["id"], None) else 404)
+
+    app = web.Application(middlewares=[fallos])
+    app.router.add_get("/productos", listar)
+    app.router.add_post("/productos", crear)
+    app.router.add_get("/productos/{id}", obtener)
+    app.router.add_put("/productos/{id}", actualizar)
+    app.router.add_patch("/productos/{id}", actualizar)
+    app.router.add_delete("/productos/{id}", eliminar)
+    return app
+
+async def test_lazo_cerrado_recorre_toda_la_mezcla():
+    async with TestServer(_app_crud()) as servidor:
+        async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as cliente:
+            generador = GeneradorCarga(cliente, semilla=1, ventana_s=0.1)
+            resultado = await generador.lazo_cerrado(usuarios=4, duracion_s=0.5)
+
+    resumen = resultado.resumen()
+    assert resumen["errores"] == 0
+    assert resumen["completadas"] > 20
+    assert set(resumen["por_operacion"]) == {"listar", "obtener", "crear", "actualizar_total",
+                                            "actualizar_parcial", "eliminar"}
+    assert len(resultado.serie()) >= 4
+    assert resumen["p50_ms"] <= resumen["p99_ms"] <= resumen["max_ms"]
+
+async def test_lazo_abierto_respeta_la_tasa_y_cuenta_errores():
+    async with TestServer(_app_crud(fallar_cada=5)) as servidor:
+        async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as cliente:
+            generador = GeneradorCarga(cliente, {"obtener": 1}, semilla=7)
+            resultado = await generador.lazo_abierto(tasa_rps=200, duracion_s=0.5)
+
+    total = resultado.completadas + resultado.errores
+    assert 60 <= total <= 140          # Poisson: ~100 llegadas esperadas
+    assert resultado.errores == pytest.approx(total / 5, abs=2)
+    assert resultado.errores_por_tipo == {"ErrorNegocio": resultado.errores}
+
+async def test_mezcla_desconocida():
+    with pytest.raises(ValueError):
+        GeneradorCarga(cliente=None, mezcla={"comprar": 1})
+
+async def test_saturacion_por_descartes():
+    async with TestServer(_app_crud()) as servidor:
+        async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as cliente:
+            generador = GeneradorCarga(cliente, {"obtener": 1}, semilla=3)
+            escalones = await generador.buscar_saturacion([20, 5000], duracion_s=0.3, max_en_vuelo=3)
+
+    assert escalones[0]["saturado"] is False
+    assert escalones[-1]["saturado"] is True and escalones[-1]["descartadas"] > 0
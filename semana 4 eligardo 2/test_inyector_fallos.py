@@ -0,0 +1,97 @@
+import json
+import time
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+from inyector_fallos import InyectorFallos, ErrorConfigFallos
+from servidor_ecomarket import crear_app
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+def _app(reglas, **config):
+    return crear_app(productos_iniciales=5, fallos=InyectorFallos({"semilla": 7, "reglas": reglas, **config}))
+
+async def _statuses(servidor, ruta, n, metodo="GET"):
+    async with aiohttp.ClientSession() as session:
+        resultados = []
+        for _ in range(n):
+            async with session.request(metodo, servidor.make_url(ruta)) as resp:
+                await resp.read()
+                resultados.append(resp.status)
+        return resultados
+
+async def test_errores_por_ruta_y_metodo():
+    app = _app([{"ruta": "/productos/{id}", "metodos": ["GET"], "errores": {"503": 1.0}, "retry_after": 3}])
+    async with TestServer(app) as servidor:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(servidor.make_url("/productos/1")) as resp:
+                assert resp.status == 503 and resp.headers["Retry-After"] == "3"
+            async with session.delete(servidor.make_url("/productos/1")) as resp:
+                assert resp.status == 204          # otro método: sin fallos
+        assert await _statuses(servidor, "/productos", 3) == [200, 200, 200]   # otra ruta
+        async with aiohttp.ClientSession() as session:
+            async with session.get(servidor.make_url("/_fallos")) as resp:
+                assert (await resp.json())["inyectados"] == {"error_503": 1}
+
+async def test_tasa_de_errores_aproximada():
+    app = _app([{"ruta": "*", "errores": {500: 0.3}}])
+    async with TestServer(app) as servidor:
+        statuses = await _statuses(servidor, "/salud", 200)
+    assert 40 <= statuses.count(500) <= 80
+
+async def test_limite_de_tasa_devuelve_429_con_retry_after():
+    app = _app([{"ruta": "/salud", "limite_tasa": {"rps": 5}, "retry_after": 0.5}])
+    async with TestServer(app) as servidor:
+        statuses = await _statuses(servidor, "/salud", 10)
+    assert statuses[:5] == [200] * 5 and 429 in statuses[5:]
+
+async def test_latencia_fija_y_cola_larga_acotada():
+    fija = _app([{"ruta": "/salud", "latencia": {"tipo": "fija", "ms": 100}}])
+    async with TestServer(fija) as servidor:
+        inicio = time.perf_counter()
+        await _statuses(servidor, "/salud", 2)
+        assert time.perf_counter() - inicio >= 0.2
+
+    inyector = InyectorFallos({"semilla": 1, "reglas": []})
+    pareto = {"tipo": "pareto", "escala_ms": 1, "alfa": 1.2, "max_ms": 50}
+    muestras = sorted(inyector._latencia_ms(pareto) for _ in range(2000))
+    assert muestras[0] >= 1 and muestras[-1] == 50 and muestras[1000] < 5
+
+async def test_reset_y_cuerpo_parcial_cortan_la_conexion():
+    app = _app([
+        {"ruta": "/productos/1", "reset": 1.0},
+        {"ruta": "/productos/2", "parcial": {"probabilidad": 1.0, "bytes": 5, "pausa_ms": 10}},
+        {"ruta": "/productos/3", "parcial": {"probabilidad": 1.0, "bytes": 5, "pausa_ms": 10, "completar": True}},
+    ])
+    async with TestServer(app) as servidor:
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(aiohttp.ServerDisconnectedError):
+                async with session.get(servidor.make_url("/productos/1")) as resp:
+                    await resp.read()
+            with pytest.raises(aiohttp.ClientPayloadError):
+                async with session.get(servidor.make_url("/productos/2")) as resp:
+                    await resp.read()
+            async with session.get(servidor.make_url("/productos/3")) as resp:
+                assert (await resp.json())["id"] == "3"
+
+async def test_programa_de_fases():
+    inyector = InyectorFallos({"reglas": [{
+        "ruta": "*", "ciclo_s": 60,
+        "programa": [{"desde_s": 10, "hasta_s": 20, "errores": {"500": 1.0}}],
+    }]})
+    regla = inyector.reglas[0]
+    assert regla.fallos_en(5).errores == {}
+    assert regla.fallos_en(15).errores == {500: 1.0}
+    assert regla.fallos_en(75).errores == {500: 1.0}     # se repite cada 60s
+
+async def test_config_invalida_y_archivo(tmp_path):
+    with pytest.raises(ErrorConfigFallos, match="latencia"):
+        InyectorFallos({"reglas": [{"ruta": "*", "latencia": {"tipo": "exponencial"}}]})
+    with pytest.raises(ErrorConfigFallos, match="superar 1"):
+        InyectorFallos({"reglas": [{"ruta": "*", "errores": {"500": 0.7, "503": 0.7}}]})
+    with pytest.raises(ErrorConfigFallos, match="desconocidos"):
+        InyectorFallos({"reglas": [{"ruta": "*", "error": {"500": 1}}]})
+
+    ruta = tmp_path / "fallos.json"
+    ruta.write_text(json.dumps({"reglas": [{"ruta": "/salud", "reset": 0.5}]}), encoding="utf-8")
+    assert InyectorFallos.desde_archivo(str(ruta)).reglas[0].base.reset == 0.5
@@ -0,0 +1,78 @@
+import random
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import aiohttp
+from metricas import HistogramaLatencia, RegistroMetricas, normalizar_endpoint, agregar_ruta_metricas, REGISTRO
+from eco_logger import auditar_peticion_http
+
+def test_percentiles_dentro_del_error_relativo():
+    rng = random.Random(7)
+    muestras = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    h = HistogramaLatencia()
+    for m in muestras:
+        h.registrar(m)
+
+    ordenadas = sorted(muestras)
+    for q in (50, 95, 99):
+        exacto = ordenadas[int(len(ordenadas) * q / 100) - 1]
+        assert h.percentil(q) == pytest.approx(exacto, rel=0.03)
+    assert h.percentil(100) == max(muestras)
+    assert h.conteo == 20000
+
+def test_normalizar_endpoint_agrupa_ids():
+    assert normalizar_endpoint("http://api/productos/123?x=1") == "/productos/{id}"
+    assert normalizar_endpoint("productos/9f86d081884c7d65/resenas") == "/productos/{id}/resenas"
+    assert normalizar_endpoint("http://api/productos") == "/productos"
+
+def test_contadores_por_ruta_y_errores():
+    registro = RegistroMetricas()
+    for pid in range(10):
+        registro.observar("GET", f"http://api/productos/{pid}", 200, 10 + pid)
+    registro.observar("GET", "http://api/productos/1", 500, 80)
+    registro.observar("POST", "http://api/productos", 0, 5000)
+
+    resumen = registro.resumen()
+    assert resumen["GET /productos/{id} 200"]["peticiones"] == 10
+    assert resumen["GET /productos/{id} 200"]["max"] == 19
+    assert registro.errores() == {"GET /productos/{id}": 1, "POST /productos": 1}
+
+def test_exposicion_prometheus():
+    registro = RegistroMetricas()
+    for ms in (3, 30, 300, 3000):
+        registro.observar("GET", "/productos", 200, ms)
+
+    texto = registro.exportar_prometheus()
+    etiquetas = 'method="GET",endpoint="/productos",status="200"'
+    assert f"ecomarket_http_peticiones_total{{{etiquetas}}} 4" in texto
+    assert f'ecomarket_http_duracion_segundos_bucket{{{etiquetas},le="0.005"}} 1' in texto
+    assert f'ecomarket_http_duracion_segundos_bucket{{{etiquetas},le="0.5"}} 3' in texto
+    assert f'ecomarket_http_duracion_segundos_bucket{{{etiquetas},le="+Inf"}} 4' in texto
+    assert f"ecomarket_http_duracion_segundos_count{{{etiquetas}}} 4" in texto
+
+def test_decorador_alimenta_el_registro_global():
+    REGISTRO.reiniciar()
+
+    class Respuesta:
+        status_code = 404
+        headers = {}
+
+    @auditar_peticion_http
+    def peticion(method, url):
+        return Respuesta()
+
+    peticion("GET", "http://api/productos/77")
+    assert REGISTRO.histograma("GET", "/productos/1", 404).conteo == 1
+    assert REGISTRO.errores() == {"GET /productos/{id}": 1}
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_ruta_metrics():
+    registro = RegistroMetricas()
+    registro.observar("GET", "/productos", 200, 12)
+    app = agregar_ruta_metricas(web.Application(), registro)
+    async with TestServer(app) as servidor:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(servidor.make_url("/metrics")) as resp:
+                assert resp.status == 200
+                assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert "ecomarket_http_peticiones_total" in await resp.text()
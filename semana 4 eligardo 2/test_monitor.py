@@ -0,0 +1,303 @@
+import asyncio
+import threading
+import time
+import pytest
+from aiohttp import web, ClientSession
+from aiohttp.test_utils import TestServer
+from monitor import DespachadorAsync, ServicioWebSocket
+from servidor_eventos import crear_app, INVENTARIO
+from planificador_polling import PlanificadorPolling
+from transportes_monitor import (TransporteSSE, TransporteLongPolling, TransporteShortPolling,
+                                 TransporteNoSoportado)
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+# --- DESPACHO ASÍNCRONO DE OBSERVADORES ---
+
+async def test_observador_lento_no_bloquea():
+    despachador = DespachadorAsync()
+    rapidos = []
+
+    async def lento(datos):
+        await asyncio.sleep(0.5)
+
+    despachador.agregar_observador(lento)
+    despachador.agregar_observador(rapidos.append)
+
+    inicio = time.perf_counter()
+    await despachador.notificar([1])
+    assert time.perf_counter() - inicio < 0.1
+    await asyncio.sleep(0.05)
+    assert rapidos == [[1]]
+    await despachador.detener(drenar=False)
+
+async def test_descartar_antiguo_y_coalescer():
+    despachador = DespachadorAsync(capacidad=2)
+    vistos_antiguo, vistos_coalescer = [], []
+    liberar = asyncio.Event()
+
+    async def bloqueado_antiguo(datos):
+        await liberar.wait()
+        vistos_antiguo.append(datos)
+
+    async def bloqueado_coalescer(datos):
+        await liberar.wait()
+        vistos_coalescer.append(datos)
+
+    despachador.agregar_observador(bloqueado_antiguo, politica="descartar_antiguo")
+    despachador.agregar_observador(bloqueado_coalescer, politica="coalescer")
+
+    await despachador.notificar(0)
+    await asyncio.sleep(0)          # los workers toman el 0 y quedan esperando
+    for i in range(1, 6):
+        await despachador.notificar(i)
+    liberar.set()
+    await despachador.drenar()
+
+    assert vistos_antiguo == [0, 4, 5]
+    assert vistos_coalescer == [0, 5]
+    metricas = despachador.metricas()
+    assert metricas["test_descartar_antiguo_y_coalescer.<locals>.bloqueado_antiguo#0"]["descartados"] == 3
+    assert metricas["test_descartar_antiguo_y_coalescer.<locals>.bloqueado_coalescer#1"]["descartados"] == 4
+    await despachador.detener()
+
+async def test_bloquear_aplica_contrapresion():
+    despachador = DespachadorAsync(capacidad=1)
+    liberar = asyncio.Event()
+
+    async def lento(datos):
+        await liberar.wait()
+
+    despachador.agregar_observador(lento, politica="bloquear")
+    await despachador.notificar(1)
+    await asyncio.sleep(0)
+    await despachador.notificar(2)   # llena la cola
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(despachador.notificar(3), timeout=0.05)
+    liberar.set()
+    await despachador.detener()
+
+async def test_observador_sincrono_corre_en_hilo():
+    despachador = DespachadorAsync()
+    hilos = []
+    despachador.agregar_observador(lambda datos: hilos.append(threading.current_thread().name))
+    await despachador.notificar("x")
+    await despachador.drenar()
+    assert hilos and hilos[0].startswith("observador")
+    await despachador.detener()
+
+async def test_metricas_no_se_pisan_entre_observadores_homonimos():
+    class Pantalla:
+        def __init__(self):
+            self.vistos = []
+
+        def actualizar(self, datos):
+            self.vistos.append(datos)
+
+    despachador = DespachadorAsync()
+    pantallas = [Pantalla(), Pantalla()]
+    for pantalla in pantallas:
+        despachador.agregar_observador(pantalla.actualizar)
+    despachador.agregar_observador(lambda datos: None)
+    despachador.agregar_observador(lambda datos: 1 / 0)
+    await despachador.notificar(1)
+    await despachador.drenar()
+
+    metricas = despachador.metricas()
+    assert len(metricas) == 4
+    assert [m["entregados"] for m in metricas.values()] == [1, 1, 1, 0]
+    assert metricas["test_metricas_no_se_pisan_entre_observadores_homonimos.<locals>.<lambda>#3"]["errores"] == 1
+    await despachador.detener()
+
+async def test_opciones_de_cola_sin_despachador_fallan():
+    monitor = ServicioWebSocket(transportes=[])
+    with pytest.raises(ValueError, match="DespachadorAsync"):
+        monitor.agregar_observador(print, politica="coalescer")
+
+async def test_error_en_observador_se_aisla():
+    despachador = DespachadorAsync()
+    recibidos = []
+
+    def roto(datos):
+        raise RuntimeError("boom")
+
+    despachador.agregar_observador(roto)
+    despachador.agregar_observador(recibidos.append)
+    await despachador.notificar(1)
+    await despachador.drenar()
+    assert recibidos == [1]
+    assert list(despachador.metricas().values())[0]["errores"] == 1
+    await despachador.detener()
+
+
+# --- TRANSPORTES (SSE / LONG POLLING / SHORT POLLING) ---
+
+async def _esperar(condicion, timeout=2.0):
+    limite = time.perf_counter() + timeout
+    while not condicion():
+        if time.perf_counter() > limite:
+            raise AssertionError("La condición no se cumplió a tiempo")
+        await asyncio.sleep(0.01)
+
+async def _probar_transporte(app, esperado):
+    async with TestServer(app) as servidor:
+        url_producto = str(servidor.make_url("/productos/500"))
+        monitor = ServicioWebSocket(transportes=[
+            TransporteSSE(str(servidor.make_url("/eventos"))),
+            TransporteLongPolling(url_producto, espera=5),
+            TransporteShortPolling(url_producto, intervalo_min=0.05, intervalo_max=0.05),
+        ])
+        recibidos = []
+        monitor.agregar_observador(recibidos.append)
+        tarea = asyncio.create_task(monitor.iniciar())
+
+        await _esperar(lambda: len(recibidos) == 1)
+        assert monitor.transporte_activo.nombre == esperado
+
+        inicio = time.perf_counter()
+        app[INVENTARIO].cambiar()
+        await _esperar(lambda: len(recibidos) == 2)
+        latencia = time.perf_counter() - inicio
+
+        monitor.detener()
+        await tarea
+        assert recibidos[1][0]["id"] == "500"
+        return latencia
+
+async def test_transporte_sse():
+    latencia = await _probar_transporte(crear_app(intervalo_cambios=0), "sse")
+    assert latencia < 0.5
+
+async def test_cae_a_long_polling_sin_sse():
+    latencia = await _probar_transporte(crear_app(intervalo_cambios=0, sse=False), "long-polling")
+    assert latencia < 0.5
+
+async def test_cae_a_short_polling():
+    app = crear_app(intervalo_cambios=0, sse=False, long_polling=False)
+    await _probar_transporte(app, "short-polling")
+
+async def test_sse_salta_eventos_con_json_invalido():
+    async def eventos(request):
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        await resp.write(b'data: {"id": "1", roto\n\ndata: {"id": "2", "stock": 3}\n\n')
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/eventos", eventos)
+    async with TestServer(app) as servidor, ClientSession() as session:
+        transporte = TransporteSSE(str(servidor.make_url("/eventos")))
+        recibidos = []
+        async for datos in transporte.escuchar(session, lambda: not recibidos):
+            recibidos.append(datos)
+    assert recibidos[0][0]["id"] == "2"
+
+def _app_cuerpo_corrupto_y_luego_valido():
+    # Ambas respuestas llevan el MISMO ETag: si el cliente lo guarda con el cuerpo
+    # corrupto, el servidor le contesta 304 para siempre y el estado se pierde.
+    peticiones = []
+
+    async def producto(request):
+        peticiones.append(request.headers.get("If-None-Match"))
+        cabeceras = {"ETag": '"v1"', "Preference-Applied": "wait=1"}
+        if len(peticiones) == 1:
+            return web.Response(text='{"id": "500", roto', content_type="application/json", headers=cabeceras)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers=cabeceras)
+        return web.json_response({"id": "500", "stock": 7}, headers=cabeceras)
+
+    app = web.Application()
+    app.router.add_get("/productos/500", producto)
+    return app
+
+@pytest.mark.parametrize("crear", [
+    lambda url: TransporteShortPolling(url, intervalo_min=0.01, intervalo_max=0.01),
+    lambda url: TransporteLongPolling(url, pausa_error=0.01),
+], ids=["short-polling", "long-polling"])
+async def test_polling_sobrevive_a_cuerpo_corrupto(crear):
+    async with TestServer(_app_cuerpo_corrupto_y_luego_valido()) as servidor, ClientSession() as session:
+        transporte = crear(str(servidor.make_url("/productos/500")))
+        recibidos = []
+
+        async def escuchar():
+            async for datos in transporte.escuchar(session, lambda: not recibidos):
+                recibidos.append(datos)
+
+        await asyncio.wait_for(escuchar(), timeout=2)
+    assert recibidos == [[{"id": "500", "stock": 7}]]
+
+async def test_observador_que_falla_no_corta_la_escucha_sin_despachador():
+    class TransporteFijo:
+        nombre = "fijo"
+
+        async def escuchar(self, session, activo):
+            for datos in ([1], [2]):
+                yield datos
+
+    def roto(datos):
+        raise RuntimeError("observador roto")
+
+    monitor = ServicioWebSocket(transportes=[TransporteFijo()])
+    recibidos = []
+    monitor.agregar_observador(roto)
+    monitor.agregar_observador(recibidos.append)
+    await monitor.iniciar()
+    assert recibidos == [[1], [2]]
+
+@pytest.mark.parametrize("status", [404, 405, 501])
+async def test_long_polling_no_soportado(status):
+    async def rechazar(request):
+        return web.Response(status=status)
+
+    app = web.Application()
+    app.router.add_get("/productos/500", rechazar)
+    async with TestServer(app) as servidor, ClientSession() as session:
+        transporte = TransporteLongPolling(str(servidor.make_url("/productos/500")), pausa_error=5)
+        with pytest.raises(TransporteNoSoportado):
+            async for _ in transporte.escuchar(session, lambda: True):
+                pass
+
+
+# --- PLANIFICADOR MULTI-RECURSO ---
+
+async def test_planificador_muchos_recursos_con_techo_rps():
+    app = crear_app(intervalo_cambios=0)
+    async with TestServer(app) as servidor:
+        planificador = PlanificadorPolling(max_rps=50, jitter=0.2)
+        cambios = []
+        planificador.agregar_observador(cambios.append)
+        urls = [str(servidor.make_url(f"/productos/500?r={i}")) for i in range(20)]
+        for url in urls:
+            planificador.vigilar(url, intervalo_min=0.05, intervalo_max=0.4)
+
+        inicio = time.perf_counter()
+        tarea = asyncio.create_task(planificador.iniciar())
+        await _esperar(lambda: len(cambios) == 20)
+        await asyncio.sleep(0.5)
+        planificador.detener()
+        await tarea
+        duracion = time.perf_counter() - inicio
+
+    recursos = planificador.recursos().values()
+    consultas = sum(r.consultas for r in recursos)
+    # Cada recurso vio el cambio inicial y luego fue espaciando (304 -> intervalo crece)
+    assert {c["url"] for c in cambios} == set(urls)
+    assert all(r.intervalo > r.intervalo_min for r in recursos)
+    # El techo global se respeta (capacidad inicial del bucket + tasa * tiempo)
+    assert consultas <= 50 + 50 * duracion
+
+async def test_planificador_dejar_de_vigilar():
+    app = crear_app(intervalo_cambios=0)
+    async with TestServer(app) as servidor:
+        planificador = PlanificadorPolling()
+        url = str(servidor.make_url("/productos/500"))
+        recurso = planificador.vigilar(url, intervalo_min=0.02, intervalo_max=0.02)
+        tarea = asyncio.create_task(planificador.iniciar())
+        await _esperar(lambda: recurso.consultas >= 2)
+        planificador.dejar_de_vigilar(url)
+        await asyncio.sleep(0.05)
+        consultas = recurso.consultas
+        await asyncio.sleep(0.1)
+        planificador.detener()
+        await tarea
+    assert recurso.consultas == consultas
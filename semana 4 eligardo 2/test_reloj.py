@@ -0,0 +1,115 @@
+import asyncio
+import random
+import time
+import aiohttp
+import pytest
+import requests
+import reloj
+from coordinador_async import CoordinadorAsync
+from limitador_async import ClienteControlado, LimitadorTasa
+from retry import with_retry
+from throttle import RateLimiter
+
+# Todo corre en tiempo virtual con reloj.correr_virtual(): cada test
+# "duerme" segundos pero termina en milisegundos y da siempre lo mismo.
+
+def test_bucle_virtual_salta_los_timers():
+    async def principal():
+        inicio = reloj.ahora()
+        await asyncio.sleep(3600)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.sleep(50), timeout=2)
+        return reloj.ahora() - inicio
+
+    real = time.perf_counter()
+    assert reloj.correr_virtual(principal()) == 3602
+    assert time.perf_counter() - real < 0.5
+
+def test_limitador_tasa_respeta_el_ritmo_exacto():
+    async def principal():
+        limitador = LimitadorTasa(20)
+        momentos = []
+
+        async def tomar():
+            async with limitador:
+                momentos.append(reloj.ahora())
+
+        await asyncio.gather(*(tomar() for _ in range(50)))
+        return momentos
+
+    momentos = reloj.correr_virtual(principal())
+    assert momentos[:20] == [0.0] * 20               # el cubo arranca lleno
+    assert momentos[-1] == pytest.approx(1.5)        # 30 tokens más a 20/s
+    assert all(b - a == pytest.approx(0.05) for a, b in zip(momentos[20:], momentos[21:]))
+
+def test_cliente_controlado_es_determinista():
+    async def principal():
+        random.seed(11)
+        cliente = ClienteControlado(max_concurrent=10, max_per_sec=20)
+        maximo = 0
+
+        async def vigilar():
+            nonlocal maximo
+            while True:
+                maximo = max(maximo, cliente.active_requests)
+                await asyncio.sleep(0.01)
+
+        vigia = asyncio.create_task(vigilar())
+        inicio = reloj.ahora()
+        await asyncio.gather(*(cliente.solicitar(i) for i in range(50)))
+        vigia.cancel()
+        return reloj.ahora() - inicio, maximo
+
+    duracion, maximo = reloj.correr_virtual(principal())
+    assert maximo == 10
+    assert reloj.correr_virtual(principal()) == (duracion, maximo)
+
+def test_throttle_rate_limiter():
+    async def principal():
+        limitador = RateLimiter(10)
+        for _ in range(30):
+            await limitador.wait()
+        return reloj.ahora()
+
+    # 10 del cubo inicial + 20 a 10/s; sondea cada 50ms
+    assert 2.0 <= reloj.correr_virtual(principal()) <= 2.05
+
+def test_coordinador_timeout_corta_en_el_limite():
+    async def principal():
+        coordinador = CoordinadorAsync()
+        inicio = reloj.ahora()
+        resultado = await coordinador.peticion_con_timeout("Lenta", 3.0, 1.0)
+        return resultado, reloj.ahora() - inicio
+
+    assert reloj.correr_virtual(principal()) == (None, 1.0)
+
+def test_backoff_async_y_sync_en_tiempo_virtual():
+    random.seed(5)
+    jitter = [random.uniform(0, 1) for _ in range(2)]
+    esperado = (1 + jitter[0]) + (2 + jitter[1])
+
+    fallos = {"n": 0}
+
+    @with_retry(max_retries=3, base_delay=1, backoff_factor=2)
+    async def inestable_async():
+        fallos["n"] += 1
+        if fallos["n"] <= 2:
+            raise aiohttp.ClientConnectionError("caído")
+        return reloj.ahora()
+
+    random.seed(5)
+    assert reloj.correr_virtual(inestable_async()) == pytest.approx(esperado)
+
+    intentos = {"n": 0}
+
+    @with_retry(max_retries=3, base_delay=1, backoff_factor=2)
+    def inestable_sync():
+        intentos["n"] += 1
+        if intentos["n"] <= 2:
+            raise requests.ConnectionError("caído")
+        return "ok"
+
+    random.seed(5)
+    with reloj.virtual() as r:
+        assert inestable_sync() == "ok"
+    assert r.ahora() == pytest.approx(esperado)
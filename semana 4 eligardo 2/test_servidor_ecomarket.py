@@ -0,0 +1,94 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+import requests
+from aiohttp.test_utils import TestServer
+from cliente_ecomarket import EcoMarketClient, ErrorNegocio
+from servidor_ecomarket import crear_app, ServidorEnHilo
+from sincronizacion import SincronizadorCatalogo
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+NUEVO = {"nombre": "Miel de azahar", "precio": 180.0, "categoria": "Miel", "stock": 4}
+
+@pytest.fixture
+async def servidor():
+    async with TestServer(crear_app(productos_iniciales=30)) as s:
+        yield s
+
+@pytest.fixture
+async def cliente(servidor):
+    async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as c:
+        yield c
+
+async def test_crud_completo_con_el_cliente(cliente):
+    creado = await cliente.crear_producto(NUEVO)
+    assert creado.categoria == "miel"
+
+    assert (await cliente.obtener_producto(creado.id)).nombre == "Miel de azahar"
+    assert (await cliente.actualizar_producto_parcial(creado.id, {"precio": 99.5})).precio == 99.5
+    total = await cliente.actualizar_producto_total(creado.id, {**NUEVO, "nombre": "Miel multiflora"})
+    assert total.nombre == "Miel multiflora" and total.precio == 180.0
+
+    assert await cliente.eliminar_producto(creado.id) is True
+    assert await cliente.obtener_producto(creado.id) is None
+    assert await cliente.eliminar_producto(creado.id) is False
+
+async def test_validacion_del_contrato(cliente):
+    with pytest.raises(ErrorNegocio, match="400"):
+        await cliente._request("POST", "productos", data={"nombre": "Sin precio", "categoria": "miel"})
+    with pytest.raises(ErrorNegocio, match="400"):
+        await cliente._request("PATCH", "productos", path_params=["1"], data={"precio": -3})
+    with pytest.raises(ErrorNegocio, match="400"):
+        await cliente._request("GET", "productos", query_params={"limit": "muchos"})
+
+async def test_paginacion_por_pagina_y_por_cursor(cliente):
+    por_pagina = [p.id async for p in cliente.iterar_catalogo(limite=7, prefetch=0)]
+    por_cursor = [p.id async for p in cliente.iterar_catalogo(limite=7, estilo="cursor", prefetch=0)]
+    assert len(por_pagina) == 30
+    assert por_pagina == por_cursor
+
+    mieles = await cliente.listar_productos(categoria="miel")
+    assert mieles and all(p.categoria == "miel" for p in mieles)
+
+async def test_etag_y_304(servidor):
+    url = servidor.make_url("/productos/1")
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as resp:
+            etag = resp.headers["ETag"]
+        async with session.get(url, headers={"If-None-Match": etag}) as resp:
+            assert resp.status == 304
+        async with session.patch(url, json={"stock": 1}) as resp:
+            assert resp.status == 200
+        async with session.get(url, headers={"If-None-Match": etag}) as resp:
+            assert resp.status == 200 and resp.headers["ETag"] != etag
+
+async def test_updated_since_con_el_sincronizador(cliente):
+    sync = SincronizadorCatalogo()
+    primero = await sync.sincronizar(cliente)
+    assert len(primero.agregados) == 30
+
+    await cliente.actualizar_producto_parcial("2", {"precio": 1.5})
+    await cliente.eliminar_producto("3")
+    delta = await sync.sincronizar(cliente)
+    assert sync.soporta_updated_since is True
+    assert [p["id"] for p in delta.modificados] == ["2"]
+    assert delta.eliminados == ["3"]
+
+async def test_delay_no_bloquea_otras_peticiones(servidor):
+    async with aiohttp.ClientSession() as session:
+        inicio = time.perf_counter()
+        async with session.get(servidor.make_url("/perfil?delay=200")) as lenta:
+            pass
+        assert time.perf_counter() - inicio >= 0.2
+        assert lenta.status == 200
+
+async def test_servidor_en_hilo_para_clientes_sincronos():
+    def con_requests():
+        with ServidorEnHilo(token="secreto") as url:
+            assert requests.get(f"{url}/salud").status_code == 401
+            resp = requests.get(f"{url}/productos", headers={"Authorization": "Bearer secreto"})
+            assert resp.status_code == 200 and len(resp.json()) == 100
+
+    await asyncio.to_thread(con_requests)
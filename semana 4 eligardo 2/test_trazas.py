@@ -0,0 +1,141 @@
+import contextlib
+import json
+import types
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import trazas
+from trazas import ExportadorJSON, configurar_trazas
+from cliente_ecomarket import EcoMarketClient
+from limitador_async import LimitadorConcurrencia, LimitadorTasa
+from retry import with_retry
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+@pytest.fixture
+def spans(tmp_path):
+    ruta = tmp_path / "trazas.jsonl"
+    configurar_trazas(ExportadorJSON(str(ruta)))
+
+    def leer():
+        if not ruta.exists():
+            return []
+        return [json.loads(l) for l in ruta.read_text(encoding="utf-8").splitlines()]
+
+    yield leer
+    configurar_trazas(None)
+
+async def test_noop_por_defecto():
+    configurar_trazas(None)
+    with trazas.span("nada", x=1) as s:
+        s.atributo("y", 2)
+    assert trazas.inyectar_contexto() == {}
+    assert not trazas.activas()
+
+async def test_dashboard_arbol_de_spans_y_traceparent(spans):
+    recibidos = []
+
+    async def responder(request):
+        recibidos.append(request.headers.get("traceparent"))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    for ruta in ("/perfil", "/productos", "/anuncios"):
+        app.router.add_get(ruta, responder)
+
+    async with TestServer(app) as servidor:
+        async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as cliente:
+            resultados = await cliente.cargar_dashboard()
+    assert resultados == [{"ok": True}] * 3
+
+    por_nombre = {}
+    for s in spans():
+        por_nombre.setdefault(s["nombre"], []).append(s)
+    [raiz] = por_nombre["cargar_dashboard"]
+    http = por_nombre["HTTP GET"]
+    assert len(http) == 3
+    assert all(s["padre_id"] == raiz["span_id"] and s["trace_id"] == raiz["trace_id"] for s in http)
+    assert all(s["atributos"]["http.status_code"] == 200 for s in http)
+
+    # Cada petición llevó el traceparent de SU span HTTP
+    ids_http = {s["span_id"] for s in http}
+    assert len(recibidos) == 3
+    for cabecera in recibidos:
+        version, trace_id, span_id, flags = cabecera.split("-")
+        assert trace_id == raiz["trace_id"] and span_id in ids_http
+
+async def test_spans_de_limitadores(spans):
+    tasa = LimitadorTasa(1000)
+    concurrencia = LimitadorConcurrencia(2)
+    with trazas.span("trabajo"):
+        async with concurrencia:
+            async with tasa:
+                pass
+
+    nombres = [s["nombre"] for s in spans()]
+    assert nombres == ["limitador.concurrencia.espera", "limitador.tasa.espera", "trabajo"]
+
+async def test_un_span_por_intento_de_retry(spans, monkeypatch):
+    monkeypatch.setattr("retry.random.uniform", lambda a, b: 0)
+    llamadas = []
+
+    @with_retry(max_retries=3, base_delay=0.001)
+    async def inestable():
+        llamadas.append(1)
+        if len(llamadas) < 3:
+            raise aiohttp.ClientConnectionError("red caída")
+        return "ok"
+
+    assert await inestable() == "ok"
+    intentos = [s for s in spans() if s["nombre"] == "intento"]
+    assert [s["atributos"]["numero"] for s in intentos] == [1, 2, 3]
+    assert [s["estado"] for s in intentos] == ["ERROR", "ERROR", "OK"]
+    assert sum(s["nombre"] == "retry.backoff" for s in spans()) == 2
+
+# --- BACKEND OPENTELEMETRY (con un tracer falso: no hace falta el SDK) ---
+
+class _SpanOTelFalso:
+    def __init__(self, nombre, attributes):
+        self.nombre = nombre
+        self.atributos = dict(attributes or {})
+
+    def set_attribute(self, clave, valor):
+        self.atributos[clave] = valor
+
+class _TracerFalso:
+    def __init__(self):
+        self.spans = []
+        self.actual = None
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, nombre, attributes=None):
+        span, anterior = _SpanOTelFalso(nombre, attributes), self.actual
+        self.spans.append(span)
+        self.actual = span
+        try:
+            yield span
+        finally:
+            self.actual = anterior
+
+async def test_request_con_backend_otel(monkeypatch):
+    tracer = _TracerFalso()
+    trace = types.SimpleNamespace(get_tracer=lambda nombre: tracer, get_current_span=lambda: tracer.actual)
+    propagate = types.SimpleNamespace(inject=lambda headers: headers.update(traceparent="00-otel"))
+    monkeypatch.setattr(trazas, "_rastreador", trazas._RastreadorOTel(trace, propagate))
+    recibidos = []
+
+    async def responder(request):
+        recibidos.append(request.headers.get("traceparent"))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/perfil", responder)
+    async with TestServer(app) as servidor:
+        async with EcoMarketClient(base_url=str(servidor.make_url("")), token="t") as cliente:
+            assert await cliente._request("GET", "perfil") == {"ok": True}
+
+    [http] = [s for s in tracer.spans if s.nombre == "HTTP GET"]
+    assert http.atributos["http.method"] == "GET"
+    assert http.atributos["http.status_code"] == 200
+    assert recibidos == ["00-otel"]
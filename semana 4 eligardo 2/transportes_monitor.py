@@ -0,0 +1,164 @@
+import asyncio
+import json
+import aiohttp
+from typing import AsyncIterator, Callable
+
+# ==========================================
+# TRANSPORTES PARA EL MONITOR DE INVENTARIO
+# ==========================================
+# Tres formas de enterarse de un cambio, de peor a mejor latencia:
+#   1. Short Polling: preguntar cada 5-60s (If-None-Match -> 304).
+#   2. Long Polling: el servidor RETIENE la petición hasta que hay un cambio
+#      (o vence la espera). Se pide con la cabecera estándar "Prefer: wait=N"
+#      (RFC 7240) y el servidor confirma con "Preference-Applied".
+#   3. SSE (Server-Sent Events): una conexión abierta por la que el servidor
+#      empuja cada cambio apenas ocurre.
+# Cada transporte es un generador asíncrono que entrega los datos nuevos.
+# Si el servidor no soporta uno, se lanza TransporteNoSoportado para que el
+# monitor pase al siguiente de la lista.
+
+class TransporteNoSoportado(Exception):
+    """El servidor no ofrece este mecanismo; hay que usar otro."""
+    pass
+
+def _normalizar(datos):
+    # Convertimos a lista si es un solo dict para facilitar a los observadores
+    if isinstance(datos, dict) and "id" in datos:
+        return [datos]
+    return datos
+
+class TransporteShortPolling:
+    nombre = "short-polling"
+
+    def __init__(self, url: str, intervalo_min: float = 5, intervalo_max: float = 60, timeout: float = 10):
+        self.url = url
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.timeout = timeout
+        self.intervalo = intervalo_min
+        self._etag = None
+
+    async def escuchar(self, session: aiohttp.ClientSession, activo: Callable[[], bool]) -> AsyncIterator[list]:
+        while activo():
+            headers = {"If-None-Match": self._etag} if self._etag else {}
+            try:
+                async with session.get(self.url, headers=headers, timeout=self.timeout) as resp:
+                    if resp.status == 200:
+                        datos = _normalizar(await resp.json())
+                        # El ETag se guarda solo con el cuerpo ya leído: si no, tras un cuerpo
+                        # corrupto el siguiente poll recibiría 304 y ese estado se perdería
+                        self._etag = resp.headers.get("ETag", self._etag)
+                        self.intervalo = max(self.intervalo_min, self.intervalo - 5)
+                        print(f"🔄 [HTTP 200] Cambio detectado. Intervalo reducido a: {self.intervalo}s")
+                        yield datos
+                    elif resp.status == 304:
+                        self.intervalo = min(self.intervalo_max, self.intervalo + 5)
+                        print(f"💤 [HTTP 304] Sin cambios. Intervalo aumentado a: {self.intervalo}s")
+                    elif resp.status >= 500:
+                        self.intervalo = min(self.intervalo_max, self.intervalo + 10)
+                        print(f"⚠️ [HTTP {resp.status}] Servidor fallando. Backoff a: {self.intervalo}s")
+            except asyncio.TimeoutError:
+                self.intervalo = min(self.intervalo_max, self.intervalo + 10)
+                print(f"⏳ [TIMEOUT] El servidor no respondió. Backoff a: {self.intervalo}s")
+            except Exception as e:
+                # Cualquier fallo (red, JSON corrupto...) se queda en ESTE poll: el monitor sigue
+                print(f"❌ Error de conexión: {e}")
+
+            if activo():
+                print(f"⏳ Esperando {self.intervalo} segundos...\n")
+                await asyncio.sleep(self.intervalo)
+
+class TransporteLongPolling:
+    nombre = "long-polling"
+
+    def __init__(self, url: str, espera: int = 30, pausa_error: float = 5):
+        self.url = url
+        self.espera = espera
+        self.pausa_error = pausa_error
+        self._etag = None
+
+    async def escuchar(self, session: aiohttp.ClientSession, activo: Callable[[], bool]) -> AsyncIterator[list]:
+        # El timeout tiene que superar la espera que le pedimos al servidor
+        timeout = aiohttp.ClientTimeout(total=self.espera + 10)
+        while activo():
+            headers = {"Prefer": f"wait={self.espera}"}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            try:
+                async with session.get(self.url, headers=headers, timeout=timeout) as resp:
+                    if resp.status in (404, 405, 501):
+                        raise TransporteNoSoportado(f"Sin long polling en {self.url} (HTTP {resp.status})")
+                    if "Preference-Applied" not in resp.headers and resp.status in (200, 304):
+                        raise TransporteNoSoportado("El servidor ignoró 'Prefer: wait' (no retiene peticiones).")
+                    if resp.status == 200:
+                        datos = _normalizar(await resp.json())
+                        self._etag = resp.headers.get("ETag", self._etag)
+                        yield datos
+                    elif resp.status == 304:
+                        continue   # Venció la espera sin cambios: volvemos a preguntar al instante
+                    else:
+                        print(f"⚠️ [HTTP {resp.status}] Long polling falló. Reintento en {self.pausa_error}s")
+                        await asyncio.sleep(self.pausa_error)
+            except (asyncio.TimeoutError, aiohttp.ClientError, ValueError) as e:
+                # ValueError: cuerpo que no es JSON válido
+                print(f"❌ Long polling interrumpido ({e!r}). Reintento en {self.pausa_error}s")
+                await asyncio.sleep(self.pausa_error)
+
+class TransporteSSE:
+    nombre = "sse"
+
+    def __init__(self, url: str, reintento: float = 3):
+        self.url = url
+        self.reintento = reintento      # El servidor puede cambiarlo con "retry:"
+        self._ultimo_id = None
+
+    async def escuchar(self, session: aiohttp.ClientSession, activo: Callable[[], bool]) -> AsyncIterator[list]:
+        # Sin timeout total: la conexión queda abierta mientras haya eventos
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+        while activo():
+            headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+            if self._ultimo_id:
+                headers["Last-Event-ID"] = self._ultimo_id   # Retomamos donde quedamos
+            try:
+                async with session.get(self.url, headers=headers, timeout=timeout) as resp:
+                    tipo = resp.headers.get("Content-Type", "")
+                    if resp.status in (404, 405, 406, 501) or (resp.status == 200 and "text/event-stream" not in tipo):
+                        raise TransporteNoSoportado(f"Sin SSE en {self.url} (HTTP {resp.status}, {tipo or 'sin tipo'})")
+                    if resp.status != 200:
+                        raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+                    async for datos in self._leer_eventos(resp):
+                        yield datos
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                print(f"❌ Conexión SSE perdida ({e!r}). Reconectando en {self.reintento}s")
+            if activo():
+                await asyncio.sleep(self.reintento)
+
+    async def _leer_eventos(self, resp) -> AsyncIterator[list]:
+        evento, lineas_data = "message", []
+        async for linea_bytes in resp.content:
+            linea = linea_bytes.decode("utf-8").rstrip("\r\n")
+            if not linea:
+                # Línea vacía = fin del evento
+                if lineas_data and evento in ("message", "inventario"):
+                    datos = "\n".join(lineas_data)
+                    try:
+                        carga = json.loads(datos)
+                    except ValueError:
+                        # Un frame corrupto no debe tumbar la conexión: lo saltamos
+                        print(f"⚠️ [SSE] Evento con JSON inválido descartado: {datos[:200]!r}")
+                    else:
+                        yield _normalizar(carga)
+                evento, lineas_data = "message", []
+                continue
+            if linea.startswith(":"):
+                continue   # Comentario / keep-alive
+            campo, _, valor = linea.partition(":")
+            valor = valor[1:] if valor.startswith(" ") else valor
+            if campo == "data":
+                lineas_data.append(valor)
+            elif campo == "event":
+                evento = valor
+            elif campo == "id":
+                self._ultimo_id = valor
+            elif campo == "retry" and valor.isdigit():
+                self.reintento = int(valor) / 1000
@@ -0,0 +1,241 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import contextvars
+from typing import Optional
+
+# ==========================================
+# TRAZAS (SPANS) ESTILO OPENTELEMETRY
+# ==========================================
+# Cuando el dashboard tarda, queremos saber DÓNDE se fue el tiempo:
+#   cargar_dashboard
+#     ├── HTTP GET /perfil
+#     │     ├── limitador.tasa.espera      (frenado por el token bucket)
+#     │     ├── pool.espera                (sin conexión libre en el pool)
+#     │     └── intento 1, intento 2...    (with_retry)
+#     └── HTTP GET /productos ...
+#
+# Por defecto todo es NO-OP: span() devuelve un objeto nulo y no cuesta
+# casi nada. Se activa con configurar_trazas(ExportadorJSON("trazas.jsonl"))
+# o con configurar_trazas("otel") si está instalado opentelemetry-sdk.
+#
+# El span actual viaja en una ContextVar: cada tarea de asyncio hereda el
+# contexto de quien la creó, así las peticiones que lanza gather() quedan
+# como hijas de cargar_dashboard. Hacia el servidor se propaga con la
+# cabecera W3C "traceparent".
+
+_span_actual = contextvars.ContextVar("span_actual", default=None)
+
+class Span:
+    __slots__ = ("nombre", "trace_id", "span_id", "padre_id", "atributos",
+                 "inicio", "fin", "estado", "error", "_rastreador", "_token")
+
+    def __init__(self, rastreador, nombre: str, padre: "Span" = None, atributos: dict = None):
+        self._rastreador = rastreador
+        self.nombre = nombre
+        self.trace_id = padre.trace_id if padre else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.padre_id = padre.span_id if padre else None
+        self.atributos = atributos or {}
+        self.inicio = self.fin = None
+        self.estado = "OK"
+        self.error = None
+        self._token = None
+
+    def atributo(self, clave: str, valor):
+        self.atributos[clave] = valor
+        return self
+
+    @property
+    def duracion_ms(self) -> Optional[float]:
+        if self.fin is None:
+            return None
+        return (self.fin - self.inicio) / 1e6
+
+    def __enter__(self):
+        self.inicio = time.time_ns()
+        self._token = _span_actual.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fin = time.time_ns()
+        _span_actual.reset(self._token)
+        if exc is not None:
+            self.estado = "ERROR"
+            self.error = repr(exc)
+        self._rastreador.exportar(self)
+        return False   # Nunca nos tragamos la excepción
+
+    def a_dict(self) -> dict:
+        return {
+            "nombre": self.nombre,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "padre_id": self.padre_id,
+            "inicio": self.inicio,
+            "duracion_ms": round(self.duracion_ms, 3) if self.fin else None,
+            "estado": self.estado,
+            "error": self.error,
+            "atributos": self.atributos,
+        }
+
+class _SpanNulo:
+    """Lo que devuelve span() con las trazas apagadas: no mide ni exporta nada."""
+    __slots__ = ()
+
+    def atributo(self, clave, valor):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_SPAN_NULO = _SpanNulo()
+
+# --- EXPORTADORES ---
+
+class ExportadorJSON:
+    """Un span terminado por línea (JSON Lines). Suficiente para pruebas locales."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+    def exportar(self, span: Span):
+        linea = json.dumps(span.a_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(linea + "\n")
+
+    def cerrar(self):
+        pass
+
+class _Rastreador:
+    def __init__(self, exportador):
+        self.exportador = exportador
+
+    def span(self, nombre: str, atributos: dict):
+        return Span(self, nombre, _span_actual.get(), atributos)
+
+    def exportar(self, span: Span):
+        try:
+            self.exportador.exportar(span)
+        except Exception as e:
+            # Un exportador roto no debe tumbar la petición que se está midiendo
+            print(f"⚠️ [Trazas] No se pudo exportar el span '{span.nombre}': {e}")
+
+    def inyectar(self, headers: dict) -> dict:
+        actual = _span_actual.get()
+        if actual is not None:
+            headers["traceparent"] = f"00-{actual.trace_id}-{actual.span_id}-01"
+        return headers
+
+class _RastreadorOTel:
+    """Delegamos en el SDK de OpenTelemetry (su exportador, su propagador)."""
+
+    def __init__(self, trace=None, propagate=None):
+        # trace/propagate se pueden inyectar (ej. un tracer falso en tests)
+        if trace is None:
+            from opentelemetry import trace, propagate
+        self._trace = trace
+        self._tracer = trace.get_tracer("ecomarket")
+        self._propagate = propagate
+
+    @contextlib.contextmanager
+    def span(self, nombre: str, atributos: dict):
+        # El span de OTel no tiene .atributo(): lo adaptamos para que el código instrumentado no cambie
+        with self._tracer.start_as_current_span(nombre, attributes=_atributos_otel(atributos)) as span:
+            yield _SpanOTelAdaptado(span)
+
+    def actual(self):
+        return _SpanOTelAdaptado(self._trace.get_current_span())
+
+    def inyectar(self, headers: dict) -> dict:
+        self._propagate.inject(headers)
+        return headers
+
+def _atributos_otel(atributos: dict) -> dict:
+    # OTel solo acepta str/bool/int/float (o listas de ellos)
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v)
+            for k, v in atributos.items() if v is not None}
+
+_rastreador = None
+
+def configurar_trazas(exportador=None):
+    """
+    None            -> trazas apagadas (no-op).
+    ExportadorJSON  -> spans propios a un archivo JSON Lines.
+    "otel"          -> usa opentelemetry (hay que configurar su TracerProvider aparte).
+    """
+    global _rastreador
+    if exportador is None:
+        _rastreador = None
+    elif exportador == "otel":
+        try:
+            _rastreador = _RastreadorOTel()
+        except ImportError:
+            raise RuntimeError("Para exportar a OpenTelemetry instala 'opentelemetry-sdk'.")
+    else:
+        _rastreador = _Rastreador(exportador)
+
+def activas() -> bool:
+    return _rastreador is not None
+
+def span(nombre: str, **atributos):
+    """Context manager: with span("HTTP GET", url=...) as s: s.atributo("status", 200)"""
+    if _rastreador is None:
+        return _SPAN_NULO
+    return _rastreador.span(nombre, atributos)
+
+def span_actual():
+    """El span abierto en este contexto (o el nulo)."""
+    if _rastreador is None:
+        return _SPAN_NULO
+    if isinstance(_rastreador, _RastreadorOTel):
+        return _rastreador.actual()
+    return _span_actual.get() or _SPAN_NULO
+
+class _SpanOTelAdaptado:
+    __slots__ = ("_span",)
+
+    def __init__(self, span):
+        self._span = span
+
+    def atributo(self, clave, valor):
+        if valor is not None:
+            self._span.set_attribute(clave, valor if isinstance(valor, (str, bool, int, float)) else str(valor))
+        return self
+
+def inyectar_contexto(headers: dict = None) -> dict:
+    """Agrega 'traceparent' a las cabeceras salientes si hay un span activo."""
+    headers = {} if headers is None else headers
+    if _rastreador is None:
+        return headers
+    return _rastreador.inyectar(headers)
+
+def crear_trace_config():
+    """
+    TraceConfig de aiohttp que abre un span 'pool.espera' mientras la
+    petición espera una conexión libre del pool (límite del TCPConnector).
+    """
+    import aiohttp
+
+    async def inicio_cola(session, ctx, params):
+        if _rastreador is not None:
+            ctx.span_pool = span("pool.espera")
+            ctx.span_pool.__enter__()
+
+    async def fin_cola(session, ctx, params):
+        span_pool = getattr(ctx, "span_pool", None)
+        if span_pool is not None:
+            span_pool.__exit__(None, None, None)
+            ctx.span_pool = None
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_queued_start.append(inicio_cola)
+    trace.on_connection_queued_end.append(fin_cola)
+    return trace
@@ -38,6 +38,9 @@ class URLBuilder:
         full_url = f"{self.base_url}/{safe_path}"
 
         # 4. Construcción de Query String (Parametros GET)
+        # Los filtros opcionales (valor None) no viajan en la URL
+        if query_params:
+            query_params = {k: v for k, v in query_params.items() if v is not None}
         if query_params:
             # urlencode convierte {'q': 'a&b'} en 'q=a%26b'
             # quote_via=quote asegura espacios como %20 en lugar de +